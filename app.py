@@ -1,9 +1,11 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+from src.lazy_imports import lazy
 from src.data_loader import fetch_stock_data
 from src.analysis import calculate_statistics, calculate_technical_indicators
 
+px = lazy("plotly.express")  # Imported with the first chart
+
 st.set_page_config(page_title="Stock Analysis & Prediction", layout="wide")
 from src.ui import add_logo
 add_logo()
@@ -108,12 +110,31 @@ if st.session_state.data is not None:
         
     # Prediction
     st.subheader("Price Prediction (Beta)")
-    from src.model import train_model, train_xgboost_model, train_prophet_model, train_arima_model, train_holtwinters_model, train_moving_average_model, predict_future
+    from src.model import train_model, train_xgboost_model, train_prophet_model, train_arima_model, train_holtwinters_model, train_moving_average_model, train_direct_model, predict_future
+    from src import model_cache
+    from src.batch_training import load_results
+    
+    nightly = load_results(ticker=current_ticker)
+    if not nightly.empty:
+        with st.expander(f"🌙 Nightly batch forecast (trained {nightly['Trained At'].iloc[0]})"):
+            st.dataframe(nightly.set_index("Model").drop(columns=["Ticker", "Cache Key", "Trained At"], errors="ignore"))
     
     col_m1, col_m2 = st.columns(2)
     model_option = col_m1.selectbox("Select Model", ["Random Forest", "XGBoost", "Prophet", "ARIMA", "Holt-Winters", "Moving Average"])
-    enable_tuning = col_m2.checkbox("Enable Hyperparameter Tuning (Slower)", value=False, help="Optimizes model parameters for better accuracy. Takes longer to train.")
+    forecast_mode = "recursive"
+    if model_option in ["Random Forest", "XGBoost"]:
+        forecast_mode = col_m1.radio("Forecast Mode", ["recursive", "direct"], horizontal=True,
+                                     format_func=lambda m: "Recursive (one-step, rolled forward)" if m == "recursive" else "Direct (one model for all horizons)",
+                                     help="Direct mode trains a multi-output model for days 1..N and predicts the whole forecast in one call, so errors do not compound.")
+    direct = forecast_mode == "direct"
+    enable_tuning = col_m2.checkbox("Enable Hyperparameter Tuning (Slower)", value=False, disabled=direct,
+                                    help="Optimizes model parameters for better accuracy within a time budget. Takes longer to train. Not available for direct forecasts.")
+    enable_tuning = enable_tuning and not direct
     
+    tune_budget = None
+    if enable_tuning:
+        tune_budget = st.slider("Tuning Budget (seconds)", min_value=5, max_value=120, value=20,
+                                help="Wall-clock limit of the successive-halving search (Random Forest / XGBoost).")
     forecast_days = st.slider("Forecast Horizon (Days)", min_value=1, max_value=60, value=7)
     
     if st.button("Train Model & Predict"):
@@ -122,21 +143,26 @@ if st.session_state.data is not None:
             metrics = {}
             test_results = None
             
-            if model_option == "Random Forest":
-                model, metrics, test_results = train_model(df, sentiment_score=avg_sentiment, tune=enable_tuning)
+            if forecast_mode == "direct":
+                model, metrics, test_results = train_direct_model(df, horizon=forecast_days, sentiment_score=avg_sentiment, model_type=model_option, ticker=current_ticker)
+            elif model_option == "Random Forest":
+                model, metrics, test_results = train_model(df, sentiment_score=avg_sentiment, tune=enable_tuning, tune_budget=tune_budget, ticker=current_ticker)
             elif model_option == "XGBoost":
-                model, metrics, test_results = train_xgboost_model(df, sentiment_score=avg_sentiment, tune=enable_tuning)
+                model, metrics, test_results = train_xgboost_model(df, sentiment_score=avg_sentiment, tune=enable_tuning, tune_budget=tune_budget, ticker=current_ticker)
             elif model_option == "Prophet":
-                model, metrics, test_results = train_prophet_model(df, tune=enable_tuning)
+                model, metrics, test_results = train_prophet_model(df, tune=enable_tuning, ticker=current_ticker)
             elif model_option == "ARIMA":
-                model, metrics, test_results = train_arima_model(df, tune=enable_tuning)
+                model, metrics, test_results = train_arima_model(df, tune=enable_tuning, ticker=current_ticker)
             elif model_option == "Holt-Winters":
-                model, metrics, test_results = train_holtwinters_model(df, tune=enable_tuning)
+                model, metrics, test_results = train_holtwinters_model(df, tune=enable_tuning, ticker=current_ticker)
             elif model_option == "Moving Average":
-                model, metrics, test_results = train_moving_average_model(df, tune=enable_tuning)
+                model, metrics, test_results = train_moving_average_model(df, tune=enable_tuning, ticker=current_ticker)
             
             if model:
-                st.success(f"{model_option} trained successfully!")
+                if metrics.get("Cached"):
+                    st.success(f"{model_option} loaded from the model cache (data unchanged).")
+                else:
+                    st.success(f"{model_option} trained successfully!")
                 
                 mape = metrics['MAPE']
                 mape_pct = mape * 100
@@ -152,6 +178,10 @@ if st.session_state.data is not None:
                     st.caption("Try enabling Hyperparameter Tuning or using a different model.")
                 
                 # Display Best Params if available
+                if 'MAPE by Horizon' in metrics:
+                    with st.expander("📏 Test MAPE by Horizon"):
+                        st.bar_chart(pd.Series(metrics['MAPE by Horizon'], index=range(1, len(metrics['MAPE by Horizon']) + 1), name="MAPE") * 100)
+
                 if 'Best Params' in metrics:
                     with st.expander("✨ Best Hyperparameters Found"):
                         st.json(metrics['Best Params'])
@@ -163,7 +193,10 @@ if st.session_state.data is not None:
                 
                 # Predict Future
                 with st.spinner(f"Forecasting next {forecast_days} days..."):
-                    future_preds = predict_future(model, df, days=forecast_days, sentiment_score=avg_sentiment, model_type=model_option)
+                    forecast_key = f"{metrics['Cache Key']}_forecast_{forecast_mode}_{forecast_days}_{avg_sentiment:.4f}"
+                    future_preds = model_cache.get_or_compute(
+                        forecast_key,
+                        lambda: predict_future(model, df, days=forecast_days, sentiment_score=avg_sentiment, model_type=model_option, mode=forecast_mode))
                 
                 # Create Future Dates
                 last_date = df.index[-1]
@@ -223,3 +256,48 @@ if st.session_state.data is not None:
                 
             else:
                 st.warning(f"Could not train model: {metrics.get('error', 'Unknown error')}")
+
+    # --- TRAIN ALL MODELS ---
+    st.subheader("Model Leaderboard")
+    st.caption("Trains all six models in parallel, ranks them on a forecast of the same last 10 days and forecasts with the best one. "
+               "Test MAPE is each model's own test score: one-step for Random Forest / XGBoost, the whole test span for the others, so it is not comparable across models. "
+               "The Rolling-Origin Backtest below scores them over many origins.")
+    if st.button("Train All Models & Compare"):
+        from src.model import train_all_models
+        with st.spinner("Training Random Forest, XGBoost, Prophet, ARIMA, Holt-Winters and Moving Average in parallel..."):
+            leaderboard, all_results = train_all_models(df, sentiment_score=avg_sentiment, tune=enable_tuning, ticker=current_ticker)
+
+        st.dataframe(leaderboard.style.highlight_min(subset=["MAPE %"], color="lightgreen"))
+        trained = leaderboard.dropna(subset=["MAPE %"])
+        if trained.empty:
+            st.warning("No model could be trained and scored on this data.")
+        else:
+            best_option = trained.index[0]
+            best_model, best_metrics, _ = all_results[best_option]
+            st.success(f"Best model: **{best_option}** (MAPE {trained.loc[best_option, 'MAPE %']:.2f}% over the last 10 days)")
+
+            best_preds = predict_future(best_model, df, days=forecast_days, sentiment_score=avg_sentiment, model_type=best_option)
+            best_dates = [df.index[-1] + pd.Timedelta(days=i) for i in range(1, forecast_days + 1)]
+            best_future = pd.DataFrame({"Price": best_preds, "Type": "Forecast"}, index=best_dates)
+            best_history = df[['Close']].tail(90).rename(columns={"Close": "Price"}).assign(Type="History")
+            best_combined = pd.concat([best_history, best_future])
+            fig_best = px.line(best_combined, x=best_combined.index, y='Price', color='Type',
+                               title=f'{current_ticker} {forecast_days}-Day Forecast ({best_option})',
+                               color_discrete_map={"History": "blue", "Forecast": "orange"})
+            st.plotly_chart(fig_best, use_container_width=True)
+
+    with st.expander("📐 Rolling-Origin Backtest"):
+        st.caption("Forecasts from every day of the last 20% of the history, refitting every N days, and reports MAPE by horizon. Folds run in parallel and are cached, so reruns only fit the new days.")
+        col_b1, col_b2 = st.columns(2)
+        bt_horizon = col_b1.slider("Backtest Horizon (Days)", min_value=1, max_value=30, value=10)
+        bt_refit = col_b2.slider("Refit Every (Days)", min_value=5, max_value=60, value=20)
+        if st.button("Run Backtest"):
+            from src.forecast_eval import backtest
+            with st.spinner("Backtesting all six models..."):
+                bt_summary, bt_by_horizon, _ = backtest(df, horizon=bt_horizon, refit_every=bt_refit,
+                                                        sentiment_score=avg_sentiment, ticker=current_ticker)
+            if bt_summary.empty:
+                st.warning("Not enough history for a backtest.")
+            else:
+                st.dataframe(bt_summary.style.highlight_min(subset=["MAPE %"], color="lightgreen"))
+                st.line_chart(bt_by_horizon)
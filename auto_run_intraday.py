@@ -1,6 +1,21 @@
+"""
+auto_run_intraday.py
+
+Automated Intraday scanner.
+Modes:
+- Single pass (default): scans the watchlist once (scheduled for 09:45) and adds 90+ trades to the tracker.
+- Session (--session): stays alive from 09:15 to 15:30 IST, re-scores the watchlist on every
+  closed 5m bar using incremental fetches and streaming indicator state, and adds newly
+  qualifying trades as they form. Tickers already tracked for the day are not re-added.
+- ORB watch (--orb): stays alive until 15:30 IST holding each ticker's opening range in memory
+  and checks every closed 5m (or 1m) bar against it, so a breakout reaches the tracker within one bar.
+"""
+import argparse
+import time
 import pandas as pd
-from datetime import datetime
-from src.intraday_strategy import calculate_confidence
+import pytz
+from datetime import datetime, timedelta, time as dtime
+from src.intraday_strategy import calculate_confidence, calculate_confidence_from_state
 from src.tracker import TradeTracker
 from src.config import WATCHLIST
 import colorama
@@ -8,50 +23,106 @@ from colorama import Fore, Style
 
 colorama.init()
 
-def main():
+IST = pytz.timezone('Asia/Kolkata')
+SESSION_START = dtime(9, 15)
+SESSION_END = dtime(15, 30)
+BAR_MINUTES = 5
+BAR_SETTLE_SECONDS = 20 # Give the data feed time to publish the bar that just closed
+MIN_SCORE = 90
+
+def build_result(stock, values):
+    """Maps the calculate_confidence tuple to the row the tracker expects."""
+    # Returned: score, details, prev_day_high, pdl, prev_close, todays_high, exit_price, current_atr, trigger_high, current_vwap, side
+    score, details, pdh, pdl, prev_close, todays_high, exit_price, atr, trigger_high, vwap, side = values
+    return {
+         "Ticker": stock,
+         "Score": score,
+         "Details": ", ".join(details),
+         "PDH": pdh,
+         "PDL": pdl,
+         "Prev Close": prev_close,
+         "Safe Entry": todays_high,
+         "Exit Price": exit_price,
+         "Target %": "0.5%",
+         # Pass Scientific Metrics to Tracker
+         "ATR": atr,
+         "TriggerHigh": trigger_high,
+         "VWAP": vwap,
+         "Side": side
+    }
+
+def add_results_to_tracker(results, tracker=None, signal_date=None):
+    """Adds scan results to the tracker. Returns (added_count, updated_count)."""
+    tracker = tracker or TradeTracker()
+    today_str = signal_date or datetime.now().strftime("%Y-%m-%d")
+
+    added_count = 0
+    updated_count = 0
+
+    for row_dict in results:
+        # Prepare signal data for add_trade
+        # Remap keys to match what tracker expects if needed, or tracker handles it flexible
+        # Tracker uses: 'Entry Price', 'Stop Loss' (optional), 'Target Price' (optional), 'Safe Entry' (fallback)
+
+        # We pass row_dict directly as it has 'Safe Entry', 'Exit Price'
+        row_dict['Entry Price'] = row_dict['Safe Entry']
+
+        success, msg = tracker.add_trade(
+            row_dict,
+            strategy_type="Intraday",
+            signal_date=today_str
+        )
+
+        if success:
+            if "updated" in msg.lower():
+                print(f"{Fore.BLUE}UPDATED: {row_dict['Ticker']} ({msg}){Style.RESET_ALL}")
+                updated_count += 1
+            else:
+                print(f"{Fore.GREEN}ADDED: {row_dict['Ticker']}{Style.RESET_ALL}")
+                added_count += 1
+        else:
+            print(f"{Fore.YELLOW}SKIPPED: {row_dict['Ticker']} ({msg}){Style.RESET_ALL}")
+
+    return added_count, updated_count
+
+def screen_watchlist(watchlist):
+    """Runs the daily-bar pre-filter so thin / low-ATR names never reach the 5m download."""
+    from src.prefilter import prefilter_universe
+
+    kept, rejected = prefilter_universe(watchlist)
+    print(f"Pre-filter: {len(kept)}/{len(watchlist)} stocks pass (ATR / turnover / gap).")
+    for ticker, reason in rejected.items():
+        print(f"{Fore.LIGHTBLACK_EX}  Dropped {ticker}: {reason}{Style.RESET_ALL}")
+    return kept
+
+def main(prefilter=True):
     print(f"{Fore.CYAN}--- Auto Intraday Scanner Started at {datetime.now()} ---{Style.RESET_ALL}")
-    
+
     results = []
     all_scanned = []
-    print(f"Scanning {len(WATCHLIST)} stocks...")
-    
-    for i, stock in enumerate(WATCHLIST):
+    watchlist = screen_watchlist(WATCHLIST) if prefilter else WATCHLIST
+    print(f"Scanning {len(watchlist)} stocks...")
+
+    for i, stock in enumerate(watchlist):
         try:
             # UNPACKING FIX: Now captures all 11 return values including side
-            # Returned: score, details, prev_day_high, pdl, prev_close, todays_high, exit_price, current_atr, trigger_high, current_vwap, side
-            score, details, pdh, pdl, prev_close, todays_high, exit_price, atr, trigger_high, vwap, side = calculate_confidence(stock)
-            
-            if score >= 90:
-                print(f"{Fore.GREEN}[FOUND] {stock} | Score: {score} | Entry (Daily Level): {trigger_high}{Style.RESET_ALL}")
-                results.append({
-                     "Ticker": stock, 
-                     "Score": score, 
-                     "Details": ", ".join(details),
-                     "PDH": pdh,
-                     "PDL": pdl,
-                     "Prev Close": prev_close,
-                     "Safe Entry": todays_high,
-                     "Exit Price": exit_price,
-                     "Target %": "0.5%",
-                     # Pass Scientific Metrics to Tracker
-                     "ATR": atr,
-                     "TriggerHigh": trigger_high,
-                     "ATR": atr,
-                     "TriggerHigh": trigger_high,
-                     "VWAP": vwap,
-                     "Side": side
-                })
-            
+            values = calculate_confidence(stock, min_score=MIN_SCORE)
+            score, details = values[0], values[1]
+
+            if score >= MIN_SCORE:
+                print(f"{Fore.GREEN}[FOUND] {stock} | Score: {score} | Entry (Daily Level): {values[8]}{Style.RESET_ALL}")
+                results.append(build_result(stock, values))
+
             # --- NEW LOGGING: Collect all scores for debugging ---
             all_scanned.append({"Ticker": stock, "Score": score, "Details": details})
-            
+
             if score >= 80 and score < 90:
                  print(f"{Fore.YELLOW}[CLOSE CALL] {stock} | Score: {score} | Missing: {set(['Trend > EMA200', 'Val > VWAP', 'VSA Bull Vol', 'MACD Bull Cross', 'Price > BB Mid', 'RSI Bullish (>60)', 'Breakout > PDH']) - set(details)}{Style.RESET_ALL}")
                  print(f"Details: {details}")
 
             if score < 90:
-                 if i % 10 == 0: print(f"Checked {i}/{len(WATCHLIST)}... (Last: {stock} @ {score})")
-                
+                 if i % 10 == 0: print(f"Checked {i}/{len(watchlist)}... (Last: {stock} @ {score})")
+
         except Exception as e:
             print(f"{Fore.RED}Error scanning {stock}: {e}{Style.RESET_ALL}")
 
@@ -68,36 +139,8 @@ def main():
         return
 
     print(f"\n{Fore.CYAN}--- Adding {len(results)} Trades to Tracker ---{Style.RESET_ALL}")
-    
-    tracker = TradeTracker()
-    today_str = datetime.now().strftime("%Y-%m-%d")
-    
-    added_count = 0
-    updated_count = 0
-    
-    for row_dict in results:
-        # Prepare signal data for add_trade
-        # Remap keys to match what tracker expects if needed, or tracker handles it flexible
-        # Tracker uses: 'Entry Price', 'Stop Loss' (optional), 'Target Price' (optional), 'Safe Entry' (fallback)
-        
-        # We pass row_dict directly as it has 'Safe Entry', 'Exit Price'
-        row_dict['Entry Price'] = row_dict['Safe Entry']
-        
-        success, msg = tracker.add_trade(
-            row_dict, 
-            strategy_type="Intraday", 
-            signal_date=today_str
-        )
-        
-        if success:
-            if "updated" in msg.lower():
-                print(f"{Fore.BLUE}UPDATED: {row_dict['Ticker']} ({msg}){Style.RESET_ALL}")
-                updated_count += 1
-            else:
-                print(f"{Fore.GREEN}ADDED: {row_dict['Ticker']}{Style.RESET_ALL}")
-                added_count += 1
-        else:
-            print(f"{Fore.YELLOW}SKIPPED: {row_dict['Ticker']} ({msg}){Style.RESET_ALL}")
+
+    added_count, updated_count = add_results_to_tracker(results)
 
     print(f"\n{Fore.CYAN}--- Summary ---{Style.RESET_ALL}")
     print(f"New Trades: {added_count}")
@@ -105,8 +148,205 @@ def main():
     print(f"Done.")
 
     # Keep window open for a few seconds if running via bat
-    import time
     time.sleep(5)
 
+# --- SESSION MODE ---
+
+def bar_times(index):
+    """Intraday bar timestamps in IST (naive timestamps are treated as UTC, like the tracker)."""
+    if index.tz is None:
+        index = index.tz_localize('UTC')
+    return index.tz_convert(IST)
+
+def closed_bars(df, now, minutes=BAR_MINUTES):
+    """Drops the still-forming bar: keeps bars whose `minutes` interval has fully elapsed."""
+    if df is None or df.empty:
+        return df
+    ends = bar_times(df.index) + pd.Timedelta(minutes=minutes)
+    return df[ends <= now]
+
+def roll_daily(df_daily, bars, now):
+    """
+    Keeps today's daily candle current from the 5m bars so scoring sees the live
+    day high/low without re-downloading daily data every bar.
+    """
+    today = bars[bar_times(bars.index).date == now.date()]
+    if today.empty:
+        return df_daily
+
+    daily_index = df_daily.index if df_daily.index.tz is not None else df_daily.index.tz_localize(IST)
+    if daily_index.tz_convert(IST)[-1].date() != now.date():
+        row = pd.DataFrame({
+            "Open": [today['Open'].iloc[0]], "High": [today['High'].max()],
+            "Low": [today['Low'].min()], "Close": [today['Close'].iloc[-1]],
+            "Volume": [today['Volume'].sum()]
+        }, index=[pd.Timestamp(now.date()).tz_localize(df_daily.index.tz)])
+        return pd.concat([df_daily, row])
+
+    df_daily = df_daily.copy()
+    df_daily.iloc[-1, df_daily.columns.get_loc('High')] = max(df_daily['High'].iloc[-1], today['High'].max())
+    df_daily.iloc[-1, df_daily.columns.get_loc('Low')] = min(df_daily['Low'].iloc[-1], today['Low'].min())
+    df_daily.iloc[-1, df_daily.columns.get_loc('Close')] = today['Close'].iloc[-1]
+    return df_daily
+
+def next_bar_time(now, minutes=BAR_MINUTES):
+    """Next bar boundary (plus settle delay) after `now`."""
+    minute = (now.minute // minutes + 1) * minutes
+    boundary = now.replace(minute=0, second=0, microsecond=0) + timedelta(minutes=minute)
+    return boundary + timedelta(seconds=BAR_SETTLE_SECONDS)
+
+def tracked_tickers(tracker, date_str):
+    """Tickers already in the tracker as Intraday trades for `date_str`."""
+    df = tracker.load_trades()
+    if df.empty:
+        return set()
+    mask = (df['SignalDate'] == date_str) & (df['Strategy'] == "Intraday")
+    return set(df.loc[mask, 'Ticker'])
+
+def run_session(watchlist=None, prefilter=True):
+    """Continuous scanning from 09:15 to 15:30 IST, one re-score per closed 5m bar."""
+    from src.streaming import load_state, save_state
+    from src.utils import fetch_batch
+
+    watchlist = list(watchlist or WATCHLIST)
+    now = datetime.now(IST)
+    date_str = now.strftime("%Y-%m-%d")
+    session_open = IST.localize(datetime.combine(now.date(), SESSION_START))
+    session_close = IST.localize(datetime.combine(now.date(), SESSION_END))
+
+    if now.weekday() >= 5 or now >= session_close:
+        print(f"{Fore.YELLOW}Market closed. Session mode runs between 09:15 and 15:30 IST on weekdays.{Style.RESET_ALL}")
+        return
+
+    if now < session_open:
+        wait = (session_open - now).total_seconds()
+        print(f"Waiting {int(wait // 60)} min for market open...")
+        time.sleep(wait)
+
+    print(f"{Fore.CYAN}--- Intraday Session Scanner Started at {datetime.now(IST)} ---{Style.RESET_ALL}")
+    if prefilter:
+        watchlist = screen_watchlist(watchlist)
+    tracker = TradeTracker()
+    tracked = tracked_tickers(tracker, date_str)
+    print(f"Watching {len(watchlist)} stocks ({len(tracked)} already tracked today).")
+
+    # Warm-up: restore checkpoints, then replay the last 5 days (already-seen bars are skipped)
+    states = {ticker: load_state(ticker) for ticker in watchlist}
+    now = datetime.now(IST)
+    history = fetch_batch(watchlist, period="5d", interval="5m")
+    daily = fetch_batch(watchlist, period="5d", interval="1d")
+    for ticker, bars in history.items():
+        states[ticker].update_frame(closed_bars(bars, now))
+
+    while True:
+        now = datetime.now(IST)
+        bars_by_ticker = fetch_batch(watchlist, period="1d", interval="5m")
+        fresh = []
+        for ticker, bars in bars_by_ticker.items():
+            bars = closed_bars(bars, now)
+            if bars.empty: continue
+            if states[ticker].update_frame(bars) > 0:
+                fresh.append(ticker)
+            if ticker in daily:
+                daily[ticker] = roll_daily(daily[ticker], bars, now)
+
+        results = []
+        for ticker in fresh:
+            if ticker in tracked or ticker not in daily: continue
+            values = calculate_confidence_from_state(ticker, states[ticker], daily[ticker], min_score=MIN_SCORE)
+            if values[0] >= MIN_SCORE:
+                print(f"{Fore.GREEN}[FOUND {now.strftime('%H:%M')}] {ticker} | Score: {values[0]} | Side: {values[10]}{Style.RESET_ALL}")
+                results.append(build_result(ticker, values))
+
+        if results:
+            add_results_to_tracker(results, tracker, signal_date=date_str)
+            tracked.update(row['Ticker'] for row in results)
+
+        for ticker in fresh:
+            save_state(states[ticker])
+
+        print(f"{now.strftime('%H:%M:%S')} | Re-scored {len(fresh)} stocks | New signals: {len(results)} | Tracked today: {len(tracked)}")
+
+        wake = next_bar_time(datetime.now(IST))
+        if now >= session_close or wake > session_close + timedelta(seconds=BAR_SETTLE_SECONDS):
+            break
+        time.sleep(max(0, (wake - datetime.now(IST)).total_seconds()))
+
+    print(f"{Fore.CYAN}--- Session closed at {datetime.now(IST).strftime('%H:%M')}. Tracked today: {len(tracked)} ---{Style.RESET_ALL}")
+
+# --- ORB WATCH MODE ---
+
+def run_orb_watch(watchlist=None, window_minutes=30, interval="5m", min_score=MIN_SCORE):
+    """
+    Live opening-range breakout watcher, 09:15 + window_minutes to 15:30 IST.
+    Each ticker's range is built once from the session's bars and kept in an ORBState; every
+    poll only feeds the bars that closed since the last one. Breakouts scoring `min_score`+
+    go straight to the tracker as Intraday trades (first breakout per ticker per day).
+    """
+    from src.orb_strategy import ORBState
+    from src.utils import fetch_batches
+
+    watchlist = list(watchlist or WATCHLIST)
+    bar_minutes = int(interval.rstrip("m"))
+    now = datetime.now(IST)
+    date_str = now.strftime("%Y-%m-%d")
+    range_close = IST.localize(datetime.combine(now.date(), SESSION_START)) + timedelta(minutes=window_minutes)
+    session_close = IST.localize(datetime.combine(now.date(), SESSION_END))
+
+    if now.weekday() >= 5 or now >= session_close:
+        print(f"{Fore.YELLOW}Market closed. ORB watch runs between 09:15 and 15:30 IST on weekdays.{Style.RESET_ALL}")
+        return
+
+    if now < range_close:
+        wait = (range_close - now).total_seconds() + BAR_SETTLE_SECONDS
+        print(f"Waiting {int(wait // 60)} min for the {window_minutes} min opening range to close...")
+        time.sleep(wait)
+
+    print(f"{Fore.CYAN}--- ORB Watcher Started at {datetime.now(IST)} ({window_minutes} min range, {interval} bars) ---{Style.RESET_ALL}")
+    tracker = TradeTracker()
+    tracked = tracked_tickers(tracker, date_str)
+    states = {ticker: ORBState(ticker, window_minutes) for ticker in watchlist}
+
+    while True:
+        now = datetime.now(IST)
+        # period="1d" every poll; bars already fed are skipped by ORBState
+        bars_by_ticker = fetch_batches(watchlist, period="1d", interval=interval)
+        results = []
+        for ticker, bars in bars_by_ticker.items():
+            bars = closed_bars(bars, now, bar_minutes)
+            if bars is None or bars.empty: continue
+            for event in states[ticker].update_frame(bars):
+                print(f"{Fore.GREEN}[ORB {event['Time'].strftime('%H:%M')}] {ticker} {event['Side']} | Score: {event['Score']} | {event['Details']}{Style.RESET_ALL}")
+                if event['Score'] >= min_score and ticker not in tracked:
+                    results.append(event)
+
+        for event in results:
+            success, msg = tracker.add_trade(event, strategy_type="Intraday", signal_date=date_str)
+            print(f"{'ADDED' if success else 'SKIPPED'}: {event['Ticker']} ({msg})")
+            tracked.add(event['Ticker'])
+
+        ranges = sum(1 for state in states.values() if state.range is not None)
+        print(f"{now.strftime('%H:%M:%S')} | Ranges held: {ranges} | New breakouts: {len(results)} | Tracked today: {len(tracked)}")
+
+        wake = next_bar_time(datetime.now(IST), bar_minutes)
+        if now >= session_close or wake > session_close + timedelta(seconds=BAR_SETTLE_SECONDS):
+            break
+        time.sleep(max(0, (wake - datetime.now(IST)).total_seconds()))
+
+    print(f"{Fore.CYAN}--- ORB watch closed at {datetime.now(IST).strftime('%H:%M')}. Tracked today: {len(tracked)} ---{Style.RESET_ALL}")
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Velo automated Intraday scanner")
+    parser.add_argument("--session", action="store_true", help="Stay alive 09:15-15:30 IST and re-score on every closed 5m bar")
+    parser.add_argument("--no-prefilter", action="store_true", help="Scan every watchlist symbol (skip the daily ATR / turnover / gap screen)")
+    parser.add_argument("--orb", action="store_true", help="Watch for opening-range breakouts until 15:30 IST")
+    parser.add_argument("--orb-window", type=int, default=30, choices=[15, 30, 60], help="Opening range length in minutes (--orb)")
+    parser.add_argument("--orb-interval", default="5m", choices=["1m", "5m"], help="Bar size checked against the range (--orb)")
+    args = parser.parse_args()
+
+    if args.orb:
+        run_orb_watch(window_minutes=args.orb_window, interval=args.orb_interval)
+    elif args.session:
+        run_session(prefilter=not args.no_prefilter)
+    else:
+        main(prefilter=not args.no_prefilter)
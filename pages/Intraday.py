@@ -43,7 +43,11 @@ selected_date = target_date  # Used for add_trade
 st.info(f"📅 Strategy Mode: **{session_label}**")
 
 # Strategy Selection
-strategy_mode = st.radio("Select Strategy:", ["Sniper Trend (Default)", "ORB Breakout (09:15-09:45)"], horizontal=True)
+strategy_mode = st.radio("Select Strategy:", ["Sniper Trend (Default)", "ORB Breakout (Opening Range)"], horizontal=True)
+orb_window = 30
+if "ORB" in strategy_mode:
+    orb_window = st.radio("Opening Range Window:", [15, 30, 60], index=1, horizontal=True,
+                          format_func=lambda m: f"{m} min (09:15-{(datetime(2000, 1, 1, 9, 15) + timedelta(minutes=m)).strftime('%H:%M')})")
 
 # --- CALCULATION BUTTON ---
 if st.button("Calculate Scores"):
@@ -51,11 +55,17 @@ if st.button("Calculate Scores"):
     progress_bar = st.progress(0)
     
     total_stocks = len(WATCHLIST)
+    orb_frames = {}
+    if "ORB" in strategy_mode:
+        # One batch download for the whole watchlist; ranges are cached per ticker per session
+        from src.utils import fetch_batches
+        orb_frames = fetch_batches(WATCHLIST, period="1d", interval="5m")
+
     for i, stock in enumerate(WATCHLIST):
         with st.spinner(f"Analyzing {stock}..."):
             
             if "Sniper" in strategy_mode:
-                score, details, pdh, pdl, prev_close, todays_high, exit_price, atr, trigger_high, vwap, side = calculate_confidence(stock)
+                score, details, pdh, pdl, prev_close, todays_high, exit_price, atr, trigger_high, vwap, side = calculate_confidence(stock, min_score=90)
                 
                 if isinstance(details, str) and details.startswith("Error"):
                      pass 
@@ -74,7 +84,7 @@ if st.button("Calculate Scores"):
                      })
             else:
                  # ORB STRATEGY
-                 score, details, orb_h, orb_l, entry, sl, target, side = calculate_orb_signal(stock)
+                 score, details, orb_h, orb_l, entry, sl, target, side = calculate_orb_signal(stock, window_minutes=orb_window, df=orb_frames.get(stock))
                  
                  if score > 0:
                      results.append({
@@ -163,3 +173,28 @@ if st.session_state.intraday_results is not None:
                 st.warning(f"No new unique trades to add for {date_str}.")
         
         st.caption(f"Note: Trades will be tracked for the session on {selected_date.strftime('%Y-%m-%d')}.")
+
+# --- ORB BACKTEST ---
+st.markdown("---")
+st.header("ORB Backtest")
+st.markdown("Replay the 09:15-09:45 breakout rules on the last 60 sessions of 5m bars for the whole watchlist.")
+
+if st.button("Run ORB Backtest"):
+    from src.orb_strategy import run_orb_backtest
+    with st.spinner("Backtesting ORB on 60 sessions..."):
+        orb_trades, orb_stats = run_orb_backtest()
+
+    if "Error" in orb_stats:
+        st.error(orb_stats["Error"])
+    else:
+        overall = orb_stats["Overall"]
+        o_col1, o_col2, o_col3, o_col4 = st.columns(4)
+        o_col1.metric("Trades", int(overall["Trades"]))
+        o_col2.metric("Target Hit", f"{overall['Target Hit %']}%")
+        o_col3.metric("SL Hit", f"{overall['SL Hit %']}%")
+        o_col4.metric("Avg PnL", f"{overall['Avg PnL %']}%")
+
+        st.subheader("By Range Width")
+        st.dataframe(orb_stats["By Range Width"], use_container_width=True)
+        st.subheader("By Ticker")
+        st.dataframe(orb_stats["By Ticker"], use_container_width=True)
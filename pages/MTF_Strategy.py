@@ -22,13 +22,15 @@ if "scanner_results" not in st.session_state:
 if "scanner_warnings" not in st.session_state:
     st.session_state.scanner_warnings = []
 
+panel_mode = st.checkbox("⚡ Panel Mode (batch download, score all stocks together)", value=False)
+
 if st.button("🚀 Run Ultra-Precision Scanner"):
     progress_bar = st.progress(0, text="Starting scanner...")
     
     def update_progress(progress, text):
         progress_bar.progress(progress, text=text)
         
-    results, warnings = run_pro_scanner(progress_callback=update_progress)
+    results, warnings = run_pro_scanner(progress_callback=update_progress, panel=panel_mode)
     progress_bar.empty()
     
     # Store in session state
@@ -211,3 +213,28 @@ if run_backtest:
                 st.success("🚀 Strategy Outperformed Buy & Hold!")
             else:
                 st.warning("Strategy Underperformed Buy & Hold.")
+
+st.markdown("---")
+st.header("Portfolio Backtest")
+st.markdown("Run the same rules on the whole watchlist at once (each stock vs its sector index from `SECTOR_MAP`).")
+col_p1, col_p2 = st.columns(2, vertical_alignment="bottom")
+portfolio_years = col_p1.number_input("Years", min_value=1, max_value=5, value=1, key="portfolio_years")
+run_portfolio = col_p2.button("Run Portfolio Backtest")
+
+if run_portfolio:
+    from src.mtf_strategy import run_portfolio_backtest
+    with st.spinner("Backtesting watchlist..."):
+        report = run_portfolio_backtest(years=portfolio_years)
+
+    if "Error" in report:
+        st.error(report["Error"])
+    else:
+        summary = report["Portfolio"]
+        p_col1, p_col2, p_col3, p_col4 = st.columns(4)
+        p_col1.metric("Total Return (MTF)", summary["Total Return (MTF)"])
+        p_col2.metric("Buy & Hold (Equal Weight)", summary["Buy & Hold Return"])
+        p_col3.metric("Max Drawdown", summary["Max Drawdown"])
+        p_col4.metric("Avg Open Positions", summary["Avg Open Positions"])
+
+        st.line_chart(report["Equity"])
+        st.dataframe(report["Tickers"].sort_values("Total Return (MTF)", ascending=False), use_container_width=True)
@@ -0,0 +1,40 @@
+"""
+run_batch_training.py
+
+Nightly model run.
+Trains the Random Forest and XGBoost forecasters for every symbol in the watchlist
+(src/batch_training.py) on all cores and saves each ticker's next-N-day forecast to
+data/forecast_results.csv, where the dashboard and scanners read it. --pooled trains one
+model per type on the whole watchlist instead; --incremental updates each ticker's saved
+models with the new days and only refits them on schedule or after drift.
+"""
+import argparse
+import time
+from src.batch_training import run_batch, pool_shape, RESULTS_PATH, FORECAST_DAYS
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Velo watchlist batch training")
+    parser.add_argument("--years", type=int, default=5, help="Years of daily history to train on")
+    parser.add_argument("--days", type=int, default=FORECAST_DAYS, help="Forecast horizon in trading days")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per core)")
+    parser.add_argument("--tickers", nargs="*", default=None, help="Symbols to train (default: WATCHLIST)")
+    parser.add_argument("--pooled", action="store_true", help="One model per type for the whole watchlist")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Update the saved models instead of refitting them (src/incremental.py)")
+    args = parser.parse_args()
+
+    if args.pooled:
+        print("🧠 Training pooled forecasters for the whole watchlist...")
+    else:
+        workers, threads = pool_shape(args.workers)
+        print(f"🧠 Training forecasters with {workers} workers x {threads} threads...")
+
+    started = time.time()
+    table = run_batch(tickers=args.tickers, years=args.years, days=args.days, max_workers=args.workers,
+                      pooled=args.pooled, incremental=args.incremental)
+    print(f"✅ Done in {time.time() - started:.1f}s")
+
+    if not table.empty:
+        cols = [c for c in ["Ticker", "Model", "MAPE %", "Expected Return %", "Update", "Error"] if c in table.columns]
+        print(table[cols].to_string(index=False))
+        print(f"💾 Results saved to {RESULTS_PATH}")
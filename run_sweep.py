@@ -0,0 +1,36 @@
+"""
+run_sweep.py
+
+MTF parameter sweep.
+Evaluates every combination of the score weights, RSI bands, ADX cutoff and ATR
+stop/target multipliers in src/sweep.py (DEFAULT_GRID) against the cached daily
+history of the watchlist, and prints / saves the ranked table.
+"""
+import argparse
+import os
+import time
+from src.sweep import run_sweep, DEFAULT_GRID
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Velo MTF parameter sweep")
+    parser.add_argument("--years", type=int, default=5, help="Years of daily history to test on")
+    parser.add_argument("--max-days", type=int, default=30, help="Bars a signal may take to fill and resolve")
+    parser.add_argument("--top", type=int, default=20, help="Rows to print")
+    args = parser.parse_args()
+
+    combos = 1
+    for values in DEFAULT_GRID.values():
+        combos *= len(values)
+    print(f"🔬 Sweeping {combos} parameter combinations over {args.years}y of history...")
+
+    started = time.time()
+    table = run_sweep(years=args.years, max_days=args.max_days)
+    print(f"✅ Done in {time.time() - started:.1f}s")
+
+    if not table.empty:
+        print(table.head(args.top).to_string())
+        out_path = os.path.join(DATA_DIR, "sweep_results.csv")
+        table.to_csv(out_path, index=False)
+        print(f"💾 Full table saved to {out_path}")
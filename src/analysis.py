@@ -1,5 +1,5 @@
 import pandas as pd
-import ta
+from src.indicators import compute_indicators
 
 def calculate_technical_indicators(df):
     """
@@ -8,35 +8,35 @@ def calculate_technical_indicators(df):
     if df.empty:
         return df
     
+    ind = compute_indicators(df, ["rsi14", "macd", "bb20", "sma50", "ema20", "return", "atr14", "stoch14", "obv"])
+    
     # RSI
-    df['RSI'] = ta.momentum.rsi(df['Close'], window=14)
+    df['RSI'] = ind['rsi14']
     
     # MACD
-    macd = ta.trend.MACD(df['Close'])
-    df['MACD'] = macd.macd()
-    df['MACD_Signal'] = macd.macd_signal()
+    df['MACD'] = ind['macd']
+    df['MACD_Signal'] = ind['macd_signal']
     
     # Bollinger Bands
-    bollinger = ta.volatility.BollingerBands(df['Close'])
-    df['BB_High'] = bollinger.bollinger_hband()
-    df['BB_Low'] = bollinger.bollinger_lband()
+    df['BB_High'] = ind['bb20_high']
+    df['BB_Low'] = ind['bb20_low']
     
     # Moving Averages
-    df['SMA_50'] = ta.trend.sma_indicator(df['Close'], window=50)
-    df['EMA_20'] = ta.trend.ema_indicator(df['Close'], window=20)
+    df['SMA_50'] = ind['sma50']
+    df['EMA_20'] = ind['ema20']
     
     # Daily Return (needed for model)
-    df['Daily_Return'] = df['Close'].pct_change()
+    df['Daily_Return'] = ind['return']
 
     # ATR (Average True Range)
-    df['ATR'] = ta.volatility.average_true_range(df['High'], df['Low'], df['Close'], window=14)
+    df['ATR'] = ind['atr14']
     
     # Stochastic Oscillator
-    df['Stoch_K'] = ta.momentum.stoch(df['High'], df['Low'], df['Close'], window=14, smooth_window=3)
-    df['Stoch_D'] = ta.momentum.stoch_signal(df['High'], df['Low'], df['Close'], window=14, smooth_window=3)
+    df['Stoch_K'] = ind['stoch14_k']
+    df['Stoch_D'] = ind['stoch14_d']
     
     # OBV (On-Balance Volume)
-    df['OBV'] = ta.volume.on_balance_volume(df['Close'], df['Volume'])
+    df['OBV'] = ind['obv']
     
     return df
 
@@ -0,0 +1,209 @@
+"""
+batch_training.py
+
+Nightly forecasting run over the whole watchlist.
+Handles:
+- Daily history for every ticker from the cached panel (src/panel.py) and the technical
+  indicators of src/analysis.py, computed once per ticker.
+- Training the Random Forest and XGBoost models of src/model.py for every ticker in a
+  process pool, one ticker per task. Each worker's native thread pools (OpenMP/BLAS and
+  XGBoost's own) are capped so that workers x threads never exceeds the cores.
+- An incremental mode: each ticker's persisted model is updated with the new days
+  (src/incremental.py) instead of refitted, except on its refit schedule or after drift.
+- A pooled mode: one cross-sectional model per type for the whole universe (src/model.py,
+  train_pooled_model) and one batched predict call for every ticker's forecast.
+- A results table (data/forecast_results.csv): one row per ticker and model with the test
+  MAPE, the model cache key (to load the fitted model) and the next-N-day forecast.
+"""
+import os
+import time
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+RESULTS_PATH = os.path.join(DATA_DIR, "forecast_results.csv")
+
+BATCH_MODELS = ["Random Forest", "XGBoost"]
+FORECAST_DAYS = 10
+THREAD_ENV = ["OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"]
+
+
+# --- WORKERS ---
+
+def pool_shape(max_workers=None, cores=None):
+    """(workers, threads per worker) that use every core once."""
+    cores = cores or os.cpu_count() or 1
+    workers = max(1, min(max_workers or cores, cores))
+    return workers, max(1, cores // workers)
+
+def limit_threads(threads):
+    """Pool initializer: caps the worker's native thread pools at `threads`."""
+    for var in THREAD_ENV:
+        os.environ[var] = str(threads)
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(threads)
+    except ImportError:
+        pass
+    try:
+        import xgboost
+        xgboost.set_config(nthread=threads)
+    except ImportError:
+        pass
+
+def train_ticker(ticker, df, models=None, days=FORECAST_DAYS, incremental=False):
+    """
+    Trains `models` on one ticker's indicator frame; returns one results row per model.
+    `incremental` updates the persisted models (src/incremental.py); their MAPE % is then
+    the one-step holdout price MAPE of the last full refit.
+    """
+    from src.model import train_model, train_xgboost_model, predict_future
+
+    trainers = {"Random Forest": train_model, "XGBoost": train_xgboost_model}
+    rows = []
+    for model_type in models or BATCH_MODELS:
+        start = time.time()
+        row = result_row(ticker, model_type, df)
+        try:
+            if incremental:
+                model, metrics = incremental_fit(ticker, df, model_type)
+            else:
+                model, metrics, _ = trainers[model_type](df, ticker=ticker)
+            if model is None:
+                raise ValueError(metrics.get("error", "training failed"))
+            forecast = predict_future(model, df, days=days, model_type=model_type)
+            row.update(forecast_fields(forecast, row["Last Close"], metrics["MAPE"], metrics))
+            if incremental:
+                row["Update"] = metrics["Update"]
+        except Exception as e:
+            row["Error"] = str(e)
+        row["Seconds"] = round(time.time() - start, 2)
+        rows.append(row)
+    return rows
+
+def incremental_fit(ticker, df, model_type):
+    """(model, metrics) from incremental_update, shaped like the trainers' metrics."""
+    from src.incremental import incremental_update, state_key
+
+    model, info = incremental_update(df, ticker, model_type)
+    if model is None:
+        return None, info
+    return model, {**info, "MAPE": info["Baseline MAPE"], "Cache Key": state_key(ticker, model_type),
+                   "Cached": info["Update"] == "none"}
+
+def result_row(ticker, model, df):
+    return {"Ticker": ticker, "Model": model, "Last Date": df.index[-1].strftime('%Y-%m-%d'),
+            "Last Close": round(float(df['Close'].iloc[-1]), 2)}
+
+def forecast_fields(forecast, last_close, mape, metrics):
+    fields = {"MAPE %": round(mape * 100, 2), "Cache Key": metrics.get("Cache Key"),
+              "Cached": bool(metrics.get("Cached", False)),
+              "Expected Return %": round((forecast[-1] / last_close - 1) * 100, 2)}
+    fields.update({f"Day {i + 1}": round(float(price), 2) for i, price in enumerate(forecast)})
+    return fields
+
+def train_pooled(frames, models=None, days=FORECAST_DAYS):
+    """
+    One pooled model per model type for all tickers (train_pooled_model), predicting days
+    1..days directly, as results rows named "Pooled <model>". Their MAPE % is the ticker's
+    test error averaged over the horizons.
+    """
+    from src.model import stack_features, train_pooled_model, predict_pooled
+
+    data, _ = stack_features(frames)
+    rows = []
+    for model_type in models or BATCH_MODELS:
+        start = time.time()
+        name = f"Pooled {model_type}"
+        model, metrics, _ = train_pooled_model(data, horizon=days, model_type=model_type)
+        forecast = predict_pooled(model, frames, days=days) if model is not None else pd.DataFrame()
+        for ticker, df in frames.items():
+            row = result_row(ticker, name, df)
+            if ticker in forecast.index:
+                row.update(forecast_fields(forecast.loc[ticker].to_numpy(), row["Last Close"],
+                                           metrics["MAPE by Ticker"].get(ticker, metrics["MAPE"]), metrics))
+            else:
+                row["Error"] = metrics.get("error", "No complete feature row")
+            rows.append(row)
+        seconds = round(time.time() - start, 2)
+        for row in rows[-len(frames):]:
+            row["Seconds"] = seconds
+    return rows
+
+
+# --- BATCH RUN ---
+
+def ticker_frames(tickers, years=5):
+    """{ticker: daily OHLCV + indicators} from the cached panel (tickers without data are skipped)."""
+    from src import panel as pn
+    from src.analysis import calculate_technical_indicators
+
+    panel = pn.load_panel_cached(list(tickers), period=f"{years}y", interval="1d")
+    frames = {}
+    if not panel or panel['Close'].empty:
+        return frames
+    for ticker in panel['Close'].columns:
+        df = pd.DataFrame({field: panel[field][ticker] for field in pn.FIELDS}).dropna()
+        df.index.name = "Date"
+        if len(df):
+            frames[ticker] = calculate_technical_indicators(df)
+    return frames
+
+def run_batch(tickers=None, years=5, days=FORECAST_DAYS, models=None, max_workers=None,
+              results_path=None, frames=None, pooled=False, incremental=False):
+    """
+    Trains `models` for every ticker (WATCHLIST by default) and saves the results table,
+    replacing the rows of the tickers and models in this run. Returns the rows of this run.
+    `frames` ({ticker: indicator frame}) skips the download. `pooled` trains one model per
+    type for the whole universe instead (in this process, on every core); `incremental`
+    updates each ticker's persisted models instead of refitting them.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from src.config import WATCHLIST
+
+    if frames is None:
+        frames = ticker_frames(WATCHLIST if tickers is None else tickers, years=years)
+    if not frames:
+        print("❌ Batch training: no data available.")
+        return pd.DataFrame()
+
+    if pooled:
+        rows = train_pooled(frames, models, days)
+    else:
+        workers, threads = pool_shape(max_workers)
+        workers = min(workers, len(frames))
+        rows = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=limit_threads, initargs=(threads,)) as pool:
+            futures = {pool.submit(train_ticker, t, df, models, days, incremental): t for t, df in frames.items()}
+            for future in as_completed(futures):
+                try:
+                    rows.extend(future.result())
+                except Exception as e:  # A worker that died
+                    rows.append({"Ticker": futures[future], "Error": str(e)})
+
+    table = pd.DataFrame(rows)
+    table["Trained At"] = pd.Timestamp.now().strftime('%Y-%m-%d %H:%M')
+    table = table.sort_values(["Ticker", "Model"]).reset_index(drop=True)
+    save_results(table, results_path)
+    return table
+
+def save_results(table, results_path=None):
+    """Writes `table` into the results file, keeping the (ticker, model) rows it does not cover."""
+    path = results_path or RESULTS_PATH
+    old = load_results(path)
+    if not old.empty:
+        keys = pd.MultiIndex.from_frame(table[["Ticker", "Model"]])
+        kept = ~pd.MultiIndex.from_frame(old[["Ticker", "Model"]]).isin(keys)
+        table = pd.concat([old[kept], table], ignore_index=True)
+    day_cols = sorted([c for c in table.columns if c.startswith("Day ")], key=lambda c: int(c.split()[1]))
+    table = table[[c for c in table.columns if c not in day_cols] + day_cols]
+    if not os.path.exists(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    table.sort_values(["Ticker", "Model"]).to_csv(path, index=False)
+
+def load_results(path=None, ticker=None):
+    """The saved results table (optionally one ticker's rows); empty if no batch has run."""
+    path = path or RESULTS_PATH
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    table = pd.read_csv(path)
+    return table[table["Ticker"] == ticker] if ticker else table
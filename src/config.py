@@ -27,6 +27,15 @@ MAX_STOCKS_TO_MONITOR = 100
 if len(WATCHLIST) > MAX_STOCKS_TO_MONITOR:
     pass
 
+# --- INTRADAY PRE-FILTER ---
+# Daily-bar screen applied before any 5m download (see src/prefilter.py). Set a value to None to disable it.
+PREFILTER = {
+    "min_atr_pct": 1.0,       # 14-day ATR as % of last close
+    "min_turnover": 1e8,      # 20-day average Close * Volume (₹10 Cr)
+    "min_gap_pct": None,      # |Open / Prev Close - 1| in %
+    "max_gap_pct": 5.0
+}
+
 # --- SECTOR MAPPING ---
 # Maps specific stocks to their Sector Index Ticker
 SECTOR_MAP = {
@@ -1,7 +1,9 @@
-import yfinance as yf
+from src.lazy_imports import lazy
 import pandas as pd
 import streamlit as st
 
+yf = lazy("yfinance")  # Imported on the first download
+
 @st.cache_data(ttl=300) # Cache for 5 minutes
 def fetch_stock_data(ticker, period="max"):
     """
@@ -0,0 +1,202 @@
+"""
+forecast_eval.py
+
+Rolling-origin evaluation of the six forecasting models of src/model.py.
+Handles:
+- Forecast origins over the last `test_fraction` of the history (every trading day with a
+  next day), grouped into folds of `refit_every` origins. Each fold refits the model once on
+  the data up to its first origin; the other origins of the fold reuse it with the newly
+  observed days (RF/XGBoost roll the recursive forecast from the latest bar, ARIMA extends
+  its filter, Holt-Winters reruns with the fitted parameters, Prophet predicts further out).
+- Fold starts on multiples of `refit_every`, so a history with a few more days keeps the
+  old folds, whose forecasts come from src.model_cache.
+- All (model, fold) tasks in one process pool, each worker's native thread pools capped so
+  that workers x threads never exceeds the cores (src/batch_training.py).
+- MAPE by horizon (1..`horizon` trading days ahead) per model.
+
+Horizons count trading days (rows), unlike train_arima_model / train_holtwinters_model,
+which fit on a business-day calendar.
+"""
+import time
+import warnings
+import numpy as np
+import pandas as pd
+from src import model_cache
+
+HORIZON = 10
+REFIT_EVERY = 20
+TEST_FRACTION = 0.2
+MIN_TRAIN = 60
+MA_WINDOW = 20  # train_moving_average_model's default
+
+_shared = {}
+
+
+def fold_bounds(n_rows, refit_every=REFIT_EVERY, test_fraction=TEST_FRACTION, min_train=MIN_TRAIN):
+    """(start, end) origin ranges, one per refit; origins are row positions with at least one row after them."""
+    first = max(int(n_rows * (1 - test_fraction)) // refit_every * refit_every, min_train)
+    last = n_rows - 1
+    return [(start, min(start + refit_every, last)) for start in range(first, last, refit_every)]
+
+def actuals(close, origins, horizon):
+    """(origins x horizon) Close h rows after each origin (NaN past the end)."""
+    idx = np.asarray(origins)[:, None] + np.arange(1, horizon + 1)
+    out = np.full(idx.shape, np.nan)
+    inside = idx < len(close)
+    out[inside] = close[idx[inside]]
+    return out
+
+
+# --- FOLDS ---
+
+def _tree_fold(model_type, df, start, end, horizon, sentiment_score):
+    from src.model import prepare_features, recursive_forecast
+    from src.tuning import base_estimator
+
+    data, feature_cols = prepare_features(df, sentiment_score)
+    train = data[data.index < df.index[start]]  # Rows whose next-day return is known at the first origin
+    if len(train) < 50:
+        raise ValueError("Not enough data to train model")
+    model = base_estimator(model_type)
+    model.fit(train[feature_cols + ['Sentiment']], train['Target'])
+    return [recursive_forecast(model, df.iloc[:t + 1], days=horizon, sentiment_score=sentiment_score)
+            for t in range(start, end)]
+
+def _arima_fold(close, start, end, horizon):
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+    results = SARIMAX(close[:start + 1], order=(1, 1, 1), seasonal_order=(0, 0, 0, 0)).fit(disp=False)
+    preds = []
+    for t in range(start, end):
+        if t > start:
+            results = results.extend(close[t:t + 1])  # New day through the fitted filter, no refit
+        preds.append(results.forecast(horizon))
+    return preds
+
+def _holtwinters_fold(close, start, end, horizon):
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+    params = ExponentialSmoothing(close[:start + 1], trend='add', seasonal=None).fit().params
+    preds = []
+    for t in range(start, end):
+        model = ExponentialSmoothing(close[:t + 1], trend='add', seasonal=None, initialization_method='known',
+                                     initial_level=params['initial_level'], initial_trend=params['initial_trend'])
+        fit = model.fit(smoothing_level=params['smoothing_level'], smoothing_trend=params['smoothing_trend'],
+                        optimized=False)
+        preds.append(fit.forecast(horizon))
+    return preds
+
+def _prophet_fold(df, start, end, horizon):
+    import logging
+    from prophet import Prophet
+
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+    dates = df.index.tz_localize(None) if df.index.tz is not None else df.index
+    model = Prophet(daily_seasonality=True)
+    model.fit(pd.DataFrame({'ds': dates[:start + 1], 'y': df['Close'].to_numpy()[:start + 1]}))
+    future = dates[start + 1:min(end - 1 + horizon, len(df) - 1) + 1]
+    yhat = model.predict(pd.DataFrame({'ds': future}))['yhat'].to_numpy()
+    yhat = np.concatenate([yhat, np.full(horizon, np.nan)])
+    return [yhat[t - start:t - start + horizon] for t in range(start, end)]
+
+def forecast_fold(model_type, df, start, end, horizon=HORIZON, sentiment_score=0):
+    """
+    (end - start) x horizon price forecasts from origins start..end-1, with the model fitted
+    once on df[:start + 1]. Only rows up to end - 1 + horizon are used (Prophet needs their dates).
+    """
+    if model_type in ("Random Forest", "XGBoost"):
+        preds = _tree_fold(model_type, df, start, end, horizon, sentiment_score)
+    elif model_type == "Moving Average":
+        close = df['Close'].to_numpy(float)
+        preds = [np.full(horizon, close[max(t + 1 - MA_WINDOW, 0):t + 1].mean()) for t in range(start, end)]
+    elif model_type == "Prophet":
+        preds = _prophet_fold(df, start, end, horizon)
+    else:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            close = df['Close'].to_numpy(float)
+            fold = _arima_fold if model_type == "ARIMA" else _holtwinters_fold
+            preds = fold(close, start, end, horizon)
+    return np.asarray(preds, dtype=float).reshape(end - start, horizon)
+
+def cached_fold(model_type, df, start, end, horizon=HORIZON, sentiment_score=0, ticker=None):
+    """forecast_fold through src.model_cache, keyed on the rows the fold depends on."""
+    used = df.iloc[:min(end + horizon, len(df))]
+    key = model_cache.make_key(ticker, f"{model_type} Backtest", model_cache.fingerprint(used),
+                               params={'start': start, 'end': end, 'horizon': horizon, 'sentiment': sentiment_score})
+    return model_cache.get_or_compute(key, lambda: forecast_fold(model_type, used, start, end, horizon, sentiment_score))
+
+def _init_worker(df, sentiment_score, ticker, threads=None):
+    """Pool initializer: the history is sent to each worker once; native thread pools are capped at `threads`."""
+    from src.batch_training import limit_threads
+
+    _shared.update(df=df, sentiment_score=sentiment_score, ticker=ticker)
+    if threads:
+        limit_threads(threads)
+
+def _fold_task(model_type, start, end, horizon):
+    started = time.time()
+    preds = cached_fold(model_type, _shared['df'], start, end, horizon, _shared['sentiment_score'], _shared['ticker'])
+    return preds, time.time() - started
+
+
+# --- BACKTEST ---
+
+def backtest(df, model_types=None, horizon=HORIZON, refit_every=REFIT_EVERY, test_fraction=TEST_FRACTION,
+             sentiment_score=0, ticker=None, max_workers=None):
+    """
+    Rolling-origin backtest of `model_types` (all six by default) on an indicator frame.
+    Returns (summary, by_horizon, forecasts):
+    - summary: one row per model with the mean MAPE % over the horizons, the 1-day and
+      last-horizon MAPE %, origins, refits, compute seconds and any error.
+    - by_horizon: MAPE % indexed by horizon (1..horizon), one column per model.
+    - forecasts: model -> DataFrame of forecast prices (origin date x horizon).
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from src.batch_training import pool_shape
+    from src.model import MODEL_TYPES
+
+    model_types = list(model_types or MODEL_TYPES)
+    folds = fold_bounds(len(df), refit_every, test_fraction)
+    if not folds:
+        return pd.DataFrame(), pd.DataFrame(), {}
+
+    workers, threads = pool_shape(max_workers or len(model_types) * len(folds))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(df, sentiment_score, ticker, threads)) as pool:
+        futures = {(m, s, e): pool.submit(_fold_task, m, s, e, horizon) for m in model_types for s, e in folds}
+
+    close = df['Close'].to_numpy(float)
+    origins = np.arange(folds[0][0], folds[-1][1])
+    actual = actuals(close, origins, horizon)
+    rows, by_horizon, forecasts = [], {}, {}
+    for model_type in model_types:
+        parts, seconds, error = [], 0.0, ""
+        for start, end in folds:
+            try:
+                preds, took = futures[(model_type, start, end)].result()
+                seconds += took
+            except Exception as e:
+                preds, error = np.full((end - start, horizon), np.nan), str(e)
+            parts.append(preds)
+        preds = np.vstack(parts)
+        ape = np.abs(preds - actual) / actual
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # Horizons no origin reaches
+            mape = np.nanmean(ape, axis=0) * 100
+        by_horizon[model_type] = mape
+        forecasts[model_type] = pd.DataFrame(preds, index=df.index[origins], columns=range(1, horizon + 1))
+        rows.append({
+            "Model": model_type,
+            "MAPE %": round(float(np.nanmean(mape)), 2) if np.isfinite(mape).any() else np.nan,
+            "1-Day MAPE %": round(float(mape[0]), 2),
+            f"{horizon}-Day MAPE %": round(float(mape[-1]), 2),
+            "Origins": len(origins),
+            "Refits": len(folds),
+            "Seconds": round(seconds, 2),
+            "Error": error
+        })
+
+    summary = pd.DataFrame(rows).sort_values("MAPE %", na_position='last').set_index("Model")
+    by_horizon = pd.DataFrame(by_horizon, index=pd.RangeIndex(1, horizon + 1, name="Horizon")).round(2)
+    return summary, by_horizon, forecasts
@@ -0,0 +1,135 @@
+"""
+incremental.py
+
+Day-to-day retraining of the Random Forest / XGBoost forecasters without refitting from zero.
+Handles:
+- A sliding training window (the last `window` rows with a known next-day return).
+- Incremental updates: the Random Forest swaps its oldest trees for new ones grown on the
+  current window (warm_start), XGBoost adds boosting rounds to the saved booster.
+- Persisting each ticker's model and retraining state between runs (src/model_cache.py).
+- Full refits on a schedule (every `full_refit_days` updates) or when the model's error on
+  the days it had not seen yet drifts above its holdout error at the last full refit.
+"""
+import numpy as np
+from src import model_cache
+
+INCREMENTAL_WINDOW = 500  # Rows the trees are grown on
+STEP = 10                 # RF trees replaced / XGBoost rounds added per update
+FULL_REFIT_DAYS = 20      # Updates before a scheduled full refit
+DRIFT_RATIO = 1.5         # Full refit once the recent error is 50% above the baseline
+DRIFT_DAYS = 10           # Recent errors kept (the first DRIFT_MIN_DAYS are not judged)
+DRIFT_MIN_DAYS = 5
+HOLDOUT = 0.2             # Share of the window a full refit holds out to set the baseline
+
+
+def state_key(ticker, model_type):
+    return model_cache.make_key(ticker, f"{model_type} Incremental", "latest")
+
+def load_state(ticker, model_type):
+    """Persisted model and retraining state of a ticker, or None."""
+    return model_cache.load(state_key(ticker, model_type))
+
+def extend(model, X, y, model_type, step=STEP, seed=0):
+    """
+    One incremental step on (X, y). Random Forest: grows `step` trees and drops the `step`
+    oldest, so the forest size stays fixed. XGBoost: `step` more boosting rounds from the
+    current booster. Returns the updated model.
+    """
+    if model_type == "Random Forest":
+        model.set_params(warm_start=True, n_estimators=len(model.estimators_) + step, random_state=seed)
+        model.fit(X, y)
+        model.estimators_ = model.estimators_[step:]
+        model.set_params(n_estimators=len(model.estimators_))
+        return model
+    from xgboost import XGBRegressor
+    updated = XGBRegressor(**{**model.get_params(), 'n_estimators': step})
+    updated.fit(X, y, xgb_model=model.get_booster())
+    return updated.set_params(n_estimators=updated.get_booster().num_boosted_rounds())
+
+def full_refit(X, y, model_type):
+    """
+    Fits the base estimator on the first (1 - HOLDOUT) of the window to score the holdout,
+    then refits it from scratch on the whole window.
+    Returns (model, baseline, baseline MAPE): the holdout mean absolute error of the next-day
+    return (the drift baseline) and the matching one-step price MAPE (as train_model reports it).
+    """
+    from src.tuning import base_estimator
+
+    split = int(len(X) * (1 - HOLDOUT))
+    model = base_estimator(model_type)
+    model.fit(X.iloc[:split], y.iloc[:split])
+    actual = y.iloc[split:].to_numpy()
+    error = np.abs(model.predict(X.iloc[split:]) - actual)
+    # Price error of Close * (1 + return) relative to the actual price Close * (1 + actual return)
+    baseline, baseline_mape = float(np.mean(error)), float(np.mean(error / np.abs(1 + actual)))
+
+    model = base_estimator(model_type)
+    model.fit(X, y)
+    return model, baseline, baseline_mape
+
+def needs_refit(state, full_refit_days=FULL_REFIT_DAYS, drift_ratio=DRIFT_RATIO):
+    """Reason for a full refit ("schedule" / "drift"), or None."""
+    if state["updates"] >= full_refit_days:
+        return "schedule"
+    errors = state["errors"]
+    if len(errors) >= DRIFT_MIN_DAYS and np.mean(errors) > drift_ratio * state["baseline"]:
+        return "drift"
+    return None
+
+
+def incremental_update(df, ticker, model_type="Random Forest", sentiment_score=0, window=INCREMENTAL_WINDOW,
+                       step=STEP, full_refit_days=FULL_REFIT_DAYS, drift_ratio=DRIFT_RATIO, force_full=False):
+    """
+    Brings the ticker's persisted model up to date with `df`.
+    - No saved model, a changed feature set, history that no longer contains the last
+      trained day or a state saved by an older version: full refit.
+    - Otherwise the rows after the last trained day are first scored with the current model
+      (their errors feed the drift check), then: full refit if needs_refit says so, else one
+      incremental step on the sliding window.
+    Returns (model, info) where info["Update"] is "full", "incremental" or "none".
+    """
+    from src.model import prepare_features
+
+    data, feature_cols = prepare_features(df, sentiment_score)
+    feature_cols = feature_cols + ['Sentiment']
+    data = data.iloc[-window:]
+    if len(data) < 50:
+        return None, {"error": "Not enough data to train model"}
+    X, y = data[feature_cols], data['Target']
+    last_date = data.index[-1]
+
+    state = None if force_full else load_state(ticker, model_type)
+    reason = "forced" if force_full else "no saved model"
+    if state is not None:
+        if state["feature_cols"] != feature_cols or state["last_date"] not in data.index:
+            state, reason = None, "history changed"
+        elif "baseline_mape" not in state:
+            state, reason = None, "old state"
+
+    if state is not None:
+        new = data.index > state["last_date"]
+        if not new.any():
+            return state["model"], _info(state, "none", None)
+        errors = np.abs(state["model"].predict(X[new]) - y[new].to_numpy())
+        state["errors"] = (state["errors"] + list(errors))[-DRIFT_DAYS:]
+        reason = needs_refit(state, full_refit_days, drift_ratio)
+
+    if state is None or reason:
+        model, baseline, baseline_mape = full_refit(X, y, model_type)
+        state = {"model": model, "model_type": model_type, "feature_cols": feature_cols, "baseline": baseline,
+                 "baseline_mape": baseline_mape, "errors": [], "updates": 0, "full_refit_date": last_date}
+        update = "full"
+    else:
+        state["updates"] += 1
+        state["model"] = extend(state["model"], X, y, model_type, step, seed=state["updates"])
+        update, reason = "incremental", None
+
+    state["last_date"] = last_date
+    model_cache.save(state_key(ticker, model_type), state)
+    return state["model"], _info(state, update, reason)
+
+def _info(state, update, reason):
+    return {"Update": update, "Reason": reason, "Updates Since Refit": state["updates"],
+            "Last Full Refit": state["full_refit_date"], "Baseline MAE": round(state["baseline"], 6),
+            "Baseline MAPE": round(state["baseline_mape"], 6),
+            "Recent MAE": round(float(np.mean(state["errors"])), 6) if state["errors"] else None}
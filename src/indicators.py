@@ -0,0 +1,364 @@
+"""
+indicators.py
+
+Pure-NumPy indicator kernels shared by every strategy.
+Handles:
+- Contiguous float64 extraction of the OHLCV columns (once per frame).
+- Kernels for EMA/SMA, RSI, MACD, Bollinger Bands, ATR, VWAP, Stochastic, OBV, ADX and VPT,
+  running down axis 0 so the same code serves one series and a dates x tickers panel.
+- compute_indicators(): evaluates a requested set of indicators in a single pass,
+  sharing intermediates (close diff, true range, EMAs) between them.
+
+Kernels follow the `ta` library conventions (warm-up rows are NaN, ATR is seeded
+with the simple mean of the first window) so values match what the strategies
+produced before, and `tests/test_indicators.py` checks that parity.
+"""
+import re
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# --- LOW LEVEL HELPERS ---
+# Every kernel runs down axis 0: a 1-D series is one column, a (dates x tickers) matrix
+# (src/panel.py) is processed for every ticker in the same pass. Leading NaN rows (a ticker
+# listed later than the others) are each column's warm-up.
+
+def as_array(values):
+    """Returns a Series/DataFrame/list/array as a contiguous float64 array (no copy if it already is one)."""
+    if hasattr(values, 'to_numpy'):
+        values = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+def _rows(x):
+    """Row numbers shaped to broadcast against x."""
+    return np.arange(len(x)).reshape((-1,) + (1,) * (x.ndim - 1))
+
+def first_valid(x):
+    """Row of the first non-NaN value of each column (len(x) for an all-NaN column)."""
+    valid = ~np.isnan(x)
+    return np.where(valid.any(axis=0), valid.argmax(axis=0), len(x))
+
+def mask_warmup(x, start, periods):
+    """Sets the first `periods` rows of each column (counted from its `start` row) to NaN."""
+    x[_rows(x) < start + periods] = np.nan
+    return x
+
+def ffill(x):
+    """Forward-fills interior NaNs down each column (leading NaNs are kept)."""
+    mask = np.isnan(x)
+    if not mask.any():
+        return x
+    idx = np.where(~mask, _rows(x), 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return np.take_along_axis(x, idx, axis=0)
+
+def ewm(values, alpha, start=None, init=None, min_periods=0):
+    """
+    Exponential smoothing y[t] = (1 - alpha) * y[t-1] + alpha * x[t]
+    (pandas `ewm(adjust=False)`), vectorised block-wise instead of a Python loop.
+
+    start: first row of the recursion, per column (defaults to the first non-NaN value).
+    init: seed value for y[start] (defaults to x[start]).
+    min_periods: number of observations before output is unmasked.
+    """
+    x = ffill(as_array(values))
+    n = len(x)
+    out = np.full(x.shape, np.nan)
+    if n == 0:
+        return out
+    start = np.broadcast_to(first_valid(x) if start is None else start, x.shape[1:])
+    at_start = np.minimum(start, n - 1).reshape((1,) + x.shape[1:])
+    seed = np.take_along_axis(x, at_start, axis=0)[0] if init is None else np.broadcast_to(init, x.shape[1:])
+    before = _rows(x) < start
+    decay = 1.0 - alpha
+
+    if decay <= 0:
+        out[:] = x
+        np.put_along_axis(out, at_start, seed, axis=0)
+    else:
+        # Every column runs from row 0 with y = 0 before its start; an input of seed / alpha
+        # on the start row makes y[start] = seed. Closed form inside a block:
+        # y[k+j] = d^(j+1) * prev + a * d^j * cumsum(z * d^-i), blocks sized so d^-B stays
+        # well inside float64 range.
+        z = np.where(before, 0.0, x)
+        np.put_along_axis(z, at_start, seed / alpha, axis=0)
+        block = max(1, int(150 * np.log(10) / -np.log(decay)))
+        prev = np.zeros(x.shape[1:])
+        pos = 0
+        while pos < n:
+            chunk = z[pos:pos + block]
+            powers = decay ** _rows(chunk)
+            acc = np.cumsum(chunk / powers, axis=0)
+            out[pos:pos + len(chunk)] = decay * powers * prev + alpha * powers * acc
+            prev = out[pos + len(chunk) - 1]
+            pos += len(chunk)
+
+    out[before] = np.nan
+    if min_periods > 1:
+        mask_warmup(out, start, min_periods - 1)
+    return out
+
+def ema(values, span, min_periods=None):
+    """EMA with `span` (ta.trend.ema_indicator semantics: NaN until `span` values are seen)."""
+    if min_periods is None:
+        min_periods = span
+    return ewm(values, 2.0 / (span + 1), min_periods=min_periods)
+
+def wilder(values, window, min_periods=0):
+    """Wilder's smoothing (alpha = 1 / window)."""
+    return ewm(values, 1.0 / window, min_periods=min_periods)
+
+def _rolling(x, window, func):
+    out = np.full(x.shape, np.nan)
+    if window <= len(x):
+        out[window - 1:] = func(sliding_window_view(x, window, axis=0), axis=-1)
+    return out
+
+def sma(values, window):
+    """Rolling mean (NaN until `window` rows, NaN if any value in the window is)."""
+    return _rolling(as_array(values), window, np.mean)
+
+def rolling_sum(values, window):
+    return _rolling(as_array(values), window, np.sum)
+
+def rolling_std(values, window, ddof=0):
+    x = as_array(values)
+    return _rolling(x, window, lambda w, axis: np.std(w, axis=axis, ddof=ddof))
+
+def rolling_min(values, window):
+    return _rolling(as_array(values), window, np.min)
+
+def rolling_max(values, window):
+    return _rolling(as_array(values), window, np.max)
+
+def diff(values):
+    x = as_array(values)
+    out = np.empty_like(x)
+    out[0] = np.nan
+    np.subtract(x[1:], x[:-1], out=out[1:])
+    return out
+
+def pct_change(values):
+    x = as_array(values)
+    out = np.empty_like(x)
+    out[0] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(x[1:], x[:-1], out=out[1:])
+    return out - 1.0
+
+def shift(values, periods=1):
+    x = as_array(values)
+    out = np.full_like(x, np.nan)
+    if periods < len(x):
+        out[periods:] = x[:len(x) - periods]
+    return out
+
+
+# --- INDICATOR KERNELS ---
+
+def true_range(high, low, close):
+    """max(H-L, |H-prevC|, |L-prevC|); the first bar falls back to H-L."""
+    high, low = as_array(high), as_array(low)
+    prev_close = shift(close)
+    tr = high - low
+    with np.errstate(invalid='ignore'):
+        np.fmax(tr, np.abs(high - prev_close), out=tr)
+        np.fmax(tr, np.abs(low - prev_close), out=tr)
+    return tr
+
+def rsi(close, window=14, smoothing="wilder", delta=None):
+    """
+    Relative Strength Index.
+    smoothing="wilder" matches ta.momentum.rsi; smoothing="sma" is the rolling-mean
+    variant used by the MTF scanner (NaN when there are no losses in the window).
+    """
+    if delta is None:
+        delta = diff(close)
+    up = np.where(delta > 0, delta, 0.0)
+    down = np.where(delta < 0, -delta, 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if smoothing == "sma":
+            gain = sma(up, window)
+            loss = sma(down, window)
+            loss[loss == 0] = np.nan
+            return mask_warmup(100 - (100 / (1 + gain / loss)), first_valid(as_array(close)), window - 1)
+
+        gain = wilder(up, window, min_periods=window)
+        loss = wilder(down, window, min_periods=window)
+        return np.where(loss == 0, 100.0, 100 - (100 / (1 + gain / loss)))
+
+def macd(close, fast=12, slow=26, signal=9, ema_fast=None, ema_slow=None):
+    """Returns (macd, macd_signal) like ta.trend.MACD."""
+    if ema_fast is None:
+        ema_fast = ema(close, fast)
+    if ema_slow is None:
+        ema_slow = ema(close, slow)
+    line = ema_fast - ema_slow
+    return line, ema(line, signal)
+
+def bollinger(close, window=20, window_dev=2):
+    """Returns (mid, high, low) like ta.volatility.BollingerBands."""
+    mid = sma(close, window)
+    std = rolling_std(close, window, ddof=0)
+    return mid, mid + window_dev * std, mid - window_dev * std
+
+def atr(high, low, close, window=14, tr=None):
+    """
+    Average True Range (ta.volatility.AverageTrueRange): seeded with the mean of the
+    first `window` true ranges, Wilder-smoothed afterwards, zero during warm-up.
+    """
+    if tr is None:
+        tr = true_range(high, low, close)
+    out = np.zeros(tr.shape)
+    if len(tr) < window:
+        return out
+    smoothed = ewm(tr, 1.0 / window, start=window - 1, init=tr[:window].mean(axis=0))
+    out[window - 1:] = smoothed[window - 1:]
+    return out
+
+def vwap(high, low, close, volume, window=14):
+    """Rolling VWAP over `window` bars (ta.volume.VolumeWeightedAveragePrice)."""
+    typical = (as_array(high) + as_array(low) + as_array(close)) / 3.0
+    volume = as_array(volume)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return rolling_sum(typical * volume, window) / rolling_sum(volume, window)
+
+def stochastic(high, low, close, window=14, smooth_window=3):
+    """Returns (%K, %D) like ta.momentum.stoch / stoch_signal."""
+    lowest = rolling_min(low, window)
+    highest = rolling_max(high, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = 100 * (as_array(close) - lowest) / (highest - lowest)
+    return k, sma(k, smooth_window)
+
+def obv(close, volume):
+    """On-Balance Volume (ta.volume.on_balance_volume)."""
+    close, volume = as_array(close), as_array(volume)
+    falling = np.zeros(close.shape, dtype=bool)
+    falling[1:] = close[1:] < close[:-1]
+    return np.cumsum(np.where(falling, -volume, volume), axis=0)
+
+def adx(high, low, close, window=14, tr=None):
+    """
+    Wilder ADX as used by the MTF scanner.
+    Returns (adx, plus_di, minus_di, atr) where atr is the Wilder-smoothed true range.
+    """
+    high, low = as_array(high), as_array(low)
+    if tr is None:
+        tr = true_range(high, low, close)
+    smoothed_tr = wilder(tr, window)
+
+    up_move = diff(high)
+    down_move = shift(low) - low
+    with np.errstate(invalid='ignore', divide='ignore'):
+        plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+        minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+
+        plus_di = 100 * (wilder(plus_dm, window) / smoothed_tr)
+        minus_di = 100 * (wilder(minus_dm, window) / smoothed_tr)
+
+        di_sum = plus_di + minus_di
+        di_sum[di_sum == 0] = np.nan
+        dx = 100 * (np.abs(plus_di - minus_di) / di_sum)
+    adx_line = np.nan_to_num(wilder(dx, window), nan=0.0)
+    return adx_line, plus_di, minus_di, smoothed_tr
+
+def vpt(close, volume, returns=None):
+    """Volume Price Trend: cumulative volume * pct change (NaN on each column's first bar)."""
+    if returns is None:
+        returns = pct_change(close)
+    out = np.nancumsum(as_array(volume) * returns, axis=0)
+    return mask_warmup(out, first_valid(as_array(close)), 1)
+
+
+# --- ONE-PASS DRIVER ---
+
+_TOKEN = re.compile(r"^([a-z_]+?)(\d*)$")
+
+class _Workspace:
+    """Holds the contiguous OHLCV arrays of one frame and memoises shared intermediates."""
+
+    def __init__(self, df):
+        self.columns = {}
+        self.df = df
+        self.memo = {}
+
+    def col(self, name):
+        if name not in self.columns:
+            self.columns[name] = as_array(self.df[name])
+        return self.columns[name]
+
+    def get(self, key, func):
+        if key not in self.memo:
+            self.memo[key] = func()
+        return self.memo[key]
+
+    def delta(self):
+        return self.get('delta', lambda: diff(self.col('Close')))
+
+    def returns(self):
+        return self.get('returns', lambda: pct_change(self.col('Close')))
+
+    def tr(self):
+        return self.get('tr', lambda: true_range(self.col('High'), self.col('Low'), self.col('Close')))
+
+    def ema(self, span):
+        return self.get(('ema', span), lambda: ema(self.col('Close'), span))
+
+
+def _compute_one(ws, name, window, out):
+    close = ws.col('Close')
+    if name == 'ema':
+        out[f'ema{window}'] = ws.ema(window)
+    elif name == 'sma':
+        out[f'sma{window}'] = sma(close, window)
+    elif name == 'rsi':
+        out[f'rsi{window}'] = rsi(close, window, delta=ws.delta())
+    elif name == 'sma_rsi':
+        out[f'sma_rsi{window}'] = rsi(close, window, smoothing="sma", delta=ws.delta())
+    elif name == 'macd':
+        out['macd'], out['macd_signal'] = macd(close, ema_fast=ws.ema(12), ema_slow=ws.ema(26))
+    elif name == 'bb':
+        out[f'bb{window}_mid'], out[f'bb{window}_high'], out[f'bb{window}_low'] = bollinger(close, window)
+    elif name == 'atr':
+        out[f'atr{window}'] = atr(None, None, None, window, tr=ws.tr())
+    elif name == 'vwap':
+        out[f'vwap{window}'] = vwap(ws.col('High'), ws.col('Low'), close, ws.col('Volume'), window)
+    elif name == 'stoch':
+        out[f'stoch{window}_k'], out[f'stoch{window}_d'] = stochastic(ws.col('High'), ws.col('Low'), close, window)
+    elif name == 'obv':
+        out['obv'] = obv(close, ws.col('Volume'))
+    elif name == 'adx':
+        (out[f'adx{window}'], out[f'adx{window}_plus_di'],
+         out[f'adx{window}_minus_di'], out[f'adx{window}_atr']) = adx(ws.col('High'), ws.col('Low'), close, window, tr=ws.tr())
+    elif name == 'vpt':
+        out['vpt'] = vpt(close, ws.col('Volume'), returns=ws.returns())
+    elif name == 'return':
+        out['return'] = ws.returns()
+    else:
+        raise ValueError(f"Unknown indicator: {name}")
+
+_DEFAULT_WINDOWS = {'rsi': 14, 'sma_rsi': 14, 'atr': 14, 'adx': 14, 'vwap': 14, 'stoch': 14, 'bb': 20}
+
+def compute_indicators(df, names):
+    """
+    Computes a set of indicators for an OHLCV frame in one pass.
+
+    names: tokens such as "ema200", "sma50", "rsi14", "sma_rsi14", "macd", "bb20",
+           "atr14", "vwap14", "stoch14", "obv", "adx14", "vpt", "return".
+    Returns a dict of output name -> numpy array aligned with df.index.
+    Multi-output indicators expand to several keys
+    (macd -> macd/macd_signal, bb20 -> bb20_mid/bb20_high/bb20_low,
+     stoch14 -> stoch14_k/stoch14_d, adx14 -> adx14/adx14_plus_di/adx14_minus_di/adx14_atr).
+    """
+    ws = _Workspace(df)
+    out = {}
+    for token in names:
+        match = _TOKEN.match(token)
+        if not match:
+            raise ValueError(f"Unknown indicator: {token}")
+        name, window = match.group(1), match.group(2)
+        window = int(window) if window else _DEFAULT_WINDOWS.get(name)
+        _compute_one(ws, name, window, out)
+    return out
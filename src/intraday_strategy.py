@@ -1,14 +1,16 @@
-import yfinance as yf
+from src.lazy_imports import lazy
 import pandas as pd
-import ta
-from ta.trend import EMAIndicator, MACD
-from ta.volume import VolumeWeightedAveragePrice
-from ta.momentum import RSIIndicator
-from ta.volatility import BollingerBands
+from src.indicators import compute_indicators
+
+yf = lazy("yfinance")  # Imported on the first download
 
 # --- HIGH OCTANE INTRADAY LIST (High Beta + High Liquidity) ---
 from src.config import WATCHLIST
 
+# Points still available after the indicator checks (used by the early-exit bound)
+MARKET_POINTS = 10      # Nifty green/red
+SECTOR_MAX_POINTS = 20  # Sector aligned (penalties only lower the score)
+
 def get_vsa_signal(df):
     """Calculates Effort vs Result (VSA) logic"""
     # High volume + Bullish close in the top 30% of the day's range
@@ -27,7 +29,7 @@ def get_vsa_bear_signal(df):
     vol_ma = df['Volume'].rolling(window=20).mean()
     return (df['Volume'] > vol_ma) & (close_pos < 0.3)
 
-def calculate_confidence(ticker_symbol):
+def calculate_confidence(ticker_symbol, min_score=None):
     try:
         # 1. Fetch Intraday Data (5-minute intervals)
         df = yf.download(ticker_symbol, period='5d', interval='5m', progress=False)
@@ -42,92 +44,123 @@ def calculate_confidence(ticker_symbol):
         if isinstance(df_daily.columns, pd.MultiIndex):
             df_daily.columns = df_daily.columns.get_level_values(0)
 
-        prev_day_high = df_daily['High'].iloc[-2]
-        prev_day_low = df_daily['Low'].iloc[-2]
+        # 2. Indicators (one pass over the 5m arrays)
+        ind = compute_indicators(df, ["ema200", "vwap14", "rsi14", "macd", "bb20", "atr14"])
         
-        # 2. Indicators (using 'ta' library)
         # EMA
-        ema = EMAIndicator(close=df['Close'], window=200)
-        df['EMA200'] = ema.ema_indicator()
+        df['EMA200'] = ind['ema200']
         
         # VWAP
-        vwap = VolumeWeightedAveragePrice(high=df['High'], low=df['Low'], close=df['Close'], volume=df['Volume'])
-        df['VWAP'] = vwap.volume_weighted_average_price()
+        df['VWAP'] = ind['vwap14']
         
         # RSI
-        rsi = RSIIndicator(close=df['Close'], window=14)
-        df['RSI'] = rsi.rsi()
+        df['RSI'] = ind['rsi14']
         
         # MACD
-        macd = MACD(close=df['Close'])
-        df['MACD'] = macd.macd()
-        df['MACD_Sig'] = macd.macd_signal()
+        df['MACD'] = ind['macd']
+        df['MACD_Sig'] = ind['macd_signal']
         
         # Bollinger Bands
-        bb = BollingerBands(close=df['Close'], window=20, window_dev=2)
-        df['BB_Mid'] = bb.bollinger_mavg()
+        df['BB_Mid'] = ind['bb20_mid']
         
         # ATR
-        from ta.volatility import AverageTrueRange
-        atr_indicator = AverageTrueRange(high=df['High'], low=df['Low'], close=df['Close'], window=14)
-        df['ATR'] = atr_indicator.average_true_range()
-        current_atr = df['ATR'].iloc[-1]
+        df['ATR'] = ind['atr14']
 
         # 3. Logic Checks (Latest Candle)
-        last = df.iloc[-1]
-        
-        # --- BULL SCORING ---
-        bull_score = 0
-        bull_details = []
-        
-        if last['Close'] > last['EMA200']:
-            bull_score += 15
-            bull_details.append("Trend > EMA200")
-        if last['Close'] > last['VWAP']:
-            bull_score += 15
-            bull_details.append("Val > VWAP")
-        if get_vsa_signal(df).iloc[-1]:
-            bull_score += 15
-            bull_details.append("VSA Bull Vol")
-        if last['MACD'] > last['MACD_Sig']:
-            bull_score += 15
-            bull_details.append("MACD Bull Cross")
-        if last['Close'] > last['BB_Mid']:
-            bull_score += 10
-            bull_details.append("Price > BB Mid")
-        if last['RSI'] > 60:
-            bull_score += 10
-            bull_details.append("RSI Bullish (>60)")
-        if last['Close'] > prev_day_high:
-            bull_score += 10
-            bull_details.append("Breakout > PDH")
-
-        # --- BEAR SCORING ---
-        bear_score = 0
-        bear_details = []
-        
-        if last['Close'] < last['EMA200']:
-            bear_score += 15
-            bear_details.append("Trend < EMA200")
-        if last['Close'] < last['VWAP']:
-            bear_score += 15
-            bear_details.append("Val < VWAP")
-        if get_vsa_bear_signal(df).iloc[-1]:
-            bear_score += 15
-            bear_details.append("VSA Bear Vol")
-        if last['MACD'] < last['MACD_Sig']:
-            bear_score += 15
-            bear_details.append("MACD Bear Cross")
-        if last['Close'] < last['BB_Mid']:
-            bear_score += 10
-            bear_details.append("Price < BB Mid")
-        if last['RSI'] < 40:
-            bear_score += 10
-            bear_details.append("RSI Bearish (<40)")
-        if last['Close'] < prev_day_low:
-            bear_score += 10
-            bear_details.append("Breakdown < PDL")
+        last = df.iloc[-1].to_dict()
+        last['VSA_Bull'] = get_vsa_signal(df).iloc[-1]
+        last['VSA_Bear'] = get_vsa_bear_signal(df).iloc[-1]
+
+        return score_snapshot(ticker_symbol, last, df_daily, min_score)
+
+    except Exception as e:
+        return 0, [f"Error: {e}"], 0, 0, 0, 0, 0, 0, 0, 0, "NEUTRAL"
+
+def calculate_confidence_from_state(ticker_symbol, state, df_daily, min_score=None):
+    """
+    Same result as calculate_confidence, but reads the latest indicator values from an
+    incrementally updated src.streaming.IntradayIndicatorState instead of recomputing
+    them over 5 days of 5m bars.
+    """
+    try:
+        if state.bars == 0 or df_daily is None or df_daily.empty:
+            return 0, "No Data", 0, 0, 0, 0, 0, 0, 0, 0, "NEUTRAL"
+        return score_snapshot(ticker_symbol, state.snapshot(), df_daily, min_score)
+    except Exception as e:
+        return 0, [f"Error: {e}"], 0, 0, 0, 0, 0, 0, 0, 0, "NEUTRAL"
+
+def score_snapshot(ticker_symbol, last, df_daily, min_score=None):
+    """
+    Scores the latest 5m bar.
+    last: mapping with Close, EMA200, VWAP, RSI, MACD, MACD_Sig, BB_Mid, ATR, VSA_Bull, VSA_Bear.
+    min_score: if set, the Nifty and sector lookups are skipped as soon as neither side can
+               reach it; the returned score is then the partial (indicator-only) score.
+    Returns the 11-value tuple of calculate_confidence.
+    """
+    prev_day_high = df_daily['High'].iloc[-2]
+    prev_day_low = df_daily['Low'].iloc[-2]
+    current_atr = last['ATR']
+    
+    # --- BULL SCORING ---
+    bull_score = 0
+    bull_details = []
+    
+    if last['Close'] > last['EMA200']:
+        bull_score += 15
+        bull_details.append("Trend > EMA200")
+    if last['Close'] > last['VWAP']:
+        bull_score += 15
+        bull_details.append("Val > VWAP")
+    if last['VSA_Bull']:
+        bull_score += 15
+        bull_details.append("VSA Bull Vol")
+    if last['MACD'] > last['MACD_Sig']:
+        bull_score += 15
+        bull_details.append("MACD Bull Cross")
+    if last['Close'] > last['BB_Mid']:
+        bull_score += 10
+        bull_details.append("Price > BB Mid")
+    if last['RSI'] > 60:
+        bull_score += 10
+        bull_details.append("RSI Bullish (>60)")
+    if last['Close'] > prev_day_high:
+        bull_score += 10
+        bull_details.append("Breakout > PDH")
 
+    # --- BEAR SCORING ---
+    bear_score = 0
+    bear_details = []
+    
+    if last['Close'] < last['EMA200']:
+        bear_score += 15
+        bear_details.append("Trend < EMA200")
+    if last['Close'] < last['VWAP']:
+        bear_score += 15
+        bear_details.append("Val < VWAP")
+    if last['VSA_Bear']:
+        bear_score += 15
+        bear_details.append("VSA Bear Vol")
+    if last['MACD'] < last['MACD_Sig']:
+        bear_score += 15
+        bear_details.append("MACD Bear Cross")
+    if last['Close'] < last['BB_Mid']:
+        bear_score += 10
+        bear_details.append("Price < BB Mid")
+    if last['RSI'] < 40:
+        bear_score += 10
+        bear_details.append("RSI Bearish (<40)")
+    if last['Close'] < prev_day_low:
+        bear_score += 10
+        bear_details.append("Breakdown < PDL")
+
+    # --- BRANCH AND BOUND ---
+    # The remaining checks need downloads; they run cheapest first (Nifty, then one sector fetch)
+    # and are skipped once neither side can still reach min_score.
+    def reachable(remaining_points):
+        return min_score is None or max(bull_score, bear_score) + remaining_points >= min_score
+
+    pruned = False
+    if reachable(MARKET_POINTS + SECTOR_MAX_POINTS):
         # Market Alignment
         nifty = yf.download('^NSEI', period='1d', interval='5m', progress=False)
         if not nifty.empty:
@@ -138,50 +171,56 @@ def calculate_confidence(ticker_symbol):
             nifty_open = nifty['Open'].iloc[-1]
             
             if nifty_close > nifty_open:
-                bull_score += 10
+                bull_score += MARKET_POINTS
                 bull_details.append("Top-Down: Nifty Green")
             else:
-                bear_score += 10
+                bear_score += MARKET_POINTS
                 bear_details.append("Top-Down: Nifty Red")
-                
+    else:
+        pruned = True
+            
+    if not pruned and reachable(SECTOR_MAX_POINTS):
         # --- SECTOR ALIGNMENT (SCIENTIFIC FILTER) ---
-        from src.sector_analysis import check_alignment
+        from src.sector_analysis import get_sector_status, alignment_from_status
+        sector_name, sector_change, sector_trend = get_sector_status(ticker_symbol)
         
         # Check Bullish Sector
-        mod, reason, chg = check_alignment(ticker_symbol, "BUY")
+        mod, reason, chg = alignment_from_status(sector_name, sector_change, sector_trend, "BUY")
         if mod != 0:
             bull_score += mod # Can be penalty
             bull_details.append(f"Sector: {reason}")
             
         # Check Bearish Sector
-        mod_bear, reason_bear, chg_bear = check_alignment(ticker_symbol, "SELL")
+        mod_bear, reason_bear, chg_bear = alignment_from_status(sector_name, sector_change, sector_trend, "SELL")
         if mod_bear != 0:
             bear_score += mod_bear
             bear_details.append(f"Sector: {reason_bear}")
-        
-        # --- DECISION ---
-        prev_close = df_daily['Close'].iloc[-2]
-        todays_high = df_daily['High'].iloc[-1] # Used as Safe Entry for Long
-        todays_low = df_daily['Low'].iloc[-1]   # Used as Safe Entry for Short
-        current_vwap = last['VWAP']
-        
-        if bull_score >= bear_score:
-            final_score = bull_score
-            final_details = bull_details
-            side = "BUY"
-            safe_entry = todays_high
-            trigger_price = safe_entry # FIX: Use Daily High as Trigger (Breakout)
-            target_price = safe_entry * 1.005
-        else:
-            final_score = bear_score
-            final_details = bear_details
-            side = "SELL"
-            safe_entry = todays_low
-            trigger_price = safe_entry # FIX: Use Daily Low as Trigger (Breakdown)
-            target_price = safe_entry * 0.995
-
-        from src.utils import round_to_tick
-        return final_score, final_details, round_to_tick(prev_day_high), round_to_tick(prev_day_low), round_to_tick(prev_close), round_to_tick(safe_entry), round_to_tick(target_price), round_to_tick(current_atr), round_to_tick(trigger_price), round_to_tick(current_vwap), side
+    else:
+        pruned = True
+    
+    # --- DECISION ---
+    prev_close = df_daily['Close'].iloc[-2]
+    todays_high = df_daily['High'].iloc[-1] # Used as Safe Entry for Long
+    todays_low = df_daily['Low'].iloc[-1]   # Used as Safe Entry for Short
+    current_vwap = last['VWAP']
+    
+    if bull_score >= bear_score:
+        final_score = bull_score
+        final_details = bull_details
+        side = "BUY"
+        safe_entry = todays_high
+        trigger_price = safe_entry # FIX: Use Daily High as Trigger (Breakout)
+        target_price = safe_entry * 1.005
+    else:
+        final_score = bear_score
+        final_details = bear_details
+        side = "SELL"
+        safe_entry = todays_low
+        trigger_price = safe_entry # FIX: Use Daily Low as Trigger (Breakdown)
+        target_price = safe_entry * 0.995
 
-    except Exception as e:
-        return 0, [f"Error: {e}"], 0, 0, 0, 0, 0, 0, 0, 0, "NEUTRAL"
+    if pruned:
+        final_details = final_details + [f"Early Exit: cannot reach {min_score}"]
+
+    from src.utils import round_to_tick
+    return final_score, final_details, round_to_tick(prev_day_high), round_to_tick(prev_day_low), round_to_tick(prev_close), round_to_tick(safe_entry), round_to_tick(target_price), round_to_tick(current_atr), round_to_tick(trigger_price), round_to_tick(current_vwap), side
@@ -0,0 +1,52 @@
+"""
+lazy_imports.py
+
+Deferred imports of the heavy libraries (sklearn, yfinance, plotly, textblob, ...).
+Handles:
+- lazy("sklearn.ensemble"): a module stand-in that imports the module on first attribute
+  access, so `yf = lazy("yfinance")` at module level keeps `yf.download(...)` call sites as
+  they are while a page or CLI that never downloads never imports yfinance.
+- IMPORT_TIMES: seconds each import made through the registry took, for the startup
+  benchmark (tests/benchmark_startup.py) and the dashboard's debug output.
+"""
+import importlib
+import sys
+import time
+
+IMPORT_TIMES = {}
+
+
+def load(name):
+    """The imported module `name`, importing it (and recording how long that took) on first use."""
+    module = sys.modules.get(name)
+    if module is None:
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        IMPORT_TIMES[name] = time.perf_counter() - start
+    return module
+
+class LazyModule:
+    """Stands in for a module until one of its attributes is used."""
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+
+    def __getattr__(self, attr):
+        return getattr(load(self._name), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(load(self._name), attr, value)
+
+    def __delattr__(self, attr):
+        delattr(load(self._name), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._name in sys.modules else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+def lazy(name):
+    return LazyModule(name)
+
+def import_report():
+    """Imports made through the registry, slowest first, as (module, seconds) pairs."""
+    return sorted(IMPORT_TIMES.items(), key=lambda item: item[1], reverse=True)
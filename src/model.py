@@ -1,42 +1,73 @@
+import time
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_squared_error, mean_absolute_percentage_error
+from src.lazy_imports import lazy
+from src.model_cache import cached
 
-def prepare_features(df, sentiment_score=0):
-    """
-    Prepares features for the model including lags and rolling stats.
-    """
-    data = df.copy()
-    
-    # Base technical indicators
-    feature_cols = ['RSI', 'MACD', 'MACD_Signal', 'BB_High', 'BB_Low', 'SMA_50', 'EMA_20', 'Daily_Return', 'ATR', 'Stoch_K', 'Stoch_D', 'OBV']
+# sklearn is imported on the first fit, not when a page imports this module
+ensemble = lazy("sklearn.ensemble")
+sk_metrics = lazy("sklearn.metrics")
+
+BASE_FEATURES = ['RSI', 'MACD', 'MACD_Signal', 'BB_High', 'BB_Low', 'SMA_50', 'EMA_20', 'Daily_Return', 'ATR', 'Stoch_K', 'Stoch_D', 'OBV']
+MARKET_FEATURES = ['Beta', 'Relative_Return', 'Market_Return']
+
+FEATURE_LOOKBACK = 4  # Raw rows before a day that its lags and 5-day window need
+
+def feature_columns(columns):
+    """Model inputs (without Sentiment) for a frame with these columns."""
+    feature_cols = list(BASE_FEATURES)
     
     # Add Market Context features if available
-    if 'Beta' in data.columns:
-        feature_cols.extend(['Beta', 'Relative_Return', 'Market_Return'])
+    if 'Beta' in columns:
+        feature_cols.extend(MARKET_FEATURES)
+    
+    feature_cols.extend(['DayOfWeek', 'Month'])
+    feature_cols.extend([f'Close_Lag_{lag}' for lag in range(1, 4)])
+    feature_cols.extend(['Rolling_Mean_5', 'Rolling_Std_5'])
+    return feature_cols
+
+def engineer_features(df):
+    """
+    Seasonality, lag and rolling features on top of the technical indicators, for every row
+    where all of them are available.
+    """
+    close = df['Close']
+    extra = {}
         
     # Add Seasonality Features
-    data['DayOfWeek'] = data.index.dayofweek
-    data['Month'] = data.index.month
-    feature_cols.extend(['DayOfWeek', 'Month'])
+    extra['DayOfWeek'] = df.index.dayofweek
+    extra['Month'] = df.index.month
     
     # Add Lag Features (Past 3 days)
     for lag in range(1, 4):
-        data[f'Close_Lag_{lag}'] = data['Close'].shift(lag)
-        feature_cols.append(f'Close_Lag_{lag}')
+        extra[f'Close_Lag_{lag}'] = close.shift(lag)
         
     # Add Rolling Features
-    data['Rolling_Mean_5'] = data['Close'].rolling(window=5).mean()
-    data['Rolling_Std_5'] = data['Close'].rolling(window=5).std()
-    feature_cols.extend(['Rolling_Mean_5', 'Rolling_Std_5'])
+    extra['Rolling_Mean_5'] = close.rolling(window=5).mean()
+    extra['Rolling_Std_5'] = close.rolling(window=5).std()
+    
+    # One concat instead of a column insert per feature
+    data = pd.concat([df.drop(columns=list(extra), errors='ignore'), pd.DataFrame(extra, index=df.index)], axis=1)
     
     # Fill NaNs created by indicators and lags
-    data = data.dropna()
+    return data.dropna()
+
+def build_features(df, sentiment_score=0):
+    """
+    Feature frame for every row with complete features (including the latest one, which has
+    no target yet) and the list of feature columns.
+    """
+    data = engineer_features(df)
     
     # Add sentiment
     data['Sentiment'] = sentiment_score
+    return data, feature_columns(data.columns)
+
+def prepare_features(df, sentiment_score=0):
+    """
+    Prepares features for the model including lags and rolling stats.
+    """
+    data, feature_cols = build_features(df, sentiment_score)
     
     # Target: Next day's Daily Return (instead of Close)
     # This makes the target stationary and solves the extrapolation problem
@@ -47,39 +78,25 @@ def prepare_features(df, sentiment_score=0):
     # We return the full data so we can access 'Close' for price reconstruction
     return data, feature_cols
 
-def tune_hyperparameters(X_train, y_train, model_type="Random Forest"):
+def tune_hyperparameters(X_train, y_train, model_type="Random Forest", budget_seconds=None):
     """
-    Performs RandomizedSearchCV to find better hyperparameters.
+    Successive-halving search over time-ordered folds (src/tuning.py), capped at
+    `budget_seconds` of wall time. Returns (fitted best estimator, best params), or
+    (None, {"error": ...}) for a model type with no search space.
     """
-    from sklearn.model_selection import RandomizedSearchCV
-    
-    if model_type == "Random Forest":
-        param_dist = {
-            'n_estimators': [100, 200, 300],
-            'max_depth': [None, 10, 20, 30],
-            'min_samples_split': [2, 5, 10],
-            'min_samples_leaf': [1, 2, 4]
-        }
-        model = RandomForestRegressor(random_state=42)
-        
-    elif model_type == "XGBoost":
-        from xgboost import XGBRegressor
-        param_dist = {
-            'n_estimators': [100, 200, 300],
-            'learning_rate': [0.01, 0.05, 0.1, 0.2],
-            'max_depth': [3, 5, 7, 9],
-            'subsample': [0.6, 0.8, 1.0],
-            'colsample_bytree': [0.6, 0.8, 1.0]
-        }
-        model = XGBRegressor(random_state=42)
-    else:
-        return None
+    from src.tuning import PARAM_SPACES, TUNE_BUDGET_SECONDS, base_estimator, successive_halving
 
-    search = RandomizedSearchCV(model, param_distributions=param_dist, n_iter=10, cv=3, scoring='neg_mean_absolute_percentage_error', n_jobs=-1, random_state=42)
-    search.fit(X_train, y_train)
-    return search.best_estimator_, search.best_params_
+    estimator = base_estimator(model_type)
+    if estimator is None:
+        return None, {"error": f"No tuning available for {model_type}"}
+    if budget_seconds is None:
+        budget_seconds = TUNE_BUDGET_SECONDS
+    model, best_params, _ = successive_halving(estimator, PARAM_SPACES[model_type], X_train, y_train,
+                                               budget_seconds=budget_seconds)
+    return model, best_params
 
-def train_model(df, sentiment_score=0, tune=False):
+@cached("Random Forest")
+def train_model(df, sentiment_score=0, tune=False, tune_budget=None):
     """
     Trains a Random Forest Regressor.
     """
@@ -100,9 +117,11 @@ def train_model(df, sentiment_score=0, tune=False):
     
     best_params = None
     if tune:
-        model, best_params = tune_hyperparameters(X_train, y_train, "Random Forest")
+        model, best_params = tune_hyperparameters(X_train, y_train, "Random Forest", budget_seconds=tune_budget)
+        if model is None:
+            return None, best_params, None
     else:
-        model = RandomForestRegressor(n_estimators=100, random_state=42)
+        model = ensemble.RandomForestRegressor(n_estimators=100, random_state=42)
         model.fit(X_train, y_train)
     
     # Predict Returns
@@ -120,7 +139,7 @@ def train_model(df, sentiment_score=0, tune=False):
     # But simpler: Actual_Price = Current_Close * (1 + Actual_Return)
     actual_prices = current_close * (1 + y_test_return)
     
-    mape = mean_absolute_percentage_error(actual_prices, predicted_prices)
+    mape = sk_metrics.mean_absolute_percentage_error(actual_prices, predicted_prices)
     
     metrics = {"MAPE": mape, "Test Size": len(test_data)}
     if best_params:
@@ -128,7 +147,8 @@ def train_model(df, sentiment_score=0, tune=False):
         
     return model, metrics, (actual_prices, predicted_prices)
 
-def train_xgboost_model(df, sentiment_score=0, tune=False):
+@cached("XGBoost")
+def train_xgboost_model(df, sentiment_score=0, tune=False, tune_budget=None):
     """
     Trains an XGBoost Regressor.
     """
@@ -154,7 +174,9 @@ def train_xgboost_model(df, sentiment_score=0, tune=False):
     
     best_params = None
     if tune:
-        model, best_params = tune_hyperparameters(X_train, y_train, "XGBoost")
+        model, best_params = tune_hyperparameters(X_train, y_train, "XGBoost", budget_seconds=tune_budget)
+        if model is None:
+            return None, best_params, None
     else:
         model = XGBRegressor(n_estimators=100, learning_rate=0.1, random_state=42)
         model.fit(X_train, y_train)
@@ -166,7 +188,7 @@ def train_xgboost_model(df, sentiment_score=0, tune=False):
     predicted_prices = current_close * (1 + pred_returns)
     actual_prices = current_close * (1 + y_test_return)
     
-    mape = mean_absolute_percentage_error(actual_prices, predicted_prices)
+    mape = sk_metrics.mean_absolute_percentage_error(actual_prices, predicted_prices)
     
     metrics = {"MAPE": mape, "Test Size": len(test_data)}
     if best_params:
@@ -174,6 +196,7 @@ def train_xgboost_model(df, sentiment_score=0, tune=False):
         
     return model, metrics, (actual_prices, predicted_prices)
 
+@cached("Prophet")
 def train_prophet_model(df, tune=False):
     """
     Trains a Prophet model.
@@ -201,41 +224,9 @@ def train_prophet_model(df, tune=False):
     best_params = None
     
     if tune:
-        # Simple Grid Search
-        param_grid = {
-            'changepoint_prior_scale': [0.05, 0.1, 0.5],
-            'seasonality_prior_scale': [1.0, 10.0]
-        }
-        
-        best_mape = float('inf')
-        best_model_params = {}
-        
-        # Use a validation split from training data
-        val_split = int(len(train) * 0.8)
-        val_train = train.iloc[:val_split]
-        val_test = train.iloc[val_split:]
-        
-        import itertools
-        keys, values = zip(*param_grid.items())
-        for v in itertools.product(*values):
-            params = dict(zip(keys, v))
-            
-            m = Prophet(daily_seasonality=True, **params)
-            m.fit(val_train)
-            
-            future = m.make_future_dataframe(periods=len(val_test))
-            forecast = m.predict(future)
-            preds = forecast.iloc[val_split:]['yhat'].values
-            
-            # Handle length mismatch
-            min_len = min(len(preds), len(val_test))
-            score = mean_absolute_percentage_error(val_test['y'].values[:min_len], preds[:min_len])
-            
-            if score < best_mape:
-                best_mape = score
-                best_model_params = params
-        
-        best_params = best_model_params
+        # Parallel grid search with pruning; fold scores are cached
+        from src.tuning import prophet_grid_search
+        best_params, _ = prophet_grid_search(train)
         model = Prophet(daily_seasonality=True, **best_params)
     else:
         model = Prophet(daily_seasonality=True)
@@ -255,8 +246,8 @@ def train_prophet_model(df, tune=False):
         predictions = predictions[:min_len]
         y_test = y_test[:min_len]
 
-    mse = mean_squared_error(y_test, predictions)
-    mape = mean_absolute_percentage_error(y_test, predictions)
+    mse = sk_metrics.mean_squared_error(y_test, predictions)
+    mape = sk_metrics.mean_absolute_percentage_error(y_test, predictions)
     
     metrics = {"MAPE": mape, "Test Size": len(y_test)}
     if best_params:
@@ -276,6 +267,7 @@ def train_prophet_model(df, tune=False):
     
     return model, metrics, (y_test_series, predictions_series)
 
+@cached("ARIMA")
 def train_arima_model(df, tune=False):
     """
     Trains an ARIMA/SARIMA model.
@@ -288,7 +280,7 @@ def train_arima_model(df, tune=False):
 
     # ARIMA works on univariate series
     data = df['Close'].asfreq('B') # Business day frequency
-    data = data.fillna(method='ffill')
+    data = data.ffill()
     
     if len(data) < 50:
         return None, {"error": "Not enough data for ARIMA"}, None
@@ -301,25 +293,9 @@ def train_arima_model(df, tune=False):
     order = (1, 1, 1)
     
     if tune:
-        # Simple Grid Search for Order
-        import itertools
-        p = d = q = range(0, 2) # 0, 1
-        pdq = list(itertools.product(p, d, q))
-        
-        best_aic = float('inf')
-        best_order = (1, 1, 1)
-        
-        for param in pdq:
-            try:
-                temp_model = SARIMAX(train, order=param, seasonal_order=(0, 0, 0, 0), enforce_stationarity=False, enforce_invertibility=False)
-                results = temp_model.fit(disp=False)
-                if results.aic < best_aic:
-                    best_aic = results.aic
-                    best_order = param
-            except:
-                continue
-        
-        order = best_order
+        # d from an ADF test, then a stepwise (p, q) search starting at the default order
+        from src.tuning import arima_stepwise
+        order, _, _ = arima_stepwise(train, start_order=order)
         best_params = {"order": order}
     
     # Train final model
@@ -331,7 +307,7 @@ def train_arima_model(df, tune=False):
     # Align indices
     predictions = pd.Series(predictions, index=test.index)
     
-    mape = mean_absolute_percentage_error(test, predictions)
+    mape = sk_metrics.mean_absolute_percentage_error(test, predictions)
     
     metrics = {"MAPE": mape, "Test Size": len(test)}
     if best_params:
@@ -339,6 +315,7 @@ def train_arima_model(df, tune=False):
         
     return model_fit, metrics, (test, predictions)
 
+@cached("Holt-Winters")
 def train_holtwinters_model(df, tune=False):
     """
     Trains a Holt-Winters Exponential Smoothing model.
@@ -349,7 +326,7 @@ def train_holtwinters_model(df, tune=False):
         return None, {"error": "statsmodels not installed"}, None
 
     data = df['Close'].asfreq('B')
-    data = data.fillna(method='ffill')
+    data = data.ffill()
     
     if len(data) < 50:
         return None, {"error": "Not enough data for Holt-Winters"}, None
@@ -365,7 +342,7 @@ def train_holtwinters_model(df, tune=False):
     
     predictions = model_fit.forecast(steps=len(test))
     
-    mape = mean_absolute_percentage_error(test, predictions)
+    mape = sk_metrics.mean_absolute_percentage_error(test, predictions)
     
     metrics = {"MAPE": mape, "Test Size": len(test)}
     
@@ -378,6 +355,7 @@ def train_holtwinters_model(df, tune=False):
     
     return model_fit, metrics, (test, predictions)
 
+@cached("Moving Average")
 def train_moving_average_model(df, window=20, tune=False):
     """
     Simple Moving Average Forecast.
@@ -397,7 +375,7 @@ def train_moving_average_model(df, window=20, tune=False):
             if len(train) < w: continue
             sma = train.rolling(window=w).mean().iloc[-1]
             preds = np.full(len(test), sma)
-            score = mean_absolute_percentage_error(test, preds)
+            score = sk_metrics.mean_absolute_percentage_error(test, preds)
             if score < best_mape:
                 best_mape = score
                 best_window = w
@@ -416,7 +394,7 @@ def train_moving_average_model(df, window=20, tune=False):
     # Predict flat line
     predictions = np.full(len(test), sma)
     
-    mape = mean_absolute_percentage_error(test, predictions)
+    mape = sk_metrics.mean_absolute_percentage_error(test, predictions)
     
     metrics = {"MAPE": mape, "Test Size": len(test)}
     if tune:
@@ -440,12 +418,14 @@ def predict_next_day(model, df, sentiment_score=0, model_type="Random Forest"):
     prediction = model.predict(last_row_features)
     return prediction[0]
 
-def predict_future(model, df, days=30, sentiment_score=0, model_type="Random Forest"):
+def predict_future(model, df, days=30, sentiment_score=0, model_type="Random Forest", mode="recursive"):
     """
     Predicts stock prices for the next 'days' days.
+    mode="direct": `model` comes from train_direct_model and predicts every horizon at once.
     """
-    future_predictions = []
-    
+    if mode == "direct":
+        return predict_direct(model, df, days=days, sentiment_score=sentiment_score)
+
     if model_type == "Prophet":
         future = model.make_future_dataframe(periods=days)
         forecast = model.predict(future)
@@ -462,182 +442,482 @@ def predict_future(model, df, days=30, sentiment_score=0, model_type="Random For
         return np.full(days, model)
         
     # Recursive Forecasting for RF/XGBoost
-    # We need to append predictions to df and re-calculate features for the next step
-    # To avoid modifying the original df, we work on a copy
-    # However, re-calculating ALL indicators on a growing DF is slow.
-    # For efficiency in this demo, we will append the prediction and re-calc.
-    
-    current_df = df.copy()
-    
-    # We need to ensure 'Date' index extends into the future for seasonality features
-    last_date = current_df.index[-1]
-    
+    return recursive_forecast(model, df, days=days, sentiment_score=sentiment_score)
+
+# --- FAST RECURSIVE FORECAST ---
+
+BUFFER_SIZE = 50  # Longest lookback of the recursive features (SMA_50)
+
+def _seed_state(df):
+    """Running state of the indicators at the last row of `df` (one vectorised pass over the history)."""
+    from src import indicators as ind
+
+    close = ind.as_array(df['Close'])
+    delta = ind.diff(close)
+    return {
+        "gain": ind.wilder(np.where(delta > 0, delta, 0.0), 14)[-1],
+        "loss": ind.wilder(np.where(delta < 0, -delta, 0.0), 14)[-1],
+        "ema12": ind.ema(close, 12)[-1],
+        "ema26": ind.ema(close, 26)[-1],
+        "signal": df['MACD_Signal'].iloc[-1],
+        "ema20": df['EMA_20'].iloc[-1],
+        "atr": df['ATR'].iloc[-1],
+        "obv": df['OBV'].iloc[-1],
+        "stoch_k": list(df['Stoch_K'].iloc[-3:])
+    }
+
+def _row_predictor(model, names):
+    """
+    Single-row predict function for a fitted model, skipping the per-call overhead of
+    model.predict (DataFrame validation, joblib dispatch over the forest's trees).
+    """
+    if isinstance(model, ensemble.RandomForestRegressor):
+        trees = [est.tree_ for est in model.estimators_]
+        def predict(row):
+            x = row.astype(np.float32)
+            return sum(tree.predict(x)[0, 0] for tree in trees) / len(trees)
+        return predict
+    if hasattr(model, 'get_booster'):
+        booster = model.get_booster()
+        return lambda row: float(booster.inplace_predict(row)[0])
+    return lambda row: model.predict(pd.DataFrame(row, columns=names))[0]
+
+def recursive_forecast(model, df, days=30, sentiment_score=0):
+    """
+    Recursive RF/XGBoost forecast: predict tomorrow's return, append the implied price as a
+    flat OHLC bar (volume carried forward) and roll every feature forward one day.
+
+    The indicators are advanced with their O(1) recursions (Wilder RSI/ATR, EMAs, OBV) or over
+    a preallocated price buffer holding the last BUFFER_SIZE bars plus the horizon (SMA_50,
+    Bollinger, Stochastic, Close lags, 5-day mean/std), so each step is one model call on a
+    preallocated feature row instead of rebuilding indicators over the whole history.
+    Matches appending each bar and re-running calculate_technical_indicators.
+    """
+    names = list(getattr(model, 'feature_names_in_', []))
+    if not names:
+        names = BASE_FEATURES + ['Close_Lag_1', 'Close_Lag_2', 'Close_Lag_3', 'Rolling_Mean_5', 'Rolling_Std_5',
+                                 'Sentiment', 'DayOfWeek', 'Month']
+        if 'Beta' in df.columns:
+            names += MARKET_FEATURES
+    col = {name: i for i, name in enumerate(names)}
+    row = np.zeros((1, len(names)))
+    predict = _row_predictor(model, names)
+
+    # Constant features
+    if 'Sentiment' in col:
+        row[0, col['Sentiment']] = sentiment_score
+    for name in MARKET_FEATURES:
+        if name in col:
+            row[0, col[name]] = df[name].iloc[-1]
+
+    # Price buffer: last BUFFER_SIZE bars of history, then the forecast fills it in place
+    hist = min(len(df), BUFFER_SIZE)
+    closes = np.empty(hist + days)
+    highs = np.empty(hist + days)
+    lows = np.empty(hist + days)
+    closes[:hist] = df['Close'].to_numpy(float)[-hist:]
+    highs[:hist] = df['High'].to_numpy(float)[-hist:]
+    lows[:hist] = df['Low'].to_numpy(float)[-hist:]
+    volume = float(df['Volume'].iloc[-1])
+
+    state = _seed_state(df)
+    base = {name: df[name].iloc[-1] for name in BASE_FEATURES}
+    dates = df.index[-1] + pd.to_timedelta(np.arange(1, days + 1), unit='D')
+    predictions = np.empty(days)
+
     for i in range(days):
-        next_date = last_date + pd.Timedelta(days=1)
-        
-        # Prepare features for the LAST row of current_df
-        # We reuse the logic from predict_next_day but adapted for the loop
-        
-        # 1. Re-calc indicators (needed for lags and rolling to update)
-        # In a highly optimized production system, we would update incrementally.
-        # Here, we re-calc on the whole history + new predictions.
-        
-        # Note: We need to handle the fact that we don't have High/Low/Volume for the future.
-        # Assumption: High/Low/Open are same as Close (or we project them).
-        # This is a limitation of recursive forecasting with complex features.
-        # Simplified assumption: Next Open/High/Low/Close = Predicted Close.
-        
-        # We can't easily re-calc complex indicators like ATR/Stoch without High/Low.
-        # Strategy: We will assume High=Low=Close=Predicted for future steps.
-        # This will dampen volatility indicators (ATR -> 0), which is expected for a mean forecast.
-        
-        # Re-calculate indicators
-        # We need to import here to avoid circular dependency if moved, 
-        # but better to assume functions are available or pass them.
-        # For now, we assume 'current_df' has columns. We need to append a new row.
-        
-        # Actually, calling 'prepare_features' or 'calculate_technical_indicators' inside the loop 
-        # requires the full DF.
-        
-        # Let's do a simplified approach:
-        # Extract the last row's features.
-        # Predict.
-        # Create a new row with that prediction.
-        # Append to DF.
-        # Re-calculate indicators on the new DF.
-        
-        # To make this work with 'calculate_technical_indicators', we need High, Low, Volume.
-        # We will forward-fill Volume, and set High=Low=Close=Prediction.
-        
-        # 1. Predict next step using current tail
-        
-        # Prepare data for prediction
-        # We need to calculate features on the EXTENDED dataframe (current_df)
-        # But calculating everything is slow.
-        # We can implement a mini-feature-calc here or just use the full calc.
-        # Given the error, let's use the full calc but optimize if needed.
-        
-        # We need to re-calculate indicators because lags/rolling depend on the new row
-        # But we can't calculate indicators for the *next* step until we have the *current* step's price.
-        # Wait, the loop is:
-        # 1. Use history to predict T+1
-        # 2. Add T+1 to history
-        # 3. Use history+T+1 to predict T+2
-        
-        # The error happened because I tried to access 'Close_Lag_1' etc. from 'data' 
-        # but 'data' was just a copy of 'current_df' which MIGHT NOT have had those columns 
-        # if 'calculate_technical_indicators' wasn't called or if they were dropped.
-        
-        # In the first iteration, 'current_df' is 'df', which HAS indicators.
-        # But 'df' might have NaNs dropped? No, 'df' passed to this function usually has indicators.
-        
-        # Let's ensure we calculate features for the last row.
-        # We can manually calculate the specific features needed for the last row 
-        # to avoid full re-calc overhead and potential NaN issues.
-        
-        # Manual Feature Calculation for the last row of 'current_df'
-        last_idx = current_df.index[-1]
-        
-        # Lags
-        lag_1 = current_df['Close'].iloc[-1]
-        lag_2 = current_df['Close'].iloc[-2]
-        lag_3 = current_df['Close'].iloc[-3]
-        
-        # Rolling (window=5)
-        roll_mean_5 = current_df['Close'].tail(5).mean()
-        roll_std_5 = current_df['Close'].tail(5).std()
-        
-        # Indicators (RSI, MACD, etc) are already in current_df for the last row 
-        # IF we called calculate_technical_indicators at the end of loop.
-        # For the first iteration, they are there.
-        
-        # Construct single-row DataFrame for prediction
-        X_next = pd.DataFrame(index=[last_idx])
-        
-        # Copy existing indicators from the last row of current_df
-        # We assume these columns exist in current_df
-        base_cols = ['RSI', 'MACD', 'MACD_Signal', 'BB_High', 'BB_Low', 'SMA_50', 'EMA_20', 'Daily_Return', 'ATR', 'Stoch_K', 'Stoch_D', 'OBV']
-        for col in base_cols:
-            X_next[col] = current_df[col].iloc[-1]
-            
-        # Add Lags & Rolling (manually calculated to be safe)
-        X_next['Close_Lag_1'] = lag_1
-        X_next['Close_Lag_2'] = lag_2
-        X_next['Close_Lag_3'] = lag_3
-        X_next['Rolling_Mean_5'] = roll_mean_5
-        X_next['Rolling_Std_5'] = roll_std_5
-        
-        # Add Sentiment & Seasonality
-        X_next['Sentiment'] = sentiment_score
-        X_next['DayOfWeek'] = next_date.dayofweek
-        X_next['Month'] = next_date.month
-        
-        # Market Context (Forward fill)
-        if 'Beta' in current_df.columns:
-            X_next['Beta'] = current_df['Beta'].iloc[-1]
-            X_next['Relative_Return'] = current_df['Relative_Return'].iloc[-1]
-            X_next['Market_Return'] = current_df['Market_Return'].iloc[-1]
-            
-        # Ensure column order matches training
-        # We need to know the exact columns used in training.
-        # We can infer from the keys we just set.
-        feature_cols = ['RSI', 'MACD', 'MACD_Signal', 'BB_High', 'BB_Low', 'SMA_50', 'EMA_20', 'Daily_Return', 'ATR', 'Stoch_K', 'Stoch_D', 'OBV', 
-                        'Close_Lag_1', 'Close_Lag_2', 'Close_Lag_3', 'Rolling_Mean_5', 'Rolling_Std_5', 'Sentiment', 'DayOfWeek', 'Month']
-        
-        if 'Beta' in current_df.columns:
-            feature_cols.extend(['Beta', 'Relative_Return', 'Market_Return'])
-            
-        # Reorder columns to match feature_cols exactly
-        # Note: If training used a different order, this might still fail if we don't know that order.
-        # But 'prepare_features' defines the order, and we are using the same list here.
-        # Ideally, the model object should store feature names, but sklearn RF doesn't always make it easy to access in a standard way across versions without feature_names_in_
-        
-        # Check if model has feature_names_in_ (sklearn > 1.0)
-        if hasattr(model, "feature_names_in_"):
-             X_next = X_next[model.feature_names_in_]
+        t = hist + i  # Slot of the bar being predicted; closes[:t] is known
+        for name, value in base.items():
+            if name in col:
+                row[0, col[name]] = value
+        for lag in range(1, 4):
+            if f'Close_Lag_{lag}' in col:
+                row[0, col[f'Close_Lag_{lag}']] = closes[t - lag]
+        window = closes[t - 5:t]
+        if 'Rolling_Mean_5' in col:
+            row[0, col['Rolling_Mean_5']] = window.mean()
+        if 'Rolling_Std_5' in col:
+            row[0, col['Rolling_Std_5']] = window.std(ddof=1)
+        if 'DayOfWeek' in col:
+            row[0, col['DayOfWeek']] = dates[i].dayofweek
+        if 'Month' in col:
+            row[0, col['Month']] = dates[i].month
+
+        next_return = predict(row)
+        prev = closes[t - 1]
+        price = prev * (1 + next_return)
+        predictions[i] = price
+        closes[t] = highs[t] = lows[t] = price
+
+        # Roll the indicators forward over the new bar
+        delta = price - prev
+        state['gain'] += (max(delta, 0.0) - state['gain']) / 14
+        state['loss'] += (max(-delta, 0.0) - state['loss']) / 14
+        state['ema12'] += 2 / 13 * (price - state['ema12'])
+        state['ema26'] += 2 / 27 * (price - state['ema26'])
+        state['ema20'] += 2 / 21 * (price - state['ema20'])
+        line = state['ema12'] - state['ema26']
+        state['signal'] += 0.2 * (line - state['signal'])
+        state['atr'] += (abs(delta) - state['atr']) / 14
+        state['obv'] += -volume if price < prev else volume
+
+        bb = closes[max(t - 19, 0):t + 1]
+        bb_mid, bb_std = bb.mean(), bb.std()
+        lowest, highest = lows[max(t - 13, 0):t + 1].min(), highs[max(t - 13, 0):t + 1].max()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            stoch_k = 100 * (price - lowest) / (highest - lowest)
+        state['stoch_k'] = state['stoch_k'][1:] + [stoch_k]
+
+        base = {
+            'RSI': 100.0 if state['loss'] == 0 else 100 - 100 / (1 + state['gain'] / state['loss']),
+            'MACD': line,
+            'MACD_Signal': state['signal'],
+            'BB_High': bb_mid + 2 * bb_std,
+            'BB_Low': bb_mid - 2 * bb_std,
+            'SMA_50': closes[max(t - 49, 0):t + 1].mean(),
+            'EMA_20': state['ema20'],
+            'Daily_Return': price / prev - 1,
+            'ATR': state['atr'],
+            'Stoch_K': stoch_k,
+            'Stoch_D': np.mean(state['stoch_k']),
+            'OBV': state['obv']
+        }
+
+    return list(predictions)
+
+# --- DIRECT MULTI-HORIZON FORECAST ---
+
+def direct_targets(data, horizon):
+    """(rows x horizon) cumulative returns Close[t+h] / Close[t] - 1 for h = 1..horizon (NaN past the end)."""
+    close = data['Close'].to_numpy(float)
+    targets = np.full((len(close), horizon), np.nan)
+    for h in range(1, horizon + 1):
+        targets[:-h, h - 1] = close[h:] / close[:-h] - 1
+    return targets
+
+@cached("Direct")
+def train_direct_model(df, horizon=30, sentiment_score=0, model_type="Random Forest"):
+    """
+    Trains one multi-output model that predicts the returns of all horizons 1..horizon at once
+    from the build_features row of the forecast day (no recursion, no compounding of errors).
+    The last `horizon` training rows are purged before the 80/20 split point so no training
+    target overlaps the test period. MAPE is averaged over all horizons of the test rows.
+    model_type: "Random Forest" (natively multi-output) or "XGBoost" (one tree set per horizon,
+    so training time grows with the horizon).
+    """
+    data, feature_cols = build_features(df, sentiment_score)
+    feature_cols = feature_cols + ['Sentiment']
+    targets = direct_targets(data, horizon)
+    complete = ~np.isnan(targets).any(axis=1)
+    data, targets = data[complete], targets[complete]
+
+    if len(data) < 50:
+        return None, {"error": f"Not enough data for a {horizon}-day direct model"}, None
+
+    split = int(len(data) * 0.8)
+    train_end = max(split - horizon, 1)
+    X_train, y_train = data.iloc[:train_end][feature_cols], targets[:train_end]
+    X_test, y_test = data.iloc[split:][feature_cols], targets[split:]
+
+    if model_type == "XGBoost":
+        try:
+            from xgboost import XGBRegressor
+        except ImportError:
+            return None, {"error": "XGBoost not installed"}, None
+        model = XGBRegressor(n_estimators=100, learning_rate=0.1, random_state=42)
+    else:
+        model = ensemble.RandomForestRegressor(n_estimators=100, random_state=42)
+    model.fit(X_train, y_train)
+
+    pred = model.predict(X_test).reshape(len(X_test), horizon)
+    current_close = data.iloc[split:]['Close'].to_numpy(float).reshape(-1, 1)
+    actual_prices = current_close * (1 + y_test)
+    predicted_prices = current_close * (1 + pred)
+    by_horizon = np.mean(np.abs(predicted_prices - actual_prices) / np.abs(actual_prices), axis=0)
+
+    metrics = {"MAPE": float(by_horizon.mean()), "Test Size": len(X_test), "Horizon": horizon,
+               "MAPE by Horizon": [round(float(m), 4) for m in by_horizon]}
+    # 1-day-ahead prices for the test chart, indexed like the other models
+    test_index = data.index[split:]
+    return model, metrics, (pd.Series(actual_prices[:, 0], index=test_index),
+                            pd.Series(predicted_prices[:, 0], index=test_index))
+
+def predict_direct(model, df, days=30, sentiment_score=0):
+    """Whole forecast vector from a train_direct_model model in one batched predict call."""
+    data, feature_cols = build_features(df, sentiment_score)
+    names = list(getattr(model, 'feature_names_in_', feature_cols + ['Sentiment']))
+    returns = np.asarray(model.predict(data.iloc[-1:][names])).reshape(-1)
+    if days > len(returns):
+        raise ValueError(f"Model was trained for {len(returns)} days, {days} requested")
+    return list(data['Close'].iloc[-1] * (1 + returns[:days]))
+
+# --- POOLED (UNIVERSAL) MODEL ---
+
+# Price-level features, divided by the day's Close in the pooled frame
+RELATIVE_FEATURES = ['MACD', 'MACD_Signal', 'BB_High', 'BB_Low', 'SMA_50', 'EMA_20', 'ATR',
+                     'Close_Lag_1', 'Close_Lag_2', 'Close_Lag_3', 'Rolling_Mean_5', 'Rolling_Std_5']
+POOLED_ROWS = 20  # Raw rows that determine a pooled feature row (OBV is scaled by 20-day volume)
+
+def stack_features(frames, sentiment_score=0, ticker_ids=None):
+    """
+    build_features rows of every ticker ({ticker: indicator frame}) in one frame sorted by
+    date, with Ticker and Ticker_ID columns (`ticker_ids`, default: position in sorted order;
+    tickers without an id are skipped). Price-level features are divided by the day's Close
+    and OBV by the 20-day mean volume, so one model can share splits across tickers trading
+    at different prices. Returns (data, feature_cols).
+    """
+    ticker_ids = ticker_ids or {t: i for i, t in enumerate(sorted(frames))}
+    parts, columns = [], None
+    for ticker, df in frames.items():
+        if ticker not in ticker_ids or df is None or df.empty:
+            continue
+        data, feature_cols = build_features(df, sentiment_score)
+        if data.empty:
+            continue
+        data = data.copy()
+        data[RELATIVE_FEATURES] = data[RELATIVE_FEATURES].div(data['Close'], axis=0)
+        data['OBV'] = data['OBV'] / df['Volume'].rolling(20, min_periods=1).mean().reindex(data.index)
+        data['Ticker'] = ticker
+        data['Ticker_ID'] = ticker_ids[ticker]
+        parts.append(data)
+        # Market features only if every ticker has them
+        columns = feature_cols if columns is None else [c for c in columns if c in feature_cols]
+    if not parts:
+        return pd.DataFrame(), []
+    data = pd.concat(parts).sort_index(kind='stable')
+    return data, columns + ['Sentiment', 'Ticker_ID']
+
+@cached("Pooled")
+def train_pooled_model(data, horizon=1, model_type="Random Forest"):
+    """
+    One model for the whole universe, on stack_features output: predicts the returns of
+    horizons 1..horizon from each ticker's feature row. The 80/20 split is by date (every
+    ticker's last 20% of days is the test set), with `horizon` days purged before it.
+    The model carries the Ticker_ID of each ticker (`ticker_ids_`) for predict_pooled.
+    MAPE is over all test rows and horizons; "MAPE by Ticker" breaks it down.
+    """
+    feature_cols = [c for c in data.columns if c in feature_columns(data.columns) + ['Sentiment', 'Ticker_ID']]
+    targets = np.full((len(data), horizon), np.nan)
+    for _, rows in data.groupby('Ticker', sort=False).indices.items():
+        targets[rows] = direct_targets(data.iloc[rows], horizon)
+    complete = ~np.isnan(targets).any(axis=1)
+    data, targets = data[complete], targets[complete]
+
+    dates = data.index.unique().sort_values()
+    if len(dates) < 50:
+        return None, {"error": "Not enough data for a pooled model"}, None
+
+    split = int(len(dates) * 0.8)
+    train_rows = data.index < dates[max(split - horizon, 1)]
+    test_rows = data.index >= dates[split]
+    X_train, y_train = data.loc[train_rows, feature_cols], targets[train_rows]
+    X_test, y_test = data.loc[test_rows, feature_cols], targets[test_rows]
+    if horizon == 1:
+        y_train = y_train.ravel()
+
+    if model_type == "XGBoost":
+        try:
+            from xgboost import XGBRegressor
+        except ImportError:
+            return None, {"error": "XGBoost not installed"}, None
+        model = XGBRegressor(n_estimators=100, learning_rate=0.1, random_state=42)
+    else:
+        # Bootstrap half the rows and a third of the features per split: the pooled frame is large
+        model = ensemble.RandomForestRegressor(n_estimators=100, min_samples_leaf=10, max_features=0.33, max_samples=0.5,
+                                      random_state=42, n_jobs=-1)
+    model.fit(X_train, y_train)
+    model.ticker_ids_ = dict(zip(data['Ticker'], data['Ticker_ID'].astype(int)))
+
+    pred = np.asarray(model.predict(X_test)).reshape(len(X_test), horizon)
+    current_close = data.loc[test_rows, 'Close'].to_numpy(float).reshape(-1, 1)
+    errors = np.abs(pred - y_test) / np.abs(1 + y_test)  # = |predicted - actual| / actual price
+    tickers = data.loc[test_rows, 'Ticker']
+    by_ticker = pd.Series(errors.mean(axis=1), index=tickers.to_numpy()).groupby(level=0).mean()
+
+    metrics = {"MAPE": float(errors.mean()), "Test Size": len(X_test), "Horizon": horizon,
+               "Tickers": len(model.ticker_ids_), "MAPE by Ticker": by_ticker.round(4).to_dict()}
+    index = pd.MultiIndex.from_arrays([data.index[test_rows], tickers], names=['Date', 'Ticker'])
+    return model, metrics, (pd.Series(current_close[:, 0] * (1 + y_test[:, 0]), index=index),
+                            pd.Series(current_close[:, 0] * (1 + pred[:, 0]), index=index))
+
+def latest_pooled_rows(frames, ticker_ids, sentiment_score=0):
+    """
+    The last stack_features row of every ticker with an id, built directly from its last
+    POOLED_ROWS bars (the indicators are already in the frames). Indexed by ticker.
+    """
+    rows = []
+    for ticker, df in frames.items():
+        if ticker not in ticker_ids or df is None or len(df) < FEATURE_LOOKBACK + 1:
+            continue
+        tail = df.iloc[-POOLED_ROWS:]
+        closes = tail['Close'].to_numpy(float)
+        row = tail.iloc[-1].to_dict()
+        row.update({f'Close_Lag_{lag}': closes[-1 - lag] for lag in range(1, 4)})
+        row.update({'Rolling_Mean_5': closes[-5:].mean(), 'Rolling_Std_5': closes[-5:].std(ddof=1),
+                    'DayOfWeek': tail.index[-1].dayofweek, 'Month': tail.index[-1].month,
+                    'OBV': row['OBV'] / tail['Volume'].mean(), 'Sentiment': sentiment_score,
+                    'Ticker': ticker, 'Ticker_ID': ticker_ids[ticker]})
+        rows.append(row)
+    if not rows:
+        return pd.DataFrame()
+    latest = pd.DataFrame(rows).set_index('Ticker', drop=False).sort_values('Ticker_ID')
+    latest[RELATIVE_FEATURES] = latest[RELATIVE_FEATURES].div(latest['Close'], axis=0)
+    return latest.dropna(subset=feature_columns(latest.columns))
+
+def predict_pooled(model, frames, days=1, sentiment_score=0):
+    """
+    Next `days` prices of every ticker in `frames` from a pooled model, in one predict call
+    over the tickers' latest feature rows. Returns a DataFrame indexed by ticker (Day 1..N).
+    Tickers the model was not trained on are skipped.
+    """
+    latest = latest_pooled_rows(frames, model.ticker_ids_, sentiment_score)
+    if latest.empty:
+        return pd.DataFrame()
+    returns = np.asarray(model.predict(latest[list(model.feature_names_in_)])).reshape(len(latest), -1)
+    if days > returns.shape[1]:
+        raise ValueError(f"Model was trained for {returns.shape[1]} days, {days} requested")
+    prices = latest['Close'].to_numpy(float).reshape(-1, 1) * (1 + returns[:, :days])
+    return pd.DataFrame(prices, index=latest.index, columns=[f"Day {i}" for i in range(1, days + 1)])
+
+# --- TRAIN ALL (LEADERBOARD) ---
+
+MODEL_TYPES = ["Random Forest", "XGBoost", "Prophet", "ARIMA", "Holt-Winters", "Moving Average"]
+# What the MAPE of each train_* function covers (the others forecast the whole test span at once)
+TEST_SCORING = {"Random Forest": "one-step", "XGBoost": "one-step"}
+HOLDOUT_DAYS = 10  # Shared leaderboard holdout: the last N rows, forecast from the row before them
+
+_shared = {}
+
+def holdout_forecast(model, model_type, df, days=HOLDOUT_DAYS, sentiment_score=0, params=None):
+    """
+    `days`-step price forecast of the last `days` rows of df by a model from a train_* function
+    (`params`: its metrics' "Best Params"), brought up to the row before them without refitting:
+    RF/XGBoost roll forward from that row, ARIMA re-filters the prices up to it, Holt-Winters
+    reruns with its fitted parameters and the moving average is recomputed there. Prophet cannot
+    take in new prices, so it is refitted on the rows before the holdout with the same parameters.
+    """
+    params = params or {}
+    history, dates = df.iloc[:-days], df.index[-days:]
+    if model_type in ("Random Forest", "XGBoost"):
+        return np.asarray(recursive_forecast(model, history, days=days, sentiment_score=sentiment_score))
+    if model_type == "Moving Average":
+        return np.full(days, history['Close'].tail(params.get("window", 20)).mean())
+    if model_type == "Prophet":
+        import logging
+        from prophet import Prophet
+
+        logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+        ds = df.index.tz_localize(None) if df.index.tz is not None else df.index
+        refit = Prophet(daily_seasonality=True, **params)
+        refit.fit(pd.DataFrame({'ds': ds[:-days], 'y': history['Close'].to_numpy()}))
+        return refit.predict(pd.DataFrame({'ds': ds[-days:]}))['yhat'].to_numpy()
+
+    # ARIMA / Holt-Winters were fitted on a business-day calendar
+    prices = history['Close'].asfreq('B').ffill()
+    steps = len(df['Close'].asfreq('B')) - len(prices)
+    if model_type == "ARIMA":
+        forecast = model.apply(prices).forecast(steps)
+    else:
+        from statsmodels.tsa.holtwinters import ExponentialSmoothing
+        params = model.params
+        rerun = ExponentialSmoothing(prices, trend='add', seasonal=None, initialization_method='known',
+                                     initial_level=params['initial_level'], initial_trend=params['initial_trend'])
+        forecast = rerun.fit(smoothing_level=params['smoothing_level'], smoothing_trend=params['smoothing_trend'],
+                             optimized=False).forecast(steps)
+    return forecast.reindex(dates).to_numpy(float)
+
+def holdout_mape(model, model_type, metrics, df, days=HOLDOUT_DAYS, sentiment_score=0):
+    """MAPE of holdout_forecast. The train_* functions fit on the first 80% only, so it is out of sample."""
+    if metrics.get("Test Size", 0) < days:
+        raise ValueError(f"Test split shorter than the {days}-day holdout")
+    preds = holdout_forecast(model, model_type, df, days, sentiment_score, metrics.get("Best Params"))
+    actual = df['Close'].to_numpy(float)[-days:]
+    return float(np.nanmean(np.abs(preds - actual) / actual))
+
+def _init_worker(df, sentiment_score, threads=None):
+    """
+    Pool initializer: the prepared dataset is sent to each worker once, not once per model,
+    and the worker's native thread pools are capped at `threads`.
+    """
+    from src.batch_training import limit_threads
+
+    _shared['df'] = df
+    _shared['sentiment_score'] = sentiment_score
+    if threads:
+        limit_threads(threads)
+
+def _train_by_name(model_type, tune=False, ticker=None, holdout_days=HOLDOUT_DAYS):
+    """
+    Runs one train_* function on the worker's shared dataset and scores the model on the shared
+    holdout. Returns (result, train seconds, (holdout MAPE, holdout error)).
+    """
+    df, sentiment_score = _shared['df'], _shared['sentiment_score']
+    start = time.time()
+    try:
+        if model_type == "Random Forest":
+            result = train_model(df, sentiment_score=sentiment_score, tune=tune, ticker=ticker)
+        elif model_type == "XGBoost":
+            result = train_xgboost_model(df, sentiment_score=sentiment_score, tune=tune, ticker=ticker)
+        elif model_type == "Prophet":
+            result = train_prophet_model(df, tune=tune, ticker=ticker)
+        elif model_type == "ARIMA":
+            result = train_arima_model(df, tune=tune, ticker=ticker)
+        elif model_type == "Holt-Winters":
+            result = train_holtwinters_model(df, tune=tune, ticker=ticker)
         else:
-             # Fallback to our hardcoded list
-             X_next = X_next[feature_cols]
-        
-        # Predict Return
-        next_return = model.predict(X_next)[0]
-        
-        # Reconstruct Price
-        # Next_Price = Last_Close * (1 + Next_Return)
-        last_close = current_df['Close'].iloc[-1]
-        next_price = last_close * (1 + next_return)
-        
-        future_predictions.append(next_price)
-        
-        # 2. Append new row to current_df
-        new_row = pd.DataFrame({
-            'Open': [next_price],
-            'High': [next_price],
-            'Low': [next_price],
-            'Close': [next_price],
-            'Volume': [current_df['Volume'].iloc[-1]] # Forward fill volume
-        }, index=[next_date])
-        
-        # Forward fill other columns to avoid NaNs in next iteration's base indicators
-        # (This is an approximation. Ideally we re-calc indicators)
-        for col in current_df.columns:
-            if col not in new_row.columns:
-                new_row[col] = current_df[col].iloc[-1]
-                
-        current_df = pd.concat([current_df, new_row])
-        
-        # 3. Re-calculate indicators?
-        # Re-calculating full indicators is slow and might introduce NaNs if not careful.
-        # But if we don't, RSI/MACD won't change, which is bad.
-        # Let's try to re-calc ONLY if we are in a small loop, or accept static indicators for speed.
-        # For 60 days, static indicators = flat line. We want dynamic.
-        # We MUST re-calc.
-        
-        from src.analysis import calculate_technical_indicators
-        # We only need to re-calc if we have enough data.
-        # And we need to handle the fact that High/Low are synthetic.
-        current_df = calculate_technical_indicators(current_df)
-        
-        last_date = next_date
-        
-    return future_predictions
+            result = train_moving_average_model(df, tune=tune, ticker=ticker)
+    except Exception as e:
+        result = (None, {"error": str(e)}, None)
+    seconds = time.time() - start
+
+    holdout = (np.nan, "")
+    if result[0] is not None:
+        try:
+            holdout = (holdout_mape(result[0], model_type, result[1], df, holdout_days, sentiment_score), "")
+        except Exception as e:
+            holdout = (np.nan, f"Holdout: {e}")
+    return result, seconds, holdout
+
+def train_all_models(df, sentiment_score=0, tune=False, ticker=None, model_types=None, max_workers=None,
+                     holdout_days=HOLDOUT_DAYS):
+    """
+    Trains every model type concurrently in a process pool (wall time ~ the slowest model).
+    The train_* functions score their test split differently (one-step for the tree models, the
+    whole span for the others), so each worker also forecasts the same last `holdout_days` rows
+    with its model (holdout_forecast) and the models are ranked on that MAPE.
+    Returns (leaderboard, results): leaderboard is a DataFrame indexed by model, sorted by the
+    holdout MAPE (failed models last, with their error); results maps
+    model -> (model, metrics, test_results).
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from src.batch_training import pool_shape
+
+    model_types = list(model_types or MODEL_TYPES)
+    workers, threads = pool_shape(max_workers or len(model_types))
+    results, trained, rows = {}, {}, []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(df, sentiment_score, threads)) as pool:
+        futures = {m: pool.submit(_train_by_name, m, tune, ticker, holdout_days) for m in model_types}
+        for model_type, future in futures.items():
+            try:
+                (model, metrics, test_results), seconds, holdout = future.result()
+            except Exception as e:  # e.g. a worker that died or a model that cannot be pickled
+                model, metrics, test_results, seconds, holdout = None, {"error": str(e)}, None, np.nan, (np.nan, "")
+            results[model_type] = (model, metrics, test_results)
+            trained[model_type] = (model, metrics, seconds, holdout)
+
+    # Failed models go last, also when no holdout could be scored
+    for model_type, (model, metrics, seconds, (mape, holdout_error)) in sorted(trained.items(),
+                                                                              key=lambda item: item[1][0] is None):
+        rows.append({
+            "Model": model_type,
+            "MAPE %": round(mape * 100, 2),
+            "Test MAPE %": round(metrics["MAPE"] * 100, 2) if model is not None else np.nan,
+            "Test Scoring": TEST_SCORING.get(model_type, "whole test span"),
+            "Test Size": metrics.get("Test Size"),
+            "Train Seconds": round(seconds, 2),
+            "Cached": bool(metrics.get("Cached", False)),
+            "Error": metrics.get("error", "") or holdout_error
+        })
+    leaderboard = pd.DataFrame(rows).sort_values("MAPE %", na_position='last', kind='stable').set_index("Model")
+    return leaderboard, results
@@ -0,0 +1,178 @@
+"""
+model_cache.py
+
+Persistent cache of trained forecasting models.
+Handles:
+- Keys built from ticker, model type, a fingerprint of the training data, the tuning flag
+  and every other hyperparameter the train_* function was called with.
+- An in-process copy of the most recent entries (Streamlit reruns) backed by one pickle per
+  entry in data/model_cache/.
+- Size-bounded eviction: least recently used entries are deleted once the directory grows
+  past MAX_CACHE_MB.
+- Concurrent use from process pools: entries are written to a temp file and renamed into
+  place, and an entry another process removed in the meantime is treated as a miss.
+"""
+import functools
+import hashlib
+import inspect
+import os
+import tempfile
+import time
+from collections import OrderedDict
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+CACHE_DIR = os.path.join(DATA_DIR, "model_cache")
+
+MAX_CACHE_MB = 500
+MEMORY_ENTRIES = 32
+
+_memory = OrderedDict()
+
+
+def fingerprint(df):
+    """Content hash of a DataFrame/Series (index and values)."""
+    hashed = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    digest = hashlib.sha1(hashed.tobytes())
+    digest.update(repr(list(df.columns) if hasattr(df, 'columns') else df.name).encode())
+    return digest.hexdigest()
+
+def make_key(ticker, model_type, data_key, tune=False, params=None):
+    """Cache key; the file name is the hash, the readable parts are kept for eviction/debugging."""
+    params = sorted((params or {}).items())
+    raw = repr((ticker, model_type, data_key, bool(tune), params))
+    return f"{(ticker or 'any').replace('^', '_')}_{hashlib.sha1(raw.encode()).hexdigest()[:20]}"
+
+def _path(key, cache_dir=None):
+    return os.path.join(cache_dir or CACHE_DIR, f"{key}.pkl")
+
+def load(key, cache_dir=None):
+    """Cached value for `key`, or None."""
+    if key in _memory:
+        _memory.move_to_end(key)
+        return _memory[key]
+    path = _path(key, cache_dir)
+    try:
+        value = pd.read_pickle(path)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"⚠️ Warning: dropping unreadable model cache entry {path}: {e}")
+        _remove(path)
+        return None
+    try:
+        os.utime(path)  # Mark as recently used
+    except FileNotFoundError:  # Evicted by another process since the read
+        pass
+    _remember(key, value)
+    return value
+
+def save(key, value, cache_dir=None, max_mb=None):
+    """Stores `value` under `key`, then evicts old entries if the cache is over its size limit."""
+    cache_dir = cache_dir or CACHE_DIR
+    _remember(key, value)
+    tmp = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Readers in other processes only ever see a complete file
+        fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=cache_dir)
+        os.close(fd)
+        pd.to_pickle(value, tmp)
+        os.replace(tmp, _path(key, cache_dir))
+    except Exception as e:
+        print(f"⚠️ Warning: could not persist model {key}: {e}")
+        if tmp:
+            _remove(tmp)
+        return
+    evict(cache_dir, MAX_CACHE_MB if max_mb is None else max_mb)
+
+def _remove(path):
+    """Deletes `path`; False if another process already did."""
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+def _remember(key, value):
+    _memory[key] = value
+    _memory.move_to_end(key)
+    while len(_memory) > MEMORY_ENTRIES:
+        _memory.popitem(last=False)
+
+def evict(cache_dir=None, max_mb=MAX_CACHE_MB):
+    """Deletes least recently used entries until the directory is under `max_mb`. Returns the count removed."""
+    cache_dir = cache_dir or CACHE_DIR
+    if not os.path.exists(cache_dir):
+        return 0
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name.endswith(".pkl"):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:  # Removed since the listing
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_mb * 1024 * 1024:
+            break
+        if _remove(path):
+            removed += 1
+        _memory.pop(os.path.basename(path)[:-4], None)
+        total -= size
+    return removed
+
+def clear(cache_dir=None):
+    """Empties the in-process copy and the on-disk cache."""
+    _memory.clear()
+    cache_dir = cache_dir or CACHE_DIR
+    if os.path.exists(cache_dir):
+        for name in os.listdir(cache_dir):
+            if name.endswith((".pkl", ".tmp")):
+                _remove(os.path.join(cache_dir, name))
+
+def get_or_compute(key, compute, cache_dir=None):
+    """Cached value for `key`, computing and storing it on a miss."""
+    value = load(key, cache_dir)
+    if value is None:
+        value = compute()
+        if value is not None:
+            save(key, value, cache_dir)
+    return value
+
+
+def cached(model_type):
+    """
+    Decorator for the train_*(df, ..., tune=False) functions of src/model.py.
+    Adds two keyword arguments: `ticker` (part of the key) and `use_cache` (False forces a
+    retrain, which then replaces the entry). Results with no model (errors) are not stored.
+    Cached metrics carry "Cache Key", which callers can reuse to cache derived forecasts.
+    """
+    def decorator(train):
+        signature = inspect.signature(train)
+
+        @functools.wraps(train)
+        def wrapper(df, *args, ticker=None, use_cache=True, **kwargs):
+            bound = signature.bind(df, *args, **kwargs)
+            bound.apply_defaults()
+            params = {k: v for k, v in bound.arguments.items() if k not in ('df', 'tune')}
+            key = make_key(ticker, model_type, fingerprint(df), bound.arguments.get('tune', False), params)
+
+            if use_cache:
+                hit = load(key)
+                if hit is not None:
+                    model, metrics, test_results = hit
+                    return model, {**metrics, "Cached": True}, test_results
+
+            start = time.time()
+            model, metrics, test_results = train(*bound.args, **bound.kwargs)
+            if model is None:
+                return model, metrics, test_results
+            metrics = {**metrics, "Cache Key": key, "Train Seconds": round(time.time() - start, 2)}
+            save(key, (model, metrics, test_results))
+            return model, metrics, test_results
+        return wrapper
+    return decorator
@@ -1,29 +1,55 @@
 import pandas as pd
 import numpy as np
-import yfinance as yf
+from src.lazy_imports import lazy
 from datetime import datetime
+from src.indicators import compute_indicators, ema
+from src import indicators as ind
+from src import panel as pn
+
+yf = lazy("yfinance")  # Imported on the first download
 
 # List of liquid stocks for MTF (Top Nifty 50 + Midcaps)
 # List of liquid stocks for MTF (Consolidated High Liquidity + Momentum)
 from src.config import WATCHLIST
 
-def get_ultra_precision_signal(ticker_symbol, nifty_df=None):
+def get_fundamentals(ticker_symbol):
+    """Industry and the fundamentals shown next to each MTF signal (None when unavailable)."""
     try:
-        ticker = yf.Ticker(ticker_symbol)
-        ticker_info = ticker.info
-        industry = ticker_info.get('industry', 'N/A')
-        
-        # Fundamentals
-        market_cap = ticker_info.get('marketCap')
-        pe_ratio = ticker_info.get('trailingPE')
-        pb_ratio = ticker_info.get('priceToBook')
-        roe = ticker_info.get('returnOnEquity')
-        div_yield = ticker_info.get('dividendYield')
-        op_margin = ticker_info.get('operatingMargins')
+        ticker_info = yf.Ticker(ticker_symbol).info
+        return {
+            "Industry": ticker_info.get('industry', 'N/A'),
+            "Market Cap": ticker_info.get('marketCap'),
+            "P/E Ratio": ticker_info.get('trailingPE'),
+            "P/B Ratio": ticker_info.get('priceToBook'),
+            "ROE": ticker_info.get('returnOnEquity'),
+            "Dividend Yield": ticker_info.get('dividendYield'),
+            "Operating Margin": ticker_info.get('operatingMargins')
+        }
     except Exception:
-        ticker_info = {}
-        industry = "N/A"
-        market_cap = pe_ratio = pb_ratio = roe = div_yield = op_margin = None
+        return {"Industry": "N/A", "Market Cap": None, "P/E Ratio": None, "P/B Ratio": None,
+                "ROE": None, "Dividend Yield": None, "Operating Margin": None}
+
+def rate_fundamentals(roe, op_margin, pe_ratio):
+    fund_rating = "⚠️ Neutral"
+    if roe is not None and op_margin is not None:
+        is_quality = roe > 0.15 and op_margin > 0.10
+        if is_quality:
+            fund_rating = "💎 Premium" if (pe_ratio and pe_ratio > 60) else "✅ Strong"
+        elif roe < 0 or op_margin < 0:
+            fund_rating = "❌ Weak"
+        else:
+            fund_rating = "⚠️ Moderate"
+    return fund_rating
+
+def get_ultra_precision_signal(ticker_symbol, nifty_df=None):
+    fundamentals = get_fundamentals(ticker_symbol)
+    industry = fundamentals['Industry']
+    market_cap = fundamentals['Market Cap']
+    pe_ratio = fundamentals['P/E Ratio']
+    pb_ratio = fundamentals['P/B Ratio']
+    roe = fundamentals['ROE']
+    div_yield = fundamentals['Dividend Yield']
+    op_margin = fundamentals['Operating Margin']
         
     from src.utils import fetch_data_robust
 
@@ -53,37 +79,21 @@ def get_ultra_precision_signal(ticker_symbol, nifty_df=None):
             rs_score = rs_val
     
     # --- 1. Technical Indicator Calculations ---
+    ind = compute_indicators(stock_df, ["ema20", "ema50", "sma_rsi14", "adx14", "vpt"])
+    
     # EMA Alignment (Trend)
-    stock_df['EMA20'] = stock_df['Close'].ewm(span=20, adjust=False).mean()
-    stock_df['EMA50'] = stock_df['Close'].ewm(span=50, adjust=False).mean()
+    stock_df['EMA20'] = ind['ema20']
+    stock_df['EMA50'] = ind['ema50']
     
     # RSI (Momentum)
-    delta = stock_df['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    stock_df['RSI'] = 100 - (100 / (1 + (gain / loss.replace(0, np.nan))))
+    stock_df['RSI'] = ind['sma_rsi14']
 
     # ADX (High-Precision Wilder's Smoothing)
-    tr1 = stock_df['High'] - stock_df['Low']
-    tr2 = abs(stock_df['High'] - stock_df['Close'].shift(1))
-    tr3 = abs(stock_df['Low'] - stock_df['Close'].shift(1))
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-    atr = tr.ewm(alpha=1/14, adjust=False).mean() # Smoothed ATR
-    
-    up_move = stock_df['High'].diff()
-    down_move = stock_df['Low'].shift(1) - stock_df['Low']
-    
-    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0)
-    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0)
-    
-    plus_di = 100 * (pd.Series(plus_dm, index=stock_df.index).ewm(alpha=1/14, adjust=False).mean() / atr)
-    minus_di = 100 * (pd.Series(minus_dm, index=stock_df.index).ewm(alpha=1/14, adjust=False).mean() / atr)
-    
-    dx = 100 * (abs(plus_di - minus_di) / (plus_di + minus_di).replace(0, np.nan))
-    stock_df['ADX'] = dx.ewm(alpha=1/14, adjust=False).mean().fillna(0)
+    atr = pd.Series(ind['adx14_atr'], index=stock_df.index) # Smoothed ATR
+    stock_df['ADX'] = ind['adx14']
 
     # VPT (Volume Price Trend)
-    vpt = (stock_df['Volume'] * stock_df['Close'].pct_change()).cumsum()
+    vpt = pd.Series(ind['vpt'], index=stock_df.index)
 
     # --- 2. Confidence Scoring Logic ---
     latest = stock_df.iloc[-1]
@@ -142,15 +152,7 @@ def get_ultra_precision_signal(ticker_symbol, nifty_df=None):
     velocity = avg_up if pd.notnull(avg_up) and avg_up > 0 else (atr_val * 0.5)
     est_days = round((target_price - entry_point) / velocity) if velocity > 0 else 7
 
-    fund_rating = "⚠️ Neutral"
-    if roe is not None and op_margin is not None:
-        is_quality = roe > 0.15 and op_margin > 0.10
-        if is_quality:
-            fund_rating = "💎 Premium" if (pe_ratio and pe_ratio > 60) else "✅ Strong"
-        elif roe < 0 or op_margin < 0:
-            fund_rating = "❌ Weak"
-        else:
-            fund_rating = "⚠️ Moderate"
+    fund_rating = rate_fundamentals(roe, op_margin, pe_ratio)
 
     from src.utils import round_to_tick
 
@@ -177,7 +179,178 @@ def get_ultra_precision_signal(ticker_symbol, nifty_df=None):
         "Fundamental Rating": fund_rating
     }
 
-def run_pro_scanner(progress_callback=None):
+# --- PANEL MODE (all tickers at once) ---
+
+def relative_strength_panel(close, index, nifty_df, lookback=20):
+    """
+    20-day return of every ticker minus Nifty's, in % (the RS_Score of get_ultra_precision_signal)
+    for every date at once. Computed on the dates both have, then carried forward to dates Nifty lacks.
+    Zero until a ticker has more than `lookback` common dates.
+    """
+    rs = np.zeros_like(close)
+    if nifty_df is None or nifty_df.empty:
+        return rs
+    nifty = nifty_df['Close'].reindex(index).to_numpy(dtype=np.float64, na_value=np.nan)
+    rows = ~np.isnan(nifty)
+    if not rows.any():
+        return rs
+
+    s = close[rows]
+    s_ret = s / ind.shift(s, lookback - 1) - 1
+    n_ret = nifty[rows] / ind.shift(nifty[rows], lookback - 1) - 1
+    sub = (s_ret - n_ret.reshape(-1, 1)) * 100
+    sub[np.cumsum(~np.isnan(s), axis=0) <= lookback] = 0
+
+    full = np.full_like(close, np.nan)
+    full[rows] = sub
+    return np.nan_to_num(ind.ffill(full), nan=0.0)
+
+def score_panel(panel, nifty_df=None):
+    """
+    Evaluates the get_ultra_precision_signal scoring for every ticker and every date in one pass.
+    panel: {field: DataFrame (dates x tickers)} from src.panel.build_panel / load_panel.
+    Returns a dict of (dates x tickers) matrices plus 'index' and 'tickers'; row t only uses data up to t.
+    """
+    close_df = panel['Close']
+    close = pn.as_matrix(close_df)
+    high = pn.as_matrix(panel['High'])
+    low = pn.as_matrix(panel['Low'])
+    volume = pn.as_matrix(panel['Volume'])
+
+    # --- 1. Indicators (column-wise) ---
+    ema20 = ema(close, 20)
+    ema50 = ema(close, 50)
+    rsi = ind.rsi(close, 14, smoothing="sma")
+    adx, _, _, atr = ind.adx(high, low, close, 14)
+    vpt = ind.vpt(close, volume)
+    rs = relative_strength_panel(close, close_df.index, nifty_df)
+    bars = np.cumsum(~np.isnan(close), axis=0)
+
+    # --- 2. Confidence Scoring (vectorised) ---
+    with np.errstate(invalid='ignore'):
+        trend_pts = np.where((close > ema20) & (ema20 > ema50), 30, np.where(close > ema20, 15, 0))
+        rsi_pts = np.where((rsi >= 50) & (rsi <= 65), 20, np.where((rsi > 65) & (rsi <= 75), 10, 0))
+        adx_pts = np.where(adx > 25, 20, 0)
+        vpt_pts = np.where((bars > 5) & (vpt > ind.sma(vpt, 5)), 15, 0)
+        rs_pts = np.where(rs > 0, 15, 0)
+    score = trend_pts + rsi_pts + adx_pts + vpt_pts + rs_pts
+
+    # --- 3. Dynamic Levels & Time Estimation ---
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pullback = close > ema20 * 1.02
+        entry = np.where(pullback, ema20 * 1.01, close)
+        stop_loss = entry - (1.5 * atr)
+        target = entry + (3.0 * atr)
+
+        diffs = ind.diff(close)
+        up = diffs > 0
+        up_sum = ind.sma(np.where(up, diffs, 0.0), 20) * 20
+        up_count = ind.sma(up.astype(np.float64), 20) * 20
+        avg_up = up_sum / up_count
+        velocity = np.where(avg_up > 0, avg_up, atr * 0.5)
+        est_days = np.where(velocity > 0, np.round((target - entry) / velocity), 7)
+
+    return {
+        "index": close_df.index, "tickers": list(close_df.columns),
+        "Close": close, "EMA20": ema20, "EMA50": ema50, "RSI": rsi, "ADX": adx, "ATR": atr, "VPT": vpt,
+        "RS": rs, "Bars": bars, "Eligible": bars >= 50,
+        "Trend_Pts": trend_pts, "RSI_Pts": rsi_pts, "ADX_Pts": adx_pts, "VPT_Pts": vpt_pts, "RS_Pts": rs_pts,
+        "Score": score, "Pullback": pullback, "Entry": entry, "Stop": stop_loss, "Target": target,
+        "Est_Days": est_days
+    }
+
+def panel_signal(scores, col, row=-1, fundamentals=None, date=None):
+    """Builds the get_ultra_precision_signal result dict for one ticker (column) at one date (row)."""
+    from src.utils import round_to_tick
+
+    def at(key):
+        return scores[key][row, col]
+
+    score = int(at('Score'))
+    rsi, adx, rs = at('RSI'), at('ADX'), at('RS')
+    reasons = []
+    if at('Trend_Pts') == 30:
+        reasons.append("Bullish Trend: Price > EMA20 > EMA50")
+    elif at('Trend_Pts') == 15:
+        reasons.append("Short-term Trend: Price > EMA20")
+    if at('RSI_Pts') == 20:
+        reasons.append(f"Ideal Momentum: RSI at {round(rsi,1)}")
+    elif at('RSI_Pts') == 10:
+        reasons.append("Strong Momentum: RSI Over 65")
+    if at('ADX_Pts'):
+        reasons.append(f"Strong Trend: ADX at {round(adx,1)}")
+    if at('VPT_Pts'):
+        reasons.append("Institutional Flow: VPT rising")
+    if at('RS_Pts'):
+        reasons.append(f"Alpha Leader: Outperforming Nifty by {rs:.1f}%")
+
+    if fundamentals is None:
+        fundamentals = {"Industry": "N/A", "Market Cap": None, "P/E Ratio": None, "P/B Ratio": None,
+                        "ROE": None, "Dividend Yield": None, "Operating Margin": None}
+    est_days = at('Est_Days')
+    if date is None:
+        date = datetime.now()
+
+    return {
+        "Ticker": scores['tickers'][col],
+        "Date": date.strftime("%Y-%m-%d"),
+        "Industry": fundamentals['Industry'],
+        "Signal": "STRONG BUY" if score >= 80 else "BUY" if score >= 60 else "WATCH",
+        "Confidence Score": score,
+        "Raw Score": score,
+        "RS_Score": round(rs, 2),
+        "Current Price": round_to_tick(at('Close')),
+        "Entry Price": round_to_tick(at('Entry')),
+        "Stop Loss": round_to_tick(at('Stop')),
+        "Target Price": round_to_tick(at('Target')),
+        "Est. Days": f"{max(1, int(est_days))}-{max(1, int(est_days+3))} Days",
+        "Reasoning": ", ".join(reasons),
+        "Market Cap": fundamentals['Market Cap'],
+        "P/E Ratio": fundamentals['P/E Ratio'],
+        "P/B Ratio": fundamentals['P/B Ratio'],
+        "ROE": fundamentals['ROE'],
+        "Dividend Yield": fundamentals['Dividend Yield'],
+        "Operating Margin": fundamentals['Operating Margin'],
+        "Fundamental Rating": rate_fundamentals(fundamentals['ROE'], fundamentals['Operating Margin'], fundamentals['P/E Ratio'])
+    }
+
+def run_panel_scan(tickers, nifty_df=None, panel=None, fundamentals=True, progress_callback=None):
+    """
+    Panel-mode equivalent of calling get_ultra_precision_signal for every ticker.
+    Downloads the daily bars in batches (unless a panel is given), scores all tickers in
+    one vectorised pass and returns the same result dicts. Fundamentals (one network call
+    per ticker) are only fetched for BUY / STRONG BUY rows.
+    """
+    if panel is None:
+        if progress_callback:
+            progress_callback(0.0, f"Downloading {len(tickers)} tickers...")
+        panel = pn.load_panel(tickers, period="1y", interval="1d")
+    if not panel or panel['Close'].empty:
+        return []
+
+    scores = score_panel(panel, nifty_df=nifty_df)
+    # A ticker's latest bar is the last row where it has a close
+    last_rows = len(scores['index']) - 1 - np.argmax(~np.isnan(scores['Close'][::-1]), axis=0)
+
+    results = []
+    total = len(scores['tickers'])
+    for col, ticker in enumerate(scores['tickers']):
+        row = last_rows[col]
+        if not scores['Eligible'][row, col]:
+            continue
+        info = None
+        if fundamentals and scores['Score'][row, col] >= 60:
+            if progress_callback:
+                progress_callback(col / total, f"Fundamentals {ticker}...")
+            info = get_fundamentals(ticker)
+        results.append(panel_signal(scores, col, row, fundamentals=info))
+    return results
+
+def run_pro_scanner(progress_callback=None, panel=False):
+    """
+    Scans the WATCHLIST. panel=True downloads all tickers in batches and scores them
+    together (run_panel_scan) instead of one get_ultra_precision_signal call per ticker.
+    """
     results = []
     
     # 1. regime Filter: Nifty 50
@@ -186,7 +359,7 @@ def run_pro_scanner(progress_callback=None):
     
     market_status = "NEUTRAL"
     if nifty is not None and not nifty.empty:
-        nifty_ema50 = nifty['Close'].ewm(span=50, adjust=False).mean().iloc[-1]
+        nifty_ema50 = ema(nifty['Close'], 50, min_periods=0)[-1]
         cur_nifty = nifty['Close'].iloc[-1]
         
         market_bullish = cur_nifty > nifty_ema50
@@ -201,33 +374,39 @@ def run_pro_scanner(progress_callback=None):
     if not market_bullish:
         warnings.append(f"⚠️ **Market Regime Filter Active**: Nifty ({int(cur_nifty)}) < EMA50 ({int(nifty_ema50)}). Buying power reduced.")
 
-    total_stocks = len(WATCHLIST)
     valid_signals = []
-    
-    for i, ticker in enumerate(WATCHLIST):
-        if progress_callback:
-            progress_callback(i / total_stocks, f"Scanning {ticker}...")
-            
-        try:
-            # Pass Nifty DF for RS calculation
-            analysis = get_ultra_precision_signal(ticker, nifty_df=nifty) 
-            if not analysis: continue
-            
-            # REGIME FILTER:
-            # If Market Bearish, ONLY allow Super-High Confidence (90+) + High Alpha
-            if not market_bullish:
-                if analysis['Confidence Score'] < 90 or analysis['RS_Score'] < 0:
-                     analysis['Confidence Score'] = 0 # Suppress signal
-                     analysis['Signal'] = "SUPPRESSED (Market Regime)"
-            
-            results.append(analysis)
-            
-            if analysis["Signal"] in ["BUY", "STRONG BUY"] and analysis["Confidence Score"] >= 80:
-                valid_signals.append(analysis)
+
+    def apply_regime(analysis):
+        # REGIME FILTER:
+        # If Market Bearish, ONLY allow Super-High Confidence (90+) + High Alpha
+        if not market_bullish:
+            if analysis['Confidence Score'] < 90 or analysis['RS_Score'] < 0:
+                 analysis['Confidence Score'] = 0 # Suppress signal
+                 analysis['Signal'] = "SUPPRESSED (Market Regime)"
+        
+        results.append(analysis)
+        
+        if analysis["Signal"] in ["BUY", "STRONG BUY"] and analysis["Confidence Score"] >= 80:
+            valid_signals.append(analysis)
+
+    if panel:
+        for analysis in run_panel_scan(WATCHLIST, nifty_df=nifty, progress_callback=progress_callback):
+            apply_regime(analysis)
+    else:
+        total_stocks = len(WATCHLIST)
+        for i, ticker in enumerate(WATCHLIST):
+            if progress_callback:
+                progress_callback(i / total_stocks, f"Scanning {ticker}...")
                 
-        except Exception as e:
-            print(f"Error scanning {ticker}: {e}")
-            continue
+            try:
+                # Pass Nifty DF for RS calculation
+                analysis = get_ultra_precision_signal(ticker, nifty_df=nifty) 
+                if not analysis: continue
+                apply_regime(analysis)
+                    
+            except Exception as e:
+                print(f"Error scanning {ticker}: {e}")
+                continue
 
     if valid_signals:
         try:
@@ -240,6 +419,74 @@ def run_pro_scanner(progress_callback=None):
             
 
 
+# --- BACKTESTING ---
+
+# MTF funding: 4x exposure, 0.04% per day interest on the borrowed 75%
+LEVERAGE = 4
+DAILY_MTF_INTEREST = 0.0004
+BORROWED_CAPITAL_WEIGHT = 0.75
+
+def backtest_panel(stock_panel, sector_panel, sectors):
+    """
+    The run_strategy_backtest rules for many tickers at once.
+    stock_panel / sector_panel: {field: DataFrame (dates x tickers)} from src.panel.build_panel.
+    sectors: sector index ticker for each stock column (same order).
+    Each ticker is evaluated on the dates it shares with its sector index, exactly as the
+    single-ticker version does. Returns a dict of (dates x tickers) matrices.
+    """
+    stock_close = stock_panel['Close']
+    index = stock_close.index
+    close = pn.as_matrix(stock_close)
+
+    # 1. Indicators on each series' own history
+    ema20 = ema(close, 20)
+    vpt = ind.vpt(close, pn.as_matrix(stock_panel['Volume']))
+    rsi = ind.rsi(close, 14, smoothing="sma")
+    sector_close = sector_panel['Close'].reindex(index)
+    sector_ema20 = pd.DataFrame(ema(sector_panel['Close'], 20), index=sector_panel['Close'].index,
+                                columns=sector_panel['Close'].columns).reindex(index)
+    sec_close = pn.as_matrix(sector_close[list(sectors)])
+    sec_ema20 = pn.as_matrix(sector_ema20[list(sectors)])
+
+    # 2. Align each ticker with its sector (common dates only)
+    aligned = ~np.isnan(close) & ~np.isnan(sec_close)
+
+    # 3. Strategy Signals (The 4 Pillars), on aligned dates
+    with np.errstate(invalid='ignore'):
+        signal = ((close > ema20) & (sec_close > sec_ema20) &
+                  (vpt > pn.prev_where(vpt, aligned)) & (rsi > 50) & aligned).astype(np.float64)
+    signal[~aligned] = np.nan
+
+    # 4. MTF Net Returns (signal at close of T is traded on T+1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        daily_returns = np.where(aligned, close / pn.prev_where(close, aligned) - 1, np.nan)
+    strategy_returns = (daily_returns * LEVERAGE) - (DAILY_MTF_INTEREST * BORROWED_CAPITAL_WEIGHT)
+    actual_returns = strategy_returns * pn.prev_where(signal, aligned)
+
+    return {
+        "index": index, "tickers": list(stock_close.columns), "Aligned": aligned,
+        "Signal": signal, "Daily_Return": daily_returns, "Actual_Return": actual_returns,
+        "Portfolio_Value": np.cumprod(1 + np.nan_to_num(actual_returns), axis=0),
+        "Market_Value": np.cumprod(1 + np.nan_to_num(daily_returns), axis=0)
+    }
+
+def backtest_stats(bt):
+    """Per-ticker metrics of run_strategy_backtest (as numbers), one row per ticker."""
+    value = bt['Portfolio_Value']
+    drawdown = value / np.maximum.accumulate(value, axis=0) - 1
+    with np.errstate(invalid='ignore'):
+        win_days = (bt['Actual_Return'] > 0).sum(axis=0)
+    trade_days = (bt['Signal'] == 1).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        win_rate = np.where(trade_days > 0, win_days / trade_days * 100, 0.0)
+    return pd.DataFrame({
+        "Total Return (MTF)": (value[-1] - 1) * 100,
+        "Buy & Hold Return": (bt['Market_Value'][-1] - 1) * 100,
+        "Max Drawdown": drawdown.min(axis=0) * 100,
+        "Trade Opportunity Days": trade_days,
+        "Daily Win Rate": win_rate
+    }, index=pd.Index(bt['tickers'], name="Ticker"))
+
 def run_strategy_backtest(ticker_symbol, sector_index="^NSEBANK", years=1):
     # 1. Fetch Data for Stock and Sector
     start_date = (pd.Timestamp.now() - pd.DateOffset(years=years)).strftime('%Y-%m-%d')
@@ -253,75 +500,86 @@ def run_strategy_backtest(ticker_symbol, sector_index="^NSEBANK", years=1):
     if stock_df.empty or sector_df.empty:
         return {"Error": "No data found"}
 
-    # 2. Technical Indicators
-    # Trend
-    stock_df['EMA20'] = stock_df['Close'].ewm(span=20, adjust=False).mean()
-    sector_df['EMA20'] = sector_df['Close'].ewm(span=20, adjust=False).mean()
-    
-    # Volume Price Trend (VPT)
-    stock_df['VPT'] = (stock_df['Volume'] * stock_df['Close'].pct_change()).cumsum()
-    
-    # RSI
-    delta = stock_df['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    stock_df['RSI'] = 100 - (100 / (1 + (gain / loss)))
-
-    # Align Sector Data
-    # We need to ensure indices match for vector operations, simpler is to just reindex or use common index
-    # For simplicity assuming trading days match mostly or using what we have
-    common_index = stock_df.index.intersection(sector_df.index)
-    stock_df = stock_df.loc[common_index]
-    sector_df = sector_df.loc[common_index]
-    
-    # 3. Strategy Signals (The 4 Pillars)
-    # Alignment: Stock > EMA and Sector > EMA and VPT rising and RSI in zone
-    stock_df['Signal'] = np.where(
-        (stock_df['Close'] > stock_df['EMA20']) & 
-        (sector_df['Close'] > sector_df['EMA20']) & 
-        (stock_df['VPT'] > stock_df['VPT'].shift(1)) &
-        (stock_df['RSI'] > 50),
-        1, 0
-    )
-
-    # 4. Calculate MTF Net Returns
-    daily_returns = stock_df['Close'].pct_change()
-    
-    # Leveraged Returns (4x)
-    leverage = 4
-    daily_mtf_interest = 0.0004  # 0.04% per day on the borrowed 75%
-    borrowed_capital_weight = 0.75
-    
-    # Strategy Return = (Daily Return * 4) - (Daily Interest * 0.75)
-    stock_df['Strategy_Return'] = (daily_returns * leverage) - (daily_mtf_interest * borrowed_capital_weight)
-    
-    # Only apply returns when Signal is active (using shift to avoid look-ahead bias)
-    # Signal calculated at close of day T is for trade on day T+1
-    stock_df['Actual_Returns'] = stock_df['Strategy_Return'] * stock_df['Signal'].shift(1)
-    
-    # Calculate Cumulative Growth
-    stock_df['Portfolio_Value'] = (1 + stock_df['Actual_Returns'].fillna(0)).cumprod()
-    stock_df['Market_Value'] = (1 + daily_returns.fillna(0)).cumprod()
+    # 2-4. Indicators, signals and returns (shared with the portfolio backtester)
+    bt = backtest_panel(pn.build_panel({ticker_symbol: stock_df}), pn.build_panel({sector_index: sector_df}), [sector_index])
 
     # 5. Performance Metrics
-    if stock_df.empty: return {"Error": "Not enough data"}
-    
-    total_return = (stock_df['Portfolio_Value'].iloc[-1] - 1) * 100
-    market_return = (stock_df['Market_Value'].iloc[-1] - 1) * 100
-    
-    # Max Drawdown
-    cum_max = stock_df['Portfolio_Value'].cummax()
-    drawdown = stock_df['Portfolio_Value'] / cum_max - 1
-    max_drawdown = drawdown.min() * 100
-    
-    win_days = len(stock_df[stock_df['Actual_Returns'] > 0])
-    total_trade_days = len(stock_df[stock_df['Signal'] == 1])
+    if not bt['Aligned'].any(): return {"Error": "Not enough data"}
+    stats = backtest_stats(bt).iloc[0]
+    total_trade_days = int(stats['Trade Opportunity Days'])
 
     return {
         "Ticker": ticker_symbol,
-        "Total Return (MTF)": f"{round(total_return, 2)}%",
-        "Buy & Hold Return": f"{round(market_return, 2)}%",
-        "Max Drawdown": f"{round(max_drawdown, 2)}%",
+        "Total Return (MTF)": f"{round(stats['Total Return (MTF)'], 2)}%",
+        "Buy & Hold Return": f"{round(stats['Buy & Hold Return'], 2)}%",
+        "Max Drawdown": f"{round(stats['Max Drawdown'], 2)}%",
         "Trade Opportunity Days": total_trade_days,
-        "Daily Win Rate": f"{round((win_days/total_trade_days)*100, 2)}%" if total_trade_days > 0 else "0%"
+        "Daily Win Rate": f"{round(stats['Daily Win Rate'], 2)}%" if total_trade_days > 0 else "0%"
+    }
+
+def run_portfolio_backtest(tickers=None, sector_map=None, start=None, end=None, years=1):
+    """
+    Backtests the MTF rules on a whole universe in one run.
+    tickers: defaults to WATCHLIST. sector_map: ticker -> sector index (defaults to config.SECTOR_MAP,
+    unmapped tickers use MARKET_INDEX). start/end: 'YYYY-MM-DD' (start defaults to `years` ago).
+    Stocks and sector indices are downloaded together in batches.
+
+    Returns {"Tickers": per-ticker stats DataFrame, "Portfolio": summary dict,
+             "Equity": DataFrame of portfolio and equal-weight buy & hold value by date}.
+    The portfolio splits capital equally across the tickers holding a signal each day
+    (cash when none do); the benchmark holds every ticker with equal weight.
+    """
+    from src.config import SECTOR_MAP, MARKET_INDEX
+
+    tickers = list(WATCHLIST if tickers is None else tickers)
+    sector_map = SECTOR_MAP if sector_map is None else sector_map
+    if start is None:
+        start = (pd.Timestamp.now() - pd.DateOffset(years=years)).strftime('%Y-%m-%d')
+
+    sector_of = {t: sector_map.get(t, MARKET_INDEX) for t in tickers}
+    sector_indices = sorted(set(sector_of.values()))
+    data = pn.load_panel(tickers + sector_indices, period=None, interval="1d", start=start, end=end)
+    if not data or data['Close'].empty:
+        return {"Error": "No data found"}
+
+    available = [t for t in tickers if t in data['Close'].columns and sector_of[t] in data['Close'].columns]
+    if not available:
+        return {"Error": "No data found"}
+    used_sectors = sorted(set(sector_of[t] for t in available))
+
+    def subset(columns):
+        return {field: df[columns].dropna(how='all') for field, df in data.items()}
+
+    bt = backtest_panel(subset(available), subset(used_sectors), [sector_of[t] for t in available])
+    stats = backtest_stats(bt)
+    stats.insert(0, "Sector", [sector_of[t] for t in available])
+
+    # Portfolio: equal weight across open positions, rebalanced daily
+    position = pn.prev_where(bt['Signal'], bt['Aligned']) == 1
+    active = position.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        daily = np.where(active > 0, np.where(position, bt['Actual_Return'], 0.0).sum(axis=1) / active, 0.0)
+        held = (~np.isnan(bt['Daily_Return'])).sum(axis=1)
+        bench = np.where(held > 0, np.nansum(bt['Daily_Return'], axis=1) / held, 0.0)
+    equity = pd.DataFrame({
+        "Portfolio_Value": np.cumprod(1 + np.nan_to_num(daily)),
+        "Market_Value": np.cumprod(1 + bench)
+    }, index=bt['index'])
+
+    value = equity['Portfolio_Value']
+    invested_days = int((active > 0).sum())
+    win_days = int((daily > 0).sum())
+    portfolio = {
+        "Tickers": len(available),
+        "Total Return (MTF)": f"{round((value.iloc[-1] - 1) * 100, 2)}%",
+        "Buy & Hold Return": f"{round((equity['Market_Value'].iloc[-1] - 1) * 100, 2)}%",
+        "Max Drawdown": f"{round((value / value.cummax() - 1).min() * 100, 2)}%",
+        "Invested Days": invested_days,
+        "Avg Open Positions": round(float(active[active > 0].mean()), 1) if invested_days else 0,
+        "Daily Win Rate": f"{round(win_days / invested_days * 100, 2)}%" if invested_days > 0 else "0%"
     }
+    missing = [t for t in tickers if t not in available]
+    if missing:
+        print(f"⚠️ Warning: no data for {len(missing)} tickers: {', '.join(missing[:10])}")
+
+    return {"Tickers": stats.round(2), "Portfolio": portfolio, "Equity": equity}
@@ -1,13 +1,116 @@
 import pandas as pd
-import yfinance as yf
+from src.lazy_imports import lazy
 from datetime import datetime, time
 import numpy as np
 from src.utils import fetch_data_robust, round_to_tick
+from src.indicators import ema
+from src.streaming import EMA
+from src import panel as pn
 
-def calculate_orb_signal(ticker):
+yf = lazy("yfinance")  # Imported on the first download
+
+# --- OPENING RANGE ---
+
+ORB_WINDOWS = (15, 30, 60)  # minutes after 09:15
+
+IST = 'Asia/Kolkata'
+OPEN_MINUTE = 9 * 60 + 15
+
+def to_ist(df):
+    """Returns the frame with its index in IST (naive timestamps are treated as UTC, like the tracker)."""
+    index = df.index
+    if index.tz is None:
+        index = index.tz_localize('UTC')
+    out = df.copy()
+    out.index = index.tz_convert(IST)
+    return out
+
+def stack_sessions(frames):
+    """
+    One long frame of 5m bars for all tickers: Ticker, Datetime (IST), Session (date),
+    Minute (minutes since 09:15, bar start) and Pos (bar number within the session).
+    """
+    parts = []
+    for ticker, df in frames.items():
+        if df is None or df.empty:
+            continue
+        if isinstance(df.columns, pd.MultiIndex): df.columns = df.columns.get_level_values(0)
+        df = to_ist(df)[['Open', 'High', 'Low', 'Close', 'Volume']].dropna(subset=['Close'])
+        part = df.reset_index(names='Datetime')
+        part['Ticker'] = ticker
+        parts.append(part)
+    if not parts:
+        return pd.DataFrame()
+
+    bars = pd.concat(parts, ignore_index=True).sort_values(['Ticker', 'Datetime'], ignore_index=True)
+    bars['Session'] = bars['Datetime'].dt.normalize()
+    bars['Minute'] = bars['Datetime'].dt.hour * 60 + bars['Datetime'].dt.minute - OPEN_MINUTE
+    bars['Pos'] = bars.groupby(['Ticker', 'Session'], sort=False).cumcount()
+    return bars
+
+def opening_ranges(bars, windows=ORB_WINDOWS):
+    """
+    High/low of the first `w` minutes of every session, for every window, in one grouped pass.
+    bars: output of stack_sessions().
+    Returns a DataFrame indexed by (Ticker, Session) with High_w, Low_w and Complete_w columns;
+    a window is complete once the session has a bar starting at or after its end.
+    """
+    columns = {}
+    aggregations = {}
+    for w in windows:
+        in_window = (bars['Minute'] >= 0) & (bars['Minute'] < w)
+        columns[f'High_{w}'] = bars['High'].where(in_window)
+        columns[f'Low_{w}'] = bars['Low'].where(in_window)
+        aggregations[f'High_{w}'] = 'max'
+        aggregations[f'Low_{w}'] = 'min'
+    columns['Last_Minute'] = bars['Minute']
+    aggregations['Last_Minute'] = 'max'
+
+    ranges = pd.DataFrame(columns).groupby([bars['Ticker'], bars['Session']], sort=False).agg(aggregations)
+    for w in windows:
+        ranges[f'Complete_{w}'] = (ranges['Last_Minute'] >= w) & ranges[f'High_{w}'].notna()
+    return ranges.drop(columns='Last_Minute')
+
+# (ticker, session) -> {window: (high, low)}; a range never changes once its window has closed
+_RANGE_CACHE = {}
+
+def get_opening_range(ticker, df, window_minutes=30):
+    """
+    Opening range (high, low) of the latest session in `df` for `window_minutes`, or None while
+    the window is still forming. All ORB_WINDOWS are computed together on the first call after
+    they close and served from the per-ticker, per-session cache afterwards.
     """
-    Calculates 30-Minute Opening Range Breakout (ORB) Signal.
-    Range: 09:15 to 09:45.
+    if df is None or df.empty:
+        return None
+    last = df.index[-1]
+    if last.tzinfo is None:
+        last = last.tz_localize('UTC')
+    session = last.tz_convert(IST).normalize()
+    key = (ticker, session)
+    cached = _RANGE_CACHE.get(key, {})
+    if window_minutes in cached:
+        return cached[window_minutes]
+
+    bars = stack_sessions({ticker: df})
+    windows = sorted(set(ORB_WINDOWS) | {window_minutes})
+    today = bars[bars['Session'] == session]
+    ranges = opening_ranges(today, windows).iloc[0]
+    for w in windows:
+        if ranges[f'Complete_{w}']:
+            cached[w] = (float(ranges[f'High_{w}']), float(ranges[f'Low_{w}']))
+
+    # Keep only the current session per ticker
+    for old in [k for k in _RANGE_CACHE if k[0] == ticker and k[1] != session]:
+        del _RANGE_CACHE[old]
+    _RANGE_CACHE[key] = cached
+    return cached.get(window_minutes)
+
+def calculate_orb_signal(ticker, window_minutes=30, df=None):
+    """
+    Calculates Opening Range Breakout (ORB) Signal.
+    Range: 09:15 to 09:15 + window_minutes (15, 30 or 60), located by IST timestamp.
+    df: optional 5m bars already downloaded (e.g. one batch for the whole watchlist);
+        fetched with period="1d" otherwise. Only the latest session is used.
     
     Returns:
         score (int): 0-100 Confidence Score
@@ -16,27 +119,21 @@ def calculate_orb_signal(ticker):
     """
     try:
         # 1. Fetch Today's 5m Data
-        # We need data starting from 09:15 today.
-        # yfinance period="1d", interval="5m" handles today's data.
-        df = fetch_data_robust(ticker, period="1d", interval="5m")
+        if df is None:
+            df = fetch_data_robust(ticker, period="1d", interval="5m")
         
-        if df is None or df.empty or len(df) < 6:
-            return 0, ["Insufficient Data (Need > 30 mins)"], 0, 0, 0, 0, 0, "NEUTRAL"
+        if df is None or df.empty:
+            return 0, [f"Insufficient Data (Need > {window_minutes} mins)"], 0, 0, 0, 0, 0, "NEUTRAL"
             
         if isinstance(df.columns, pd.MultiIndex): df.columns = df.columns.get_level_values(0)
+        df = to_ist(df)
+        df = df[df.index.normalize() == df.index[-1].normalize()]
 
-        # 2. Define ORB Window (09:15 - 09:45)
-        # Assuming timestamps are localized or standard. YF usually returns local IST if indian stocks, or UTC.
-        # Check first candle time. If it's 03:45 UTC (09:15 IST), we handle accordingly.
-        # Logic: Take the first 6 candles (6 * 5m = 30m).
-        
-        orb_candles = df.iloc[:6] 
-        # Verify time range roughly?
-        # first_candle_time = orb_candles.index[0]
-        # print(f"{ticker} Start: {first_candle_time.time()}")
-        
-        orb_high = orb_candles['High'].max()
-        orb_low = orb_candles['Low'].min()
+        # 2. ORB Window (cached per ticker per session once the window has closed)
+        orb = get_opening_range(ticker, df, window_minutes)
+        if orb is None:
+            return 0, [f"Insufficient Data (Need > {window_minutes} mins)"], 0, 0, 0, 0, 0, "NEUTRAL"
+        orb_high, orb_low = orb
         orb_range = orb_high - orb_low
         
         if orb_range == 0:
@@ -45,7 +142,8 @@ def calculate_orb_signal(ticker):
         # 3. Current Status
         latest = df.iloc[-1]
         current_price = latest['Close']
-        volume_spike = latest['Volume'] > df['Volume'].mean() * 1.5
+        # Against the session's mean volume before this bar (the breakout bar is never the first)
+        volume_spike = latest['Volume'] > df['Volume'].iloc[:-1].mean() * 1.5
         
         score = 0
         details = []
@@ -64,7 +162,7 @@ def calculate_orb_signal(ticker):
                 
             # Trend Check (Price > VWAP approx or EMA)
             # Simple EMA20 on 5m
-            ema20 = df['Close'].ewm(span=20).mean().iloc[-1]
+            ema20 = ema(df['Close'], 20, min_periods=0)[-1]
             if current_price > ema20:
                 score += 10
                 details.append("Above 5m EMA20")
@@ -83,7 +181,7 @@ def calculate_orb_signal(ticker):
                 score += 20
                 details.append("High Volume Breakdown")
                 
-            ema20 = df['Close'].ewm(span=20).mean().iloc[-1]
+            ema20 = ema(df['Close'], 20, min_periods=0)[-1]
             if current_price < ema20:
                 score += 10
                 details.append("Below 5m EMA20")
@@ -110,3 +208,262 @@ def calculate_orb_signal(ticker):
 
     except Exception as e:
         return 0, [f"Error: {e}"], 0, 0, 0, 0, 0, "NEUTRAL"
+
+
+# --- BACKTEST ---
+
+RANGE_WIDTH_BINS = [0, 0.5, 1.0, 1.5, 2.0, 3.0, np.inf]
+
+def backtest_orb(frames, window_minutes=30, volume_mult=1.5):
+    """
+    Replays the calculate_orb_signal rules on every session of every ticker in one grouped pass.
+    frames: {ticker: 5m OHLCV DataFrame} spanning many sessions.
+
+    Per session: the range is the high/low of the bars starting 09:15 up to 09:15 + window_minutes.
+    The first later bar closing outside it is the breakout (entry = range edge +/- 0.05,
+    SL = opposite edge, target = 1R). Exits are checked from the next bar, SL before target,
+    otherwise the trade exits at the session close. Volume spike uses the session's mean volume
+    before the bar and EMA20 the session's own bars, as the live signal sees them at that bar.
+    Returns one row per breakout trade.
+    """
+    bars = stack_sessions(frames)
+    if bars.empty:
+        return pd.DataFrame()
+    keys = [bars['Ticker'], bars['Session']]
+    grouped = bars.groupby(keys, sort=False)
+
+    # 1. Opening range per session
+    ranges = opening_ranges(bars, [window_minutes]).reindex(pd.MultiIndex.from_arrays(keys))
+    bars['ORB_High'] = ranges[f'High_{window_minutes}'].to_numpy()
+    bars['ORB_Low'] = ranges[f'Low_{window_minutes}'].to_numpy()
+
+    # 2. Live-signal context at each bar (causal within the session)
+    bars['Vol_Mean'] = (grouped['Volume'].cumsum() - bars['Volume']) / bars['Pos']  # Earlier bars only
+    # Session EMA20 for all sessions at once: bar number x session matrix, one column per session
+    session_id = grouped.ngroup().to_numpy()
+    pos = bars['Pos'].to_numpy()
+    closes = np.full((pos.max() + 1, session_id.max() + 1), np.nan)
+    closes[pos, session_id] = bars['Close'].to_numpy()
+    bars['EMA20'] = ema(closes, 20, min_periods=0)[pos, session_id]
+
+    # 3. First breakout after the window
+    after = bars['Minute'] >= window_minutes
+    up = after & (bars['Close'] > bars['ORB_High']) & (bars['ORB_High'] > bars['ORB_Low'])
+    down = after & (bars['Close'] < bars['ORB_Low']) & (bars['ORB_High'] > bars['ORB_Low'])
+    breakout = up | down
+    first = breakout & (breakout.groupby(keys, sort=False).cumsum() == 1)
+
+    trades = bars[first].copy()
+    if trades.empty:
+        return pd.DataFrame()
+    is_buy = up[first].to_numpy()
+    orb_range = trades['ORB_High'] - trades['ORB_Low']
+    trades['Side'] = np.where(is_buy, "BUY", "SELL")
+    trades['Entry'] = np.where(is_buy, trades['ORB_High'] + 0.05, trades['ORB_Low'] - 0.05)
+    trades['SL'] = np.where(is_buy, trades['ORB_Low'], trades['ORB_High'])
+    trades['Target'] = np.where(is_buy, trades['Entry'] + orb_range, trades['Entry'] - orb_range)
+    for col in ['ORB_High', 'ORB_Low', 'Entry', 'SL', 'Target']:
+        trades[col] = np.round(trades[col] / 0.05) * 0.05
+    trades['Range %'] = orb_range / trades['ORB_Low'] * 100
+
+    volume_spike = trades['Volume'] > trades['Vol_Mean'] * volume_mult
+    with_trend = np.where(is_buy, trades['Close'] > trades['EMA20'], trades['Close'] < trades['EMA20'])
+    trades['Score'] = 60 + 20 * volume_spike.astype(int) + 10 * with_trend.astype(int)
+
+    # 4. Exits: first SL / target touch after the breakout bar
+    trade_key = pd.MultiIndex.from_arrays([trades['Ticker'], trades['Session']])
+    params = trades.set_index(trade_key)[['Pos', 'Side', 'SL', 'Target']]
+    bar_key = pd.MultiIndex.from_arrays(keys)
+    joined = params.reindex(bar_key)
+    live = (bars['Pos'].to_numpy() > joined['Pos'].to_numpy())
+    buy = (joined['Side'] == "BUY").to_numpy()
+    sl, target = joined['SL'].to_numpy(), joined['Target'].to_numpy()
+    high, low = bars['High'].to_numpy(), bars['Low'].to_numpy()
+    sl_hit = live & np.where(buy, low <= sl, high >= sl)
+    target_hit = live & np.where(buy, high >= target, low <= target)
+
+    pos = bars['Pos'].astype(float)
+    first_sl = pos.where(sl_hit).groupby(keys, sort=False).min()
+    first_target = pos.where(target_hit).groupby(keys, sort=False).min()
+    last_close = grouped['Close'].last()
+    last_pos = grouped['Pos'].last()
+
+    first_sl = first_sl.reindex(trade_key).to_numpy()
+    first_target = first_target.reindex(trade_key).to_numpy()
+    sl_first = ~np.isnan(first_sl) & (np.isnan(first_target) | (first_sl <= first_target))
+    target_first = ~np.isnan(first_target) & ~sl_first
+
+    trades['Status'] = np.where(sl_first, "STOP_LOSS_HIT", np.where(target_first, "TARGET_HIT", "EXIT_AT_CLOSE"))
+    trades['Exit'] = np.where(sl_first, trades['SL'], np.where(target_first, trades['Target'],
+                                                                last_close.reindex(trade_key).to_numpy()))
+    exit_pos = np.where(sl_first, first_sl, np.where(target_first, first_target,
+                                                     last_pos.reindex(trade_key).to_numpy()))
+    trades['Bars Held'] = (exit_pos - trades['Pos']).astype(int)
+    direction = np.where(is_buy, 1, -1)
+    trades['PnL %'] = (trades['Exit'] - trades['Entry']) / trades['Entry'] * 100 * direction
+
+    trades['Session'] = trades['Session'].dt.date
+    columns = ['Ticker', 'Session', 'Datetime', 'Side', 'Score', 'ORB_High', 'ORB_Low', 'Range %',
+               'Entry', 'SL', 'Target', 'Status', 'Exit', 'Bars Held', 'PnL %']
+    return trades[columns].rename(columns={'Datetime': 'Breakout Time'}).reset_index(drop=True)
+
+def _hit_rates(trades, by):
+    grouped = trades.groupby(by, observed=True)
+    return pd.DataFrame({
+        "Trades": grouped.size(),
+        "Target Hit %": grouped['Status'].apply(lambda s: (s == "TARGET_HIT").mean() * 100),
+        "SL Hit %": grouped['Status'].apply(lambda s: (s == "STOP_LOSS_HIT").mean() * 100),
+        "Exit At Close %": grouped['Status'].apply(lambda s: (s == "EXIT_AT_CLOSE").mean() * 100),
+        "Avg PnL %": grouped['PnL %'].mean()
+    }).round(2)
+
+def orb_report(trades):
+    """Hit rates of backtest_orb trades by ticker, by opening-range width and by score."""
+    if trades is None or trades.empty:
+        return {"Error": "No breakout trades"}
+    width = pd.cut(trades['Range %'], RANGE_WIDTH_BINS)
+    return {
+        "Overall": _hit_rates(trades.assign(All="All"), "All").iloc[0].to_dict(),
+        "By Ticker": _hit_rates(trades, "Ticker").sort_values("Avg PnL %", ascending=False),
+        "By Range Width": _hit_rates(trades.assign(**{"Range Width %": width}), "Range Width %"),
+        "By Score": _hit_rates(trades, "Score")
+    }
+
+def run_orb_backtest(tickers=None, period="60d", window_minutes=30):
+    """Downloads `period` of 5m bars for the watchlist in batches and backtests the ORB rules."""
+    from src.config import WATCHLIST
+    from src.utils import fetch_batches
+
+    tickers = list(WATCHLIST if tickers is None else tickers)
+    frames = fetch_batches(tickers, period=period, interval="5m")
+    trades = backtest_orb(frames, window_minutes=window_minutes)
+    return trades, orb_report(trades)
+
+
+# --- LIVE WATCHER ---
+
+class ORBState:
+    """
+    One ticker's opening range and breakout context for the current session, fed bar by bar.
+    The range grows over the bars starting in 09:15 + window_minutes and is frozen by the first
+    later bar; from then on each bar costs O(1): close vs range, volume vs the session's mean
+    volume before the bar, close vs the session EMA20. Same rules as backtest_orb (first
+    breakout only, no sector filter). Works on 5m or 1m bars.
+    """
+
+    def __init__(self, ticker, window_minutes=30, volume_mult=1.5):
+        self.ticker = ticker
+        self.window_minutes = window_minutes
+        self.volume_mult = volume_mult
+        self.session = None
+        self.last_ts = None
+        self._reset()
+
+    def _reset(self):
+        self.high = np.nan
+        self.low = np.nan
+        self.complete = False
+        self.fired = False
+        self.bars = 0
+        self.volume_sum = 0.0
+        self.ema20 = EMA(span=20, min_periods=0)
+
+    @property
+    def range(self):
+        """(high, low) once the window has closed, else None."""
+        return (self.high, self.low) if self.complete else None
+
+    def update(self, ts, open_, high, low, close, volume):
+        """
+        Feeds one closed bar. Returns a breakout event (see breakout_event) on the bar that
+        breaks the range, None otherwise. Bars at or before the last one seen are ignored.
+        """
+        ts = pd.Timestamp(ts)
+        if ts.tzinfo is None:
+            ts = ts.tz_localize('UTC')
+        ts = ts.tz_convert(IST)
+        if self.last_ts is not None and ts <= self.last_ts:
+            return None
+        self.last_ts = ts
+
+        session = ts.normalize()
+        if session != self.session:
+            self.session = session
+            self._reset()
+
+        prior_volume = self.volume_sum / self.bars if self.bars else np.nan
+        self.bars += 1
+        self.volume_sum += volume
+        ema20 = self.ema20.update(close)
+        minute = ts.hour * 60 + ts.minute - OPEN_MINUTE
+
+        if minute < self.window_minutes:
+            if minute >= 0:
+                self.high = np.fmax(self.high, high)
+                self.low = np.fmin(self.low, low)
+            return None
+        if not self.complete:
+            self.complete = True
+        if self.fired or not self.high > self.low:
+            return None
+
+        if close > self.high:
+            side = "BUY"
+        elif close < self.low:
+            side = "SELL"
+        else:
+            return None
+        self.fired = True
+
+        volume_spike = volume > prior_volume * self.volume_mult
+        with_trend = close > ema20 if side == "BUY" else close < ema20
+        return breakout_event(self, ts, side, close, volume_spike, with_trend)
+
+    def update_frame(self, df):
+        """Feeds every new bar of an OHLCV frame (oldest first). Returns the events raised."""
+        events = []
+        for ts, o, h, l, c, v in zip(df.index, df['Open'].to_numpy(float), df['High'].to_numpy(float),
+                                     df['Low'].to_numpy(float), df['Close'].to_numpy(float),
+                                     df['Volume'].to_numpy(float)):
+            event = self.update(ts, o, h, l, c, v)
+            if event is not None:
+                events.append(event)
+        return events
+
+def breakout_event(state, ts, side, price, volume_spike, with_trend):
+    """
+    Breakout as a signal dict TradeTracker.add_trade accepts (strategy_type="Intraday"):
+    Entry Price / Stop Loss / Target Price as in calculate_orb_signal, plus Score and Details.
+    """
+    orb_high, orb_low = state.high, state.low
+    orb_range = orb_high - orb_low
+    score = 60
+    if side == "BUY":
+        details = [f"ORB Breakout: Price {price:.2f} > High {orb_high:.2f}"]
+        entry, sl = orb_high + 0.05, orb_low
+        target = entry + orb_range
+    else:
+        details = [f"ORB Breakdown: Price {price:.2f} < Low {orb_low:.2f}"]
+        entry, sl = orb_low - 0.05, orb_high
+        target = entry - orb_range
+    if volume_spike:
+        score += 20
+        details.append("High Volume Breakout" if side == "BUY" else "High Volume Breakdown")
+    if with_trend:
+        score += 10
+        details.append("Above 5m EMA20" if side == "BUY" else "Below 5m EMA20")
+
+    return {
+        "Ticker": state.ticker,
+        "Time": ts,
+        "Side": side,
+        "Score": score,
+        "Details": ", ".join(details),
+        "Signal": f"ORB {state.window_minutes}m {side} @ {ts.strftime('%H:%M')}",
+        "ORB High": round_to_tick(orb_high),
+        "ORB Low": round_to_tick(orb_low),
+        "Current Price": price,
+        "Entry Price": round_to_tick(entry),
+        "Stop Loss": round_to_tick(sl),
+        "Target Price": round_to_tick(target)
+    }
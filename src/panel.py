@@ -0,0 +1,93 @@
+"""
+panel.py
+
+Cross-sectional (dates x tickers) data.
+Handles:
+- Aligning the daily OHLCV of a whole watchlist into one matrix per field.
+- The on-disk copy of downloaded panels (data/panel_cache/).
+- Panel-only helpers (as_matrix, prev_where). The indicator kernels of src/indicators.py
+  run down axis 0, so they take these matrices directly and process every ticker at once.
+"""
+import os
+import time
+import numpy as np
+import pandas as pd
+
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+CACHE_DIR = os.path.join(DATA_DIR, "panel_cache")
+
+
+# --- LOADING ---
+
+def build_panel(frames, fields=FIELDS):
+    """
+    Aligns {ticker: OHLCV DataFrame} into {field: DataFrame (dates x tickers)}.
+    The index is the union of all dates; a ticker without a bar on a date gets NaN.
+    """
+    frames = {t: df for t, df in frames.items() if df is not None and not df.empty}
+    panel = {}
+    for field in fields:
+        panel[field] = pd.DataFrame({t: df[field] for t, df in frames.items() if field in df}).sort_index()
+    return panel
+
+def load_panel(tickers, period="1y", interval="1d", chunk_size=100, **kwargs):
+    """
+    Downloads the tickers in batches of `chunk_size` and returns build_panel() of the result.
+    Extra keyword arguments (e.g. start/end with period=None) go to yf.download.
+    """
+    from src.utils import fetch_batches
+
+    frames = fetch_batches(tickers, chunk_size=chunk_size, period=period, interval=interval, auto_adjust=True, **kwargs)
+    return build_panel(frames)
+
+def load_panel_cached(tickers, period="5y", interval="1d", cache_dir=None, max_age_hours=12):
+    """
+    load_panel() with an on-disk copy in data/panel_cache/ (one pickle per period/interval).
+    The copy is reused while it is younger than `max_age_hours` and was downloaded for every
+    ticker asked for (tickers that returned no data are not retried until it expires).
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    path = os.path.join(cache_dir, f"{period}_{interval}.pkl")
+    tickers = list(tickers)
+
+    if os.path.exists(path) and time.time() - os.path.getmtime(path) < max_age_hours * 3600:
+        try:
+            cached = pd.read_pickle(path)
+            if set(tickers) <= set(cached['tickers']):
+                panel = cached['panel']
+                columns = [t for t in tickers if t in panel['Close'].columns]
+                return {field: df[columns].dropna(how='all') for field, df in panel.items()}
+        except Exception as e:
+            print(f"⚠️ Warning: ignoring unreadable panel cache {path}: {e}")
+
+    panel = load_panel(tickers, period=period, interval=interval)
+    if panel and not panel['Close'].empty:
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        pd.to_pickle({"tickers": tickers, "panel": panel}, path)
+    return panel
+
+
+# --- HELPERS ---
+
+def as_matrix(values):
+    """Returns a DataFrame/array as a 2-D float64 array (a single series becomes one column)."""
+    if hasattr(values, 'to_numpy'):
+        values = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    values = np.asarray(values, dtype=np.float64)
+    return values.reshape(-1, 1) if values.ndim == 1 else values
+
+def prev_where(x, mask):
+    """
+    Value of x at the previous row where `mask` is True, per column (NaN if there is none).
+    Equivalent to pandas .shift(1) on the rows selected by `mask`.
+    """
+    rows = np.where(mask, np.arange(len(x)).reshape(-1, 1), -1)
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    prev = np.full_like(rows, -1)
+    prev[1:] = rows[:-1]
+    out = x[np.maximum(prev, 0), np.arange(x.shape[1])]
+    out[prev < 0] = np.nan
+    return out
@@ -0,0 +1,130 @@
+"""
+prefilter.py
+
+Cheap universe screen that runs before any intraday (5m) download.
+Handles:
+- Per-ticker daily bar cache in data/daily_cache/ (refreshed once before and once after the open, one batched download).
+- Dropping symbols that can never trigger: low ATR%, thin average turnover, or a gap outside the allowed band.
+
+Thresholds live in src/config.py (PREFILTER) and can be overridden per call.
+"""
+import os
+from datetime import datetime
+import pandas as pd
+import pytz
+from src.config import PREFILTER
+from src.indicators import atr
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+CACHE_DIR = os.path.join(DATA_DIR, "daily_cache")
+IST = pytz.timezone('Asia/Kolkata')
+
+def _cache_path(ticker, cache_dir):
+    return os.path.join(cache_dir, f"{ticker.replace('^', '_')}.csv")
+
+def _is_fresh(path, now):
+    """
+    Cache written today, and after 09:15 if the market has opened (so today's open/gap is in it).
+    Both clocks are read in IST whatever the host's timezone (a naive `now` is taken as IST).
+    """
+    if not os.path.exists(path):
+        return False
+    now = now.astimezone(IST) if now.tzinfo else IST.localize(now)
+    written = datetime.fromtimestamp(os.path.getmtime(path), IST)
+    market_open = now.replace(hour=9, minute=15, second=0, microsecond=0)
+    if now >= market_open:
+        return written >= market_open
+    return written.date() == now.date()
+
+def load_daily_bars(tickers, period="3mo", cache_dir=None, refresh=False):
+    """
+    Returns {ticker: daily OHLCV DataFrame}, served from the on-disk cache.
+    Tickers with a stale cache file are re-downloaded together in one batch.
+    """
+    from src.utils import fetch_batch
+
+    cache_dir = cache_dir or CACHE_DIR
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+
+    now = datetime.now(IST)
+    frames = {}
+    stale = []
+    for ticker in tickers:
+        path = _cache_path(ticker, cache_dir)
+        if not refresh and _is_fresh(path, now):
+            frames[ticker] = pd.read_csv(path, index_col=0, parse_dates=True)
+        else:
+            stale.append(ticker)
+
+    if stale:
+        fetched = fetch_batch(stale, period=period, interval="1d", auto_adjust=True)
+        for ticker, df in fetched.items():
+            df.to_csv(_cache_path(ticker, cache_dir))
+            frames[ticker] = df
+        for ticker in stale:
+            # Fall back to an old cache file if the download failed
+            path = _cache_path(ticker, cache_dir)
+            if ticker not in frames and os.path.exists(path):
+                frames[ticker] = pd.read_csv(path, index_col=0, parse_dates=True)
+
+    return frames
+
+def daily_metrics(df, window=14, turnover_window=20):
+    """ATR% (of last close), average daily turnover (Close * Volume) and the latest open gap %."""
+    close = df['Close'].to_numpy(float)
+    atr_value = atr(df['High'], df['Low'], df['Close'], window)[-1]
+    turnover = (df['Close'] * df['Volume']).tail(turnover_window).mean()
+    gap_pct = 0.0
+    if len(df) >= 2:
+        gap_pct = (df['Open'].iloc[-1] / df['Close'].iloc[-2] - 1) * 100
+    return {
+        "ATR%": atr_value / close[-1] * 100 if close[-1] else 0.0,
+        "Turnover": turnover,
+        "Gap%": gap_pct
+    }
+
+def screen_daily_bars(frames, min_atr_pct=None, min_turnover=None, min_gap_pct=None, max_gap_pct=None):
+    """
+    Applies the thresholds to already-loaded daily bars.
+    Returns (passed_tickers, rejected) where rejected maps ticker -> reason.
+    Any threshold left as None falls back to config.PREFILTER (a None there disables the check).
+    """
+    min_atr_pct = PREFILTER['min_atr_pct'] if min_atr_pct is None else min_atr_pct
+    min_turnover = PREFILTER['min_turnover'] if min_turnover is None else min_turnover
+    min_gap_pct = PREFILTER['min_gap_pct'] if min_gap_pct is None else min_gap_pct
+    max_gap_pct = PREFILTER['max_gap_pct'] if max_gap_pct is None else max_gap_pct
+
+    passed = []
+    rejected = {}
+    for ticker, df in frames.items():
+        if df is None or len(df) < 15:
+            rejected[ticker] = "Insufficient daily history"
+            continue
+
+        m = daily_metrics(df)
+        gap = abs(m['Gap%'])
+        if min_atr_pct is not None and not m['ATR%'] >= min_atr_pct:
+            rejected[ticker] = f"ATR {m['ATR%']:.2f}% < {min_atr_pct}%"
+        elif min_turnover is not None and not m['Turnover'] >= min_turnover:
+            rejected[ticker] = f"Turnover ₹{m['Turnover'] / 1e7:.1f} Cr < ₹{min_turnover / 1e7:.1f} Cr"
+        elif min_gap_pct is not None and gap < min_gap_pct:
+            rejected[ticker] = f"Gap {gap:.2f}% < {min_gap_pct}%"
+        elif max_gap_pct is not None and gap > max_gap_pct:
+            rejected[ticker] = f"Gap {gap:.2f}% > {max_gap_pct}%"
+        else:
+            passed.append(ticker)
+    return passed, rejected
+
+def prefilter_universe(tickers, **thresholds):
+    """
+    Cheap screen before intraday fetches.
+    Returns (tickers_to_scan, rejected). Tickers without any daily data are kept,
+    so a data hiccup never silently empties the scan.
+    """
+    tickers = list(tickers)
+    frames = load_daily_bars(tickers)
+    passed, rejected = screen_daily_bars(frames, **thresholds)
+    missing = [t for t in tickers if t not in frames]
+    keep = set(passed) | set(missing)
+    return [t for t in tickers if t in keep], rejected
@@ -1,6 +1,8 @@
-import yfinance as yf
+from src.lazy_imports import lazy
 from src.config import SECTOR_MAP, MARKET_INDEX
 
+yf = lazy("yfinance")  # Imported on the first download
+
 def get_sector_status(ticker):
     """
     Scientifically analyzes the parent sector of a stock.
@@ -52,7 +54,13 @@ def check_alignment(ticker, trade_side):
     Returns a Score Modifier (-20 to +20) based on alignment.
     """
     name, change, trend = get_sector_status(ticker)
-    
+    return alignment_from_status(name, change, trend, trade_side)
+
+def alignment_from_status(name, change, trend, trade_side):
+    """
+    Score modifier for an already-fetched sector status, so BUY and SELL can be
+    checked against one sector download.
+    """
     score_mod = 0
     reason = f"Sector {name} is {trend} ({change:.2f}%)"
     
@@ -1,11 +1,13 @@
-from textblob import TextBlob
+from src.lazy_imports import lazy
+
+textblob = lazy("textblob")  # Imported when the first headline is scored
 
 def analyze_sentiment(text):
     """
     Analyzes sentiment of a text string using TextBlob.
     Returns a score between -1 (negative) and 1 (positive).
     """
-    blob = TextBlob(text)
+    blob = textblob.TextBlob(text)
     return blob.sentiment.polarity
 
 def analyze_news_sentiment(news_items):
@@ -0,0 +1,354 @@
+"""
+streaming.py
+
+Stateful (incremental) versions of the intraday indicators.
+Handles:
+- O(1) per-bar updates for EMA, Wilder RSI, MACD, Bollinger, ATR, rolling VWAP and VSA volume average.
+- IntradayIndicatorState: the full indicator set used by calculate_confidence, per ticker.
+- JSON checkpoints per ticker so a scan can resume without re-warming 5 days of bars.
+
+Every stream reproduces the batch kernels in src/indicators.py bar for bar
+(same warm-up rules), so scores are identical whichever path computed them. That
+includes missing (NaN) bars: smoothed indicators carry their last input forward like
+the kernels' forward fill, and rolling windows are NaN while the bar is inside them.
+"""
+import json
+import math
+import os
+
+NAN = float('nan')
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+STATE_DIR = os.path.join(DATA_DIR, "stream_state")
+
+
+class _Stream:
+    """Base class: generic (nested) to_dict/from_dict for checkpointing."""
+
+    def to_dict(self):
+        state = {}
+        for key, value in vars(self).items():
+            if isinstance(value, _Stream):
+                value = {"__stream__": type(value).__name__, "state": value.to_dict()}
+            state[key] = value
+        return state
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls.__new__(cls)
+        for key, value in state.items():
+            if isinstance(value, dict) and "__stream__" in value:
+                value = _STREAMS[value["__stream__"]].from_dict(value["state"])
+            setattr(obj, key, value)
+        return obj
+
+
+class RollingWindow(_Stream):
+    """Fixed-size ring buffer with running sum and sum of squares (of its non-NaN values)."""
+
+    nans = 0  # Checkpoints written before NaN bars were counted
+
+    def __init__(self, window):
+        self.window = window
+        self.values = []
+        self.pos = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.nans = 0
+
+    def push(self, x):
+        missing = math.isnan(x)
+        if len(self.values) < self.window:
+            self.values.append(x)
+            if missing:
+                self.nans += 1
+            else:
+                self.total += x
+                self.total_sq += x * x
+            return
+        old = self.values[self.pos]
+        self.values[self.pos] = x
+        self.pos = (self.pos + 1) % self.window
+        self.nans += missing - math.isnan(old)
+        if self.pos == 0 or missing or math.isnan(old):
+            # Re-sum once per lap so running totals never drift, and around NaN bars
+            self.total = math.fsum(v for v in self.values if not math.isnan(v))
+            self.total_sq = math.fsum(v * v for v in self.values if not math.isnan(v))
+        else:
+            self.total += x - old
+            self.total_sq += x * x - old * old
+
+    @property
+    def full(self):
+        return len(self.values) == self.window
+
+    @property
+    def valid(self):
+        """Full and without NaN values (the batch rolling kernels are NaN otherwise)."""
+        return self.full and self.nans == 0
+
+    def mean(self):
+        return self.total / self.window if self.valid else NAN
+
+    def std(self):
+        if not self.valid:
+            return NAN
+        mean = self.total / self.window
+        return math.sqrt(max(self.total_sq / self.window - mean * mean, 0.0))
+
+
+class EMA(_Stream):
+    """
+    y = (1 - alpha) * y + alpha * x, masked until `min_periods` values are seen.
+    A NaN x repeats the last input (indicators.ewm forward-fills); NaNs before the first value are skipped.
+    """
+
+    last = NAN  # Checkpoints written before NaN inputs were carried forward
+
+    def __init__(self, span=None, alpha=None, min_periods=None):
+        self.alpha = alpha if alpha is not None else 2.0 / (span + 1)
+        self.min_periods = min_periods if min_periods is not None else (span or 0)
+        self.value = NAN
+        self.count = 0
+        self.last = NAN
+
+    def update(self, x):
+        if math.isnan(x):
+            if self.count == 0:
+                return self.current
+            x = self.last
+        self.last = x
+        if self.count == 0:
+            self.value = x
+        else:
+            self.value += self.alpha * (x - self.value)
+        self.count += 1
+        return self.current
+
+    @property
+    def current(self):
+        return self.value if self.count >= self.min_periods else NAN
+
+
+class RSI(_Stream):
+    """Wilder RSI (ta.momentum.rsi)."""
+
+    def __init__(self, window=14):
+        self.window = window
+        self.prev_close = NAN
+        self.gain = EMA(alpha=1.0 / window, min_periods=window)
+        self.loss = EMA(alpha=1.0 / window, min_periods=window)
+        self.value = NAN
+
+    def update(self, close):
+        delta = 0.0 if math.isnan(self.prev_close) else close - self.prev_close
+        self.prev_close = close
+        gain = self.gain.update(delta if delta > 0 else 0.0)
+        loss = self.loss.update(-delta if delta < 0 else 0.0)
+        if math.isnan(loss):
+            self.value = NAN
+        elif loss == 0:
+            self.value = 100.0
+        else:
+            self.value = 100 - (100 / (1 + gain / loss))
+        return self.value
+
+
+class MACD(_Stream):
+    """MACD line and signal (ta.trend.MACD); the signal starts at the first valid line value."""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = EMA(span=fast)
+        self.slow = EMA(span=slow)
+        self.signal = EMA(span=signal)
+        self.line = NAN
+        self.signal_value = NAN
+
+    def update(self, close):
+        fast = self.fast.update(close)
+        slow = self.slow.update(close)
+        self.line = fast - slow
+        if not math.isnan(self.line):
+            self.signal_value = self.signal.update(self.line)
+        return self.line, self.signal_value
+
+
+class Bollinger(_Stream):
+    """Rolling mean and population std (ta.volatility.BollingerBands)."""
+
+    def __init__(self, window=20, window_dev=2):
+        self.window_dev = window_dev
+        self.closes = RollingWindow(window)
+
+    def update(self, close):
+        self.closes.push(close)
+        return self.mid
+
+    @property
+    def mid(self):
+        return self.closes.mean()
+
+    @property
+    def high(self):
+        return self.mid + self.window_dev * self.closes.std()
+
+    @property
+    def low(self):
+        return self.mid - self.window_dev * self.closes.std()
+
+
+class ATR(_Stream):
+    """
+    ta.volatility.AverageTrueRange: mean of the first `window` true ranges, then Wilder. Zero during warm-up.
+    A bar without a true range (NaN high/low) repeats the last one, like indicators.atr's forward fill.
+    """
+
+    last_tr = NAN  # Checkpoints written before NaN bars were carried forward
+
+    def __init__(self, window=14):
+        self.window = window
+        self.prev_close = NAN
+        self.count = 0
+        self.seed_sum = 0.0
+        self.value = 0.0
+        self.last_tr = NAN
+
+    def update(self, high, low, close):
+        tr = high - low
+        if not math.isnan(self.prev_close):
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        if math.isnan(tr):
+            if math.isnan(self.last_tr):
+                return self.value
+            tr = self.last_tr
+        self.last_tr = tr
+        self.count += 1
+        if self.count < self.window:
+            self.seed_sum += tr
+        elif self.count == self.window:
+            self.value = (self.seed_sum + tr) / self.window
+        else:
+            self.value = (self.value * (self.window - 1) + tr) / self.window
+        return self.value
+
+
+class VWAP(_Stream):
+    """Rolling VWAP over `window` bars (ta.volume.VolumeWeightedAveragePrice)."""
+
+    def __init__(self, window=14):
+        self.price_volume = RollingWindow(window)
+        self.volume = RollingWindow(window)
+
+    def update(self, high, low, close, volume):
+        self.price_volume.push((high + low + close) / 3.0 * volume)
+        self.volume.push(volume)
+        return self.value
+
+    @property
+    def value(self):
+        if not self.volume.valid or not self.price_volume.valid or self.volume.total == 0:
+            return NAN
+        return self.price_volume.total / self.volume.total
+
+
+_STREAMS = {cls.__name__: cls for cls in [RollingWindow, EMA, RSI, MACD, Bollinger, ATR, VWAP]}
+
+
+class IntradayIndicatorState(_Stream):
+    """
+    All indicators used by calculate_confidence for one ticker on 5m bars.
+    update() costs O(1) per bar; bars at or before the last seen timestamp are ignored,
+    so overlapping incremental fetches can be replayed safely.
+    """
+
+    def __init__(self, ticker=None):
+        self.ticker = ticker
+        self.last_ts = None
+        self.bars = 0
+        self.close = NAN
+        self.high = NAN
+        self.low = NAN
+        self.volume = NAN
+        self.ema200 = EMA(span=200)
+        self.rsi = RSI(14)
+        self.macd = MACD()
+        self.bb = Bollinger(20, 2)
+        self.atr = ATR(14)
+        self.vwap = VWAP(14)
+        self.vol_ma = RollingWindow(20)
+
+    def update(self, ts, open_, high, low, close, volume):
+        """Feeds one closed bar. Returns False if the bar was already seen."""
+        key = ts.isoformat() if hasattr(ts, 'isoformat') else ts
+        if key is not None and self.last_ts is not None and key <= self.last_ts:
+            return False
+        self.last_ts = key
+        self.bars += 1
+        self.close, self.high, self.low, self.volume = close, high, low, volume
+
+        self.ema200.update(close)
+        self.rsi.update(close)
+        self.macd.update(close)
+        self.bb.update(close)
+        self.atr.update(high, low, close)
+        self.vwap.update(high, low, close, volume)
+        self.vol_ma.push(volume)
+        return True
+
+    def update_frame(self, df):
+        """Feeds every new bar of an OHLCV frame (oldest first). Returns the number of bars applied."""
+        applied = 0
+        for ts, o, h, l, c, v in zip(df.index, df['Open'].to_numpy(float), df['High'].to_numpy(float),
+                                     df['Low'].to_numpy(float), df['Close'].to_numpy(float),
+                                     df['Volume'].to_numpy(float)):
+            if self.update(ts, o, h, l, c, v):
+                applied += 1
+        return applied
+
+    def snapshot(self):
+        """Latest-bar values keyed like the columns calculate_confidence builds."""
+        bar_range = self.high - self.low
+        if bar_range == 0:
+            bar_range = 0.0001
+        close_pos = (self.close - self.low) / bar_range
+        high_volume = self.volume > self.vol_ma.mean()
+        return {
+            "Close": self.close,
+            "EMA200": self.ema200.current,
+            "VWAP": self.vwap.value,
+            "RSI": self.rsi.value,
+            "MACD": self.macd.line,
+            "MACD_Sig": self.macd.signal_value,
+            "BB_Mid": self.bb.mid,
+            "ATR": self.atr.value,
+            "VSA_Bull": bool(high_volume and close_pos > 0.7),
+            "VSA_Bear": bool(high_volume and close_pos < 0.3),
+        }
+
+
+_STREAMS[IntradayIndicatorState.__name__] = IntradayIndicatorState
+
+
+def _state_path(ticker, directory=None):
+    return os.path.join(directory or STATE_DIR, f"{ticker.replace('^', '_')}.json")
+
+def save_state(state, directory=None):
+    """Checkpoints one ticker's IntradayIndicatorState to JSON."""
+    directory = directory or STATE_DIR
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(_state_path(state.ticker, directory), 'w') as f:
+        json.dump(state.to_dict(), f)
+
+def load_state(ticker, directory=None):
+    """Restores a ticker's checkpoint, or returns a fresh state if none exists."""
+    path = _state_path(ticker, directory)
+    if not os.path.exists(path):
+        return IntradayIndicatorState(ticker)
+    try:
+        with open(path, 'r') as f:
+            return IntradayIndicatorState.from_dict(json.load(f))
+    except (ValueError, KeyError) as e:
+        print(f"⚠️ Warning: could not restore indicator state for {ticker}: {e}")
+        return IntradayIndicatorState(ticker)
@@ -0,0 +1,174 @@
+"""
+sweep.py
+
+Parameter sweep for the MTF scoring rules.
+Handles:
+- Grids over the score weights, RSI bands, ADX cutoff, ATR stop/target multipliers and the
+  minimum score, evaluated against one cached history panel.
+- Computing indicators once (score_panel) and resolving trades once per stop/target pair;
+  every weight combination is then a matrix product over the 144 possible check patterns.
+- A ranked table of expectancy, win rate and drawdown per combination.
+
+The short-trend and strong-RSI points are half of their weights, as in
+get_ultra_precision_signal (15 = 30 / 2, 10 = 20 / 2).
+"""
+import itertools
+import numpy as np
+import pandas as pd
+from src import panel as pn
+from src.mtf_strategy import score_panel
+from src.walk_forward import market_regime, resolve_trades, to_tick, TARGET_HIT, STOP_LOSS_HIT, EXPIRED
+
+# Current production values first in every list
+DEFAULT_GRID = {
+    "trend_weight": [30, 20, 40],
+    "rsi_weight": [20, 10, 30],
+    "adx_weight": [20, 10, 30],
+    "vpt_weight": [15, 10, 20],
+    "rs_weight": [15, 10, 20],
+    "rsi_band": [(50, 65, 75), (45, 60, 70), (55, 70, 80)],
+    "adx_cutoff": [25, 20, 30],
+    "sl_mult": [1.5, 1.0, 2.0],
+    "target_mult": [3.0, 2.0, 4.0],
+    "min_score": [60, 80]
+}
+
+WEIGHT_KEYS = ["trend_weight", "rsi_weight", "adx_weight", "vpt_weight", "rs_weight", "min_score"]
+
+# Pattern = trend state (0 none, 1 > EMA20, 2 full stack) x RSI state (0, 1 strong, 2 ideal)
+#           x ADX x VPT x RS x bullish market
+N_PATTERNS = 3 * 3 * 2 * 2 * 2 * 2
+
+def _pattern_table():
+    """Each pattern's component states as columns (trend, rsi, adx, vpt, rs, bull)."""
+    return np.array(list(itertools.product(range(3), range(3), range(2), range(2), range(2), range(2))))
+
+def encode_patterns(scores, rsi_band, adx_cutoff, bullish):
+    """Pattern code (0..N_PATTERNS-1) of every (date, ticker) cell for one set of thresholds."""
+    low, mid, high = rsi_band
+    rsi, adx = scores['RSI'], scores['ADX']
+    with np.errstate(invalid='ignore'):
+        trend = scores['Trend_Pts'] // 15
+        rsi_state = np.where((rsi >= low) & (rsi <= mid), 2, np.where((rsi > mid) & (rsi <= high), 1, 0))
+        adx_flag = (adx > adx_cutoff).astype(int)
+    vpt_flag = (scores['VPT_Pts'] > 0).astype(int)
+    rs_flag = (scores['RS_Pts'] > 0).astype(int)
+    bull = np.broadcast_to(bullish.reshape(-1, 1), trend.shape).astype(int)
+    return (((((trend * 3 + rsi_state) * 2 + adx_flag) * 2 + vpt_flag) * 2 + rs_flag) * 2 + bull)
+
+def pattern_selection(combos):
+    """
+    (N_PATTERNS x len(combos)) 0/1 matrix: would a pattern be traded under each weight combination?
+    Applies the run_pro_scanner regime filter (bearish market: 90+ and positive alpha only).
+    """
+    table = _pattern_table()
+    trend, rsi, adx, vpt, rs, bull = (table[:, i:i + 1] for i in range(6))
+    w = {k: np.array([c[k] for c in combos], dtype=float).reshape(1, -1) for k in WEIGHT_KEYS}
+    points = (np.where(trend == 2, w['trend_weight'], np.where(trend == 1, w['trend_weight'] / 2, 0)) +
+              np.where(rsi == 2, w['rsi_weight'], np.where(rsi == 1, w['rsi_weight'] / 2, 0)) +
+              adx * w['adx_weight'] + vpt * w['vpt_weight'] + rs * w['rs_weight'])
+    allowed = (bull == 1) | ((points >= 90) & (rs == 1))
+    return ((points >= w['min_score']) & allowed).astype(float)
+
+def trade_outcomes(scores, panel, rows, cols, sl_mult, target_mult, max_days=30):
+    """PnL % of a trade at each (rows, cols) cell for one stop/target pair (NaN if never closed)."""
+    entry = scores['Entry'][rows, cols]
+    atr = scores['ATR'][rows, cols]
+    entry_tick = to_tick(entry)
+    stop = to_tick(entry - sl_mult * atr)
+    target = to_tick(entry + target_mult * atr)
+    state, _, _, exit_price = resolve_trades(
+        pn.as_matrix(panel['High']), pn.as_matrix(panel['Low']), pn.as_matrix(panel['Close']),
+        rows, cols, entry_tick, stop, target, max_days)
+    closed = np.isin(state, [TARGET_HIT, STOP_LOSS_HIT, EXPIRED])
+    pnl = np.where(closed, (exit_price - entry_tick) / entry_tick * 100, np.nan)
+    return pnl, state == TARGET_HIT
+
+def _evaluate(combos, daily_pnl, daily_count, daily_wins, chunk_size=2048):
+    """Stats for each combination from per-(date, pattern) sums."""
+    stats = []
+    for i in range(0, len(combos), chunk_size):
+        select = pattern_selection(combos[i:i + chunk_size])
+        pnl_by_day = daily_pnl @ select
+        trades = daily_count.sum(axis=0) @ select
+        wins = daily_wins.sum(axis=0) @ select
+        total = pnl_by_day.sum(axis=0)
+
+        # Drawdown of the cumulative trade PnL, in signal-date order
+        equity = np.cumsum(pnl_by_day, axis=0)
+        drawdown = (np.maximum.accumulate(np.maximum(equity, 0), axis=0) - equity).max(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stats.append(np.column_stack([trades, wins / trades * 100, total / trades, total, -drawdown]))
+    return np.vstack(stats)
+
+def sweep_mtf(panel, nifty_df=None, grid=None, max_days=30, start=None, min_trades=30):
+    """
+    Evaluates every combination of `grid` (dict of parameter -> list, see DEFAULT_GRID; missing
+    keys use the production value) on a history panel.
+    start: first signal date considered (earlier bars only warm up the indicators).
+    Returns a DataFrame ranked by expectancy with Trades, Win Rate, Expectancy % (mean PnL per
+    closed trade), Total PnL % and Max Drawdown % (of the summed trade PnL). Combinations with
+    fewer than `min_trades` closed trades are dropped.
+    """
+    if grid is None:
+        grid = DEFAULT_GRID
+    grid = {k: list(grid.get(k, values[:1])) for k, values in DEFAULT_GRID.items()}
+
+    # 1. Indicators once for the whole grid
+    scores = score_panel(panel, nifty_df=nifty_df)
+    index = scores['index']
+    bullish = market_regime(index, nifty_df)
+    cells = scores['Eligible'].copy()
+    if start is not None:
+        cells &= (index >= pd.Timestamp(start)).reshape(-1, 1)
+    rows, cols = np.nonzero(cells)
+    n_days = len(index)
+
+    weight_combos = [dict(zip(WEIGHT_KEYS, values)) for values in itertools.product(*(grid[k] for k in WEIGHT_KEYS))]
+
+    # 2. Trades once per stop/target pair
+    outcomes = {}
+    for sl_mult, target_mult in itertools.product(grid['sl_mult'], grid['target_mult']):
+        outcomes[(sl_mult, target_mult)] = trade_outcomes(scores, panel, rows, cols, sl_mult, target_mult, max_days)
+
+    # 3. Per threshold set: aggregate cells by (date, pattern), then evaluate all weight combos
+    results = []
+    for rsi_band, adx_cutoff in itertools.product(grid['rsi_band'], grid['adx_cutoff']):
+        patterns = encode_patterns(scores, rsi_band, adx_cutoff, bullish)[rows, cols]
+        key = rows * N_PATTERNS + patterns
+        size = n_days * N_PATTERNS
+        for (sl_mult, target_mult), (pnl, won) in outcomes.items():
+            closed = ~np.isnan(pnl)
+            daily_pnl = np.bincount(key[closed], weights=pnl[closed], minlength=size).reshape(n_days, N_PATTERNS)
+            daily_count = np.bincount(key[closed], minlength=size).reshape(n_days, N_PATTERNS).astype(float)
+            daily_wins = np.bincount(key[closed & won], minlength=size).reshape(n_days, N_PATTERNS).astype(float)
+
+            stats = _evaluate(weight_combos, daily_pnl, daily_count, daily_wins)
+            frame = pd.DataFrame(weight_combos)
+            frame['rsi_band'] = [rsi_band] * len(frame)
+            frame['adx_cutoff'] = adx_cutoff
+            frame['sl_mult'] = sl_mult
+            frame['target_mult'] = target_mult
+            frame[['Trades', 'Win Rate', 'Expectancy %', 'Total PnL %', 'Max Drawdown %']] = stats
+            results.append(frame)
+
+    table = pd.concat(results, ignore_index=True)
+    table = table[table['Trades'] >= min_trades]
+    table = table.sort_values(['Expectancy %', 'Max Drawdown %'], ascending=[False, False], ignore_index=True)
+    table['Trades'] = table['Trades'].astype(int)
+    return table.round(2)
+
+def run_sweep(tickers=None, years=5, grid=None, max_days=30, warmup_days=250, min_trades=30):
+    """Loads (or reuses) the cached daily panel for the universe plus Nifty and runs sweep_mtf."""
+    from src.config import WATCHLIST
+    from src.utils import fetch_data_robust
+
+    tickers = list(WATCHLIST if tickers is None else tickers)
+    panel = pn.load_panel_cached(tickers, period=f"{years}y", interval="1d")
+    if not panel or panel['Close'].empty:
+        print("❌ Sweep: no data available.")
+        return pd.DataFrame()
+    nifty = fetch_data_robust("^NSEI", period=f"{years}y", interval="1d")
+    index = panel['Close'].index
+    start = index[min(warmup_days, len(index) - 1)]
+    return sweep_mtf(panel, nifty_df=nifty, grid=grid, max_days=max_days, start=start, min_trades=min_trades)
@@ -9,11 +9,13 @@ Handles:
 - Dynamic Stoploss and Target updates.
 """
 import pandas as pd
-import yfinance as yf
+from src.lazy_imports import lazy
 import os
 from datetime import datetime
 import uuid
 
+yf = lazy("yfinance")  # Imported on the first download
+
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
 CSV_PATH = os.path.join(DATA_DIR, "live_trades.csv")
 
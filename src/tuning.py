@@ -0,0 +1,271 @@
+"""
+tuning.py
+
+Hyperparameter search for the forecasting models.
+Handles:
+- Successive halving for the tree models: many sampled candidates are scored on short,
+  recent windows, and only the best third moves up to longer windows, up to the full training set.
+- Time-ordered folds (expanding-window splits) so no candidate is scored on data that is
+  older than what it was trained on.
+- A wall-clock budget: the search stops promoting once `budget_seconds` is spent and
+  refits the best candidate found so far.
+- The Prophet grid: every candidate is fitted in a process pool, one validation fold at a
+  time, and candidates already clearly worse than the best are dropped before the next fold.
+  Fold scores go through src.model_cache, so re-tuning on the same data fits nothing.
+- ARIMA order selection: d from an ADF test, then a stepwise search over (p, q) up to 3
+  that only fits the neighbours of the current best order (in parallel when a round has
+  enough of them); neighbours that add terms are warm-started from that order's fitted
+  parameters.
+
+Candidates are ranked by the mean absolute error of the next-day return, which is the
+price MAPE of a one-step forecast up to a factor of 1 + return.
+"""
+import itertools
+import logging
+import math
+import os
+import time
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import ParameterSampler, TimeSeriesSplit
+from src import model_cache
+
+TUNE_BUDGET_SECONDS = 20
+
+PARAM_SPACES = {
+    "Random Forest": {
+        'n_estimators': [100, 200, 300],
+        'max_depth': [None, 10, 20, 30],
+        'min_samples_split': [2, 5, 10],
+        'min_samples_leaf': [1, 2, 4]
+    },
+    "XGBoost": {
+        'n_estimators': [100, 200, 300],
+        'learning_rate': [0.01, 0.05, 0.1, 0.2],
+        'max_depth': [3, 5, 7, 9],
+        'subsample': [0.6, 0.8, 1.0],
+        'colsample_bytree': [0.6, 0.8, 1.0]
+    }
+}
+
+PROPHET_GRID = {
+    'changepoint_prior_scale': [0.05, 0.1, 0.5],
+    'seasonality_prior_scale': [1.0, 10.0]
+}
+PROPHET_FOLDS = 2
+PRUNE_RATIO = 1.5  # Dropped once the mean fold error is 50% above the best
+
+ARIMA_MAX_P = 3
+ARIMA_MAX_Q = 3
+ARIMA_STEPS = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, 1)]
+ARIMA_POOL_FITS = 4  # Rounds with fewer fits run inline: a pool costs more than a few sub-second fits
+
+def base_estimator(model_type):
+    """Untuned estimator with the defaults train_model / train_xgboost_model use."""
+    if model_type == "Random Forest":
+        from sklearn.ensemble import RandomForestRegressor
+        return RandomForestRegressor(n_estimators=100, random_state=42)
+    if model_type == "XGBoost":
+        from xgboost import XGBRegressor
+        return XGBRegressor(n_estimators=100, learning_rate=0.1, random_state=42)
+    return None
+
+def cv_error(estimator, params, X, y, n_folds=3):
+    """Mean absolute error over expanding-window time-series folds."""
+    errors = []
+    for train_idx, test_idx in TimeSeriesSplit(n_splits=n_folds).split(X):
+        model = clone(estimator).set_params(**params)
+        model.fit(X.iloc[train_idx], y.iloc[train_idx])
+        errors.append(np.mean(np.abs(model.predict(X.iloc[test_idx]) - y.iloc[test_idx].to_numpy())))
+    return float(np.mean(errors))
+
+def halving_windows(n_rows, n_candidates, eta=3, min_rows=60):
+    """Training-window length of each rung: shortest first, the full history last."""
+    rungs = max(1, math.ceil(math.log(max(n_candidates, 1), eta)))
+    windows = [max(min_rows, n_rows // eta ** k) for k in range(rungs - 1, -1, -1)]
+    return sorted(set(min(w, n_rows) for w in windows))
+
+def successive_halving(estimator, space, X, y, budget_seconds=TUNE_BUDGET_SECONDS, n_candidates=27,
+                       eta=3, n_folds=3, min_rows=60, random_state=42):
+    """
+    Successive halving over `n_candidates` parameter sets sampled from `space` (the
+    estimator's own settings are always candidate 0). Each rung scores the surviving
+    candidates on the most recent `window` rows, best first, and keeps the top 1/eta.
+    Returns (fitted best estimator, best params, search log).
+    """
+    start = time.time()
+    candidates = [{}] + list(ParameterSampler(space, n_candidates - 1, random_state=random_state))
+    log = []
+
+    for rung, window in enumerate(halving_windows(len(X), len(candidates), eta, min_rows)):
+        Xw, yw = X.iloc[-window:], y.iloc[-window:]
+        scored = []
+        for params in candidates:
+            if scored and time.time() - start > budget_seconds:
+                break
+            scored.append((cv_error(estimator, params, Xw, yw, n_folds), params))
+        scored.sort(key=lambda item: item[0])
+        log.append({"Rung": rung, "Window": window, "Evaluated": len(scored), "Best Error": scored[0][0]})
+
+        candidates = [params for _, params in scored]
+        if time.time() - start > budget_seconds:
+            break
+        candidates = candidates[:max(1, len(candidates) // eta)]
+        if len(candidates) == 1 and window == len(X):
+            break
+
+    best = candidates[0]
+    model = clone(estimator).set_params(**best)
+    model.fit(X, y)
+    best_params = {k: v for k, v in model.get_params().items() if k in space}
+    return model, best_params, log
+
+
+# --- PROPHET ---
+
+def prophet_folds(n_rows, n_folds=PROPHET_FOLDS, val_fraction=0.2, min_rows=30):
+    """
+    (cutoff, end) of each validation fold, oldest first. Folds are back to back and as long
+    as the last one, which is the usual 80/20 split of the training data.
+    """
+    val_len = n_rows - int(n_rows * (1 - val_fraction))
+    folds = [(n_rows - val_len * k, n_rows - val_len * (k - 1)) for k in range(n_folds, 0, -1)]
+    return [fold for fold in folds if fold[0] >= min_rows] or folds[-1:]
+
+def _prophet_fit_error(data, cutoff, end, params):
+    try:
+        from prophet import Prophet
+        logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+        m = Prophet(daily_seasonality=True, **params)
+        m.fit(data.iloc[:cutoff])
+        actual = data.iloc[cutoff:end]
+        preds = m.predict(actual[['ds']])['yhat'].to_numpy()
+        return float(np.mean(np.abs((actual['y'].to_numpy() - preds) / actual['y'].to_numpy())))
+    except Exception as e:
+        print(f"⚠️ Warning: Prophet candidate {params} failed: {e}")
+        return None
+
+def prophet_fold_error(data, cutoff, end, params):
+    """MAPE of one candidate fitted on data[:cutoff] and scored on data[cutoff:end] (cached)."""
+    key = model_cache.make_key(None, "Prophet CV", model_cache.fingerprint(data.iloc[:end]),
+                               params={**params, 'cutoff': cutoff})
+    error = model_cache.get_or_compute(key, lambda: _prophet_fit_error(data, cutoff, end, params))
+    return np.inf if error is None else error
+
+def prophet_grid_search(data, grid=None, n_folds=PROPHET_FOLDS, prune_ratio=PRUNE_RATIO, max_workers=None):
+    """
+    Grid search over Prophet parameters on a ds/y frame. Each fold is fitted for all
+    surviving candidates in parallel; a candidate whose mean error so far is above
+    `prune_ratio` x the best is not fitted on the later folds.
+    Returns (best params, search log).
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    grid = grid or PROPHET_GRID
+    candidates = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+    folds = prophet_folds(len(data), n_folds)
+    errors = [[] for _ in candidates]
+    alive = list(range(len(candidates)))
+    log = []
+
+    max_workers = max_workers or min(len(candidates), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for fold, (cutoff, end) in enumerate(folds):
+            futures = {i: pool.submit(prophet_fold_error, data, cutoff, end, candidates[i]) for i in alive}
+            for i, future in futures.items():
+                errors[i].append(future.result())
+            means = {i: float(np.mean(errors[i])) for i in alive}
+            best = min(means.values())
+            log.append({"Fold": fold, "Cutoff": cutoff, "Evaluated": len(alive), "Best Error": best})
+            if fold < len(folds) - 1 and np.isfinite(best):
+                alive = [i for i in alive if means[i] <= best * prune_ratio]
+
+    best_i = min(alive, key=lambda i: means[i])
+    return candidates[best_i], log
+
+
+# --- ARIMA ---
+
+def arima_d(series, max_d=1, alpha=0.05):
+    """Differencing order: the smallest d whose differenced series rejects a unit root (ADF test)."""
+    import warnings
+    from statsmodels.tsa.stattools import adfuller
+    values = np.asarray(series, dtype=float)
+    for d in range(max_d + 1):
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                p_value = adfuller(np.diff(values, n=d), autolag='AIC')[1]
+        except Exception:
+            break
+        if p_value < alpha:
+            return d
+    return max_d
+
+def arima_fit(series, order, start_params=None):
+    """
+    (AIC, fitted parameters by name) of one SARIMAX(order) fit, with the tuning settings
+    the old grid used. `start_params` (a smaller order's fit) warm-starts a larger order, with
+    the added terms at 0; orders that drop a term start cold. AIC is inf on failure.
+    """
+    import warnings
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            model = SARIMAX(series, order=order, seasonal_order=(0, 0, 0, 0),
+                            enforce_stationarity=False, enforce_invertibility=False)
+            start = None
+            if start_params and set(start_params) <= set(model.param_names):
+                # Only when every parent term is kept: the search starts at the parent's optimum
+                start = [start_params.get(name, 0.0) for name in model.param_names]
+            results = model.fit(disp=False, start_params=start)
+        return float(results.aic), dict(zip(model.param_names, np.asarray(results.params, dtype=float)))
+    except Exception:
+        return np.inf, None
+
+def arima_stepwise(series, start_order=(1, 1, 1), max_p=ARIMA_MAX_P, max_q=ARIMA_MAX_Q, max_d=1, max_workers=None):
+    """
+    Stepwise ARIMA order search. d comes from arima_d; starting from `start_order`, each
+    round fits the unvisited (p, q) neighbours of the best order and moves there if the AIC
+    drops, stopping when no neighbour improves. A round runs in a process pool only with
+    `max_workers` > 1 and at least ARIMA_POOL_FITS neighbours.
+    Returns (best order, its AIC, search log); "Warm" counts the warm-started fits of a round.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    d = arima_d(series, max_d)
+    best = (min(start_order[0], max_p), d, min(start_order[2], max_q))
+    fitted = {best: arima_fit(series, best)}
+    log = [{"Round": 0, "Order": best, "AIC": fitted[best][0], "Evaluated": 1, "Warm": 0}]
+
+    max_workers = max_workers or min(len(ARIMA_STEPS), os.cpu_count() or 1)
+    pool = None
+    try:
+        while True:
+            p, _, q = best
+            new = [(p + dp, d, q + dq) for dp, dq in ARIMA_STEPS
+                   if 0 <= p + dp <= max_p and 0 <= q + dq <= max_q and (p + dp, d, q + dq) not in fitted]
+            if not new:
+                break
+            warm = fitted[best][1]
+            if pool is None and max_workers > 1 and len(new) >= ARIMA_POOL_FITS:
+                pool = ProcessPoolExecutor(max_workers=max_workers)
+            if pool:
+                futures = [pool.submit(arima_fit, series, order, warm) for order in new]
+                scores = [future.result() for future in futures]
+            else:
+                scores = [arima_fit(series, order, warm) for order in new]
+            fitted.update(zip(new, scores))
+
+            candidate = min(new, key=lambda order: fitted[order][0])
+            log.append({"Round": len(log), "Order": candidate, "AIC": fitted[candidate][0], "Evaluated": len(new),
+                        "Warm": sum(o[0] >= p and o[2] >= q for o in new) if warm else 0})
+            if fitted[candidate][0] >= fitted[best][0]:
+                break
+            best = candidate
+    finally:
+        if pool:
+            pool.shutdown()
+
+    return best, fitted[best][0], log
@@ -1,9 +1,11 @@
 
-import yfinance as yf
+from src.lazy_imports import lazy
 import pandas as pd
 import time
 import requests
 
+yf = lazy("yfinance")  # Imported on the first download
+
 def fetch_data_robust(ticker, period="1y", interval="1d", retries=3, delay=1):
     """
     Robust data fetcher with retries and validation.
@@ -41,6 +43,44 @@ def fetch_data_robust(ticker, period="1y", interval="1d", retries=3, delay=1):
     print(f"❌ Failed to fetch data for {ticker} after {retries} attempts.")
     return None
 
+def fetch_batch(tickers, period="1d", interval="5m", **kwargs):
+    """
+    Downloads several tickers in a single yfinance call.
+    Returns {ticker: DataFrame} with flat OHLCV columns; tickers without data are left out.
+    """
+    tickers = list(tickers)
+    if not tickers:
+        return {}
+    try:
+        data = yf.download(tickers, period=period, interval=interval, group_by='ticker', progress=False, **kwargs)
+    except Exception as e:
+        print(f"❌ Error fetching batch of {len(tickers)} tickers: {e}")
+        return {}
+
+    if data is None or data.empty:
+        return {}
+
+    frames = {}
+    if not isinstance(data.columns, pd.MultiIndex):
+        # Single ticker comes back flat
+        frames[tickers[0]] = data.dropna(how='all')
+    else:
+        available = set(data.columns.get_level_values(0))
+        for ticker in tickers:
+            if ticker not in available: continue
+            df = data[ticker].dropna(how='all')
+            if not df.empty:
+                frames[ticker] = df
+    return {t: df for t, df in frames.items() if not df.empty}
+
+def fetch_batches(tickers, chunk_size=100, **kwargs):
+    """fetch_batch() over `chunk_size` tickers at a time; returns one merged {ticker: DataFrame}."""
+    tickers = list(tickers)
+    frames = {}
+    for i in range(0, len(tickers), chunk_size):
+        frames.update(fetch_batch(tickers[i:i + chunk_size], **kwargs))
+    return frames
+
 def round_to_tick(price, tick_size=0.05):
     """
     Rounds a price to the nearest valid tick size.
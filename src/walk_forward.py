@@ -0,0 +1,180 @@
+"""
+walk_forward.py
+
+Walk-forward replay of the MTF scanner over history.
+Handles:
+- Evaluating the get_ultra_precision_signal scoring at every historical date in one pass
+  (src.mtf_strategy.score_panel only looks back, so each date sees what the live scanner would have).
+- The Nifty regime filter of run_pro_scanner, applied per date.
+- Resolving each signal with the tracker's MTF rules (entry touch, then SL before target).
+
+Indicators run over the whole history instead of a trailing 1y window, so EMA/ADX seeds
+differ from a live run; the difference has decayed away after the first year of data.
+"""
+import numpy as np
+import pandas as pd
+from src import panel as pn
+from src.indicators import ema
+from src.mtf_strategy import score_panel
+
+SIGNAL_COLUMNS = ["Date", "Ticker", "Signal", "Confidence Score", "RS_Score", "Current Price",
+                  "Entry Price", "Stop Loss", "Target Price", "Est. Days", "Market Bullish"]
+
+def to_tick(values, tick_size=0.05):
+    """Vectorised src.utils.round_to_tick."""
+    return np.round(values / tick_size) * tick_size
+
+def market_regime(index, nifty_df=None):
+    """True on dates where Nifty closed above its EMA50 (run_pro_scanner's regime filter)."""
+    if nifty_df is None or nifty_df.empty:
+        return np.ones(len(index), dtype=bool)
+    nifty_ema50 = pd.Series(ema(nifty_df['Close'], 50, min_periods=0), index=nifty_df.index)
+    bullish = (nifty_df['Close'] > nifty_ema50).reindex(index).ffill()
+    return bullish.fillna(True).to_numpy(dtype=bool)
+
+def replay_signals(panel, nifty_df=None, min_score=60, start=None):
+    """
+    Every signal the MTF scanner would have produced, one row per (date, ticker).
+    min_score: keep rows scoring at least this much after the regime filter (60 = BUY).
+    start: first date to report (earlier dates are still used for warm-up).
+    """
+    scores = score_panel(panel, nifty_df=nifty_df)
+    index = scores['index']
+    bullish = market_regime(index, nifty_df).reshape(-1, 1)
+
+    # REGIME FILTER: in a bearish market only 90+ with positive alpha survives
+    score = scores['Score'].copy()
+    suppressed = ~bullish & ((score < 90) | (scores['RS'] < 0))
+    score[suppressed] = 0
+
+    keep = scores['Eligible'] & (score >= min_score)
+    if start is not None:
+        keep &= (index >= pd.Timestamp(start)).reshape(-1, 1)
+    rows, cols = np.nonzero(keep)
+
+    est_days = scores['Est_Days'][rows, cols]
+    signal_score = score[rows, cols]
+    history = pd.DataFrame({
+        "Date": index[rows],
+        "Ticker": np.asarray(scores['tickers'])[cols],
+        "Signal": np.where(signal_score >= 80, "STRONG BUY", "BUY"),
+        "Confidence Score": signal_score,
+        "RS_Score": np.round(scores['RS'][rows, cols], 2),
+        "Current Price": to_tick(scores['Close'][rows, cols]),
+        "Entry Price": to_tick(scores['Entry'][rows, cols]),
+        "Stop Loss": to_tick(scores['Stop'][rows, cols]),
+        "Target Price": to_tick(scores['Target'][rows, cols]),
+        "Est. Days": [f"{max(1, int(d))}-{max(1, int(d + 3))} Days" for d in est_days],
+        "Market Bullish": bullish[rows, 0]
+    }, columns=SIGNAL_COLUMNS)
+    for key in ["Trend_Pts", "RSI_Pts", "ADX_Pts", "VPT_Pts", "RS_Pts"]:
+        history[key] = scores[key][rows, cols]
+    return history.sort_values(["Date", "Ticker"], ignore_index=True)
+
+# Trade states used by resolve_trades
+WAITING, OPEN, TARGET_HIT, STOP_LOSS_HIT, NOT_TRIGGERED, EXPIRED = range(6)
+STATUS_NAMES = ["WAITING_ENTRY", "OPEN", "TARGET_HIT", "STOP_LOSS_HIT", "NOT_TRIGGERED", "EXPIRED"]
+
+def resolve_trades(high, low, close, rows, cols, entry, stop, target, max_days=30):
+    """
+    Core of simulate_outcomes on raw arrays: one trade per (rows[i], cols[i]) signal cell
+    of the (dates x tickers) high/low/close matrices, all trades stepped together.
+    Returns (state, entry_row, exit_row, exit_price); rows are -1 where not reached.
+    """
+    n = len(rows)
+    last_row = len(high) - 1
+    state = np.full(n, WAITING)
+    entry_row = np.full(n, -1)
+    exit_row = np.full(n, -1)
+    exit_price = np.full(n, np.nan)
+
+    for h in range(1, max_days + 1):
+        r = np.minimum(rows + h, last_row)
+        live = (rows + h <= last_row) & (state <= OPEN)
+        hi, lo = high[r, cols], low[r, cols]
+        live &= ~np.isnan(hi)
+
+        fill = live & (state == WAITING) & (lo <= entry) & (entry <= hi)
+        state[fill] = OPEN
+        entry_row[fill] = r[fill]
+
+        open_ = live & (state == OPEN)
+        sl_hit = open_ & (lo <= stop)
+        target_hit = open_ & ~sl_hit & (hi >= target)
+        for hit, code, price in [(sl_hit, STOP_LOSS_HIT, stop), (target_hit, TARGET_HIT, target)]:
+            state[hit] = code
+            exit_row[hit] = r[hit]
+            exit_price[hit] = price[hit]
+
+    # Horizon reached without resolution
+    expired = rows + max_days <= last_row
+    state[expired & (state == WAITING)] = NOT_TRIGGERED
+    timed_out = expired & (state == OPEN)
+    end_row = np.minimum(rows + max_days, last_row)
+    exit_row[timed_out] = end_row[timed_out]
+    exit_price[timed_out] = close[end_row, cols][timed_out]
+    state[timed_out] = EXPIRED
+    return state, entry_row, exit_row, exit_price
+
+def simulate_outcomes(history, panel, max_days=30):
+    """
+    Resolves each signal on the following daily bars, like TradeTracker does for MTF trades:
+    WAITING_ENTRY until Low <= Entry <= High, then STOP_LOSS_HIT (checked first) or TARGET_HIT.
+    Signals still waiting after `max_days` bars are NOT_TRIGGERED; open ones are EXPIRED at that
+    bar's close. Signals that run out of data stay WAITING_ENTRY / OPEN.
+    """
+    out = history.copy()
+    if out.empty:
+        for col in ["Status", "EntryDate", "ExitDate", "ExitPrice", "PnL", "Days Held"]:
+            out[col] = []
+        return out
+
+    index = panel['Close'].index
+    columns = {t: i for i, t in enumerate(panel['Close'].columns)}
+    rows = index.get_indexer(pd.DatetimeIndex(out['Date']))
+    cols = out['Ticker'].map(columns).to_numpy()
+    entry = out['Entry Price'].to_numpy(float)
+
+    state, entry_row, exit_row, exit_price = resolve_trades(
+        pn.as_matrix(panel['High']), pn.as_matrix(panel['Low']), pn.as_matrix(panel['Close']),
+        rows, cols, entry, out['Stop Loss'].to_numpy(float), out['Target Price'].to_numpy(float), max_days)
+
+    out['Status'] = np.asarray(STATUS_NAMES, dtype=object)[state]
+    out['EntryDate'] = pd.Series(index[np.maximum(entry_row, 0)], index=out.index).where(entry_row >= 0)
+    out['ExitDate'] = pd.Series(index[np.maximum(exit_row, 0)], index=out.index).where(exit_row >= 0)
+    out['ExitPrice'] = exit_price
+    out['PnL'] = (exit_price - entry) / entry * 100
+    out['Days Held'] = np.where((entry_row >= 0) & (exit_row >= 0), exit_row - entry_row, np.nan)
+    return out
+
+def summarize(history):
+    """Hit rate and average PnL per Signal bucket for resolved trades."""
+    closed = history[history['Status'].isin(["TARGET_HIT", "STOP_LOSS_HIT", "EXPIRED"])]
+    if closed.empty:
+        return pd.DataFrame()
+    return closed.groupby("Signal").agg(
+        Trades=("PnL", "size"),
+        Win_Rate=("Status", lambda s: round((s == "TARGET_HIT").mean() * 100, 2)),
+        Avg_PnL=("PnL", lambda p: round(p.mean(), 2)),
+        Avg_Days=("Days Held", lambda d: round(d.mean(), 1))
+    )
+
+def run_walk_forward(tickers=None, years=5, min_score=60, max_days=30, warmup_days=250):
+    """
+    Downloads `years` of daily bars for the universe (plus Nifty) and returns the resolved
+    signal history. The first `warmup_days` bars only warm up the indicators.
+    """
+    from src.config import WATCHLIST
+    from src.utils import fetch_data_robust
+
+    tickers = list(WATCHLIST if tickers is None else tickers)
+    panel = pn.load_panel(tickers, period=f"{years}y", interval="1d")
+    if not panel or panel['Close'].empty:
+        print("❌ Walk-forward: no data downloaded.")
+        return pd.DataFrame(columns=SIGNAL_COLUMNS)
+    nifty = fetch_data_robust("^NSEI", period=f"{years}y", interval="1d")
+
+    index = panel['Close'].index
+    start = index[min(warmup_days, len(index) - 1)]
+    history = replay_signals(panel, nifty_df=nifty, min_score=min_score, start=start)
+    return simulate_outcomes(history, panel, max_days=max_days)
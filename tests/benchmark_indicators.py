@@ -0,0 +1,71 @@
+import sys
+import os
+import timeit
+import numpy as np
+import pandas as pd
+import ta
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from src.indicators import compute_indicators
+from src.streaming import IntradayIndicatorState
+from src.panel import build_panel
+from src.mtf_strategy import score_panel
+
+def make_frame(n):
+    rng = np.random.default_rng(42)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        "Open": close,
+        "High": close * (1 + rng.uniform(0, 0.01, n)),
+        "Low": close * (1 - rng.uniform(0, 0.01, n)),
+        "Close": close,
+        "Volume": rng.integers(1000, 9000, n).astype(float)
+    }, index=pd.date_range(start="2020-01-01", periods=n, freq="D"))
+
+def with_ta(df):
+    """The old calculate_technical_indicators + calculate_confidence indicator set."""
+    ta.momentum.rsi(df['Close'], window=14)
+    macd = ta.trend.MACD(df['Close'])
+    macd.macd(), macd.macd_signal()
+    bb = ta.volatility.BollingerBands(df['Close'])
+    bb.bollinger_hband(), bb.bollinger_lband(), bb.bollinger_mavg()
+    ta.trend.sma_indicator(df['Close'], window=50)
+    ta.trend.ema_indicator(df['Close'], window=20)
+    ta.trend.ema_indicator(df['Close'], window=200)
+    ta.volatility.average_true_range(df['High'], df['Low'], df['Close'], window=14)
+    ta.momentum.stoch(df['High'], df['Low'], df['Close'], window=14, smooth_window=3)
+    ta.momentum.stoch_signal(df['High'], df['Low'], df['Close'], window=14, smooth_window=3)
+    ta.volume.on_balance_volume(df['Close'], df['Volume'])
+    ta.volume.VolumeWeightedAveragePrice(high=df['High'], low=df['Low'], close=df['Close'], volume=df['Volume']).volume_weighted_average_price()
+
+def with_kernels(df):
+    compute_indicators(df, ["rsi14", "macd", "bb20", "sma50", "ema20", "ema200", "atr14", "stoch14", "obv", "vwap14"])
+
+def benchmark():
+    print("Indicator benchmark: ta vs src.indicators")
+    print(f"{'Rows':>8} | {'ta (ms)':>10} | {'numpy (ms)':>10} | {'Speedup':>8}")
+    for n in [375, 1250, 5000]:
+        df = make_frame(n)
+        runs = 20
+        t_ta = min(timeit.repeat(lambda: with_ta(df), number=runs, repeat=3)) / runs * 1000
+        t_np = min(timeit.repeat(lambda: with_kernels(df), number=runs, repeat=3)) / runs * 1000
+        print(f"{n:>8} | {t_ta:>10.2f} | {t_np:>10.2f} | {t_ta / t_np:>7.1f}x")
+
+    # Streaming: cost of one new 5m bar on a warmed-up state (vs full recompute above)
+    df = make_frame(375)
+    state = IntradayIndicatorState("BENCH.NS")
+    state.update_frame(df)
+    bars = 20000
+    t_stream = timeit.timeit(lambda: state.update(None, 100.0, 101.0, 99.0, 100.5, 5000.0), number=bars) / bars * 1e6
+    print(f"Streaming update: {t_stream:.1f} us per ticker per bar")
+
+    # Panel: MTF scoring of a whole universe (1y of daily bars) in one pass
+    for tickers in [50, 500]:
+        panel = build_panel({f"T{i}.NS": make_frame(250) for i in range(tickers)})
+        t_panel = min(timeit.repeat(lambda: score_panel(panel), number=3, repeat=3)) / 3 * 1000
+        print(f"MTF panel scoring: {tickers} tickers in {t_panel:.1f} ms")
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,55 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries that cost a noticeable share of a second or more to import
+HEAVY = ["sklearn", "xgboost", "prophet", "statsmodels", "streamlit", "plotly", "textblob", "yfinance", "ta"]
+
+# Entry point -> heavy libraries it may load at import time
+ENTRY_POINTS = {
+    "auto_run_intraday": [],
+    "src.intraday_strategy": [],
+    "src.tracker": [],
+    "src.mtf_strategy": [],
+    "src.sentiment": [],
+    "src.model": [],
+    "src.batch_training": [],
+    "src.data_loader": ["streamlit", "plotly"],  # streamlit imports plotly itself
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+heavy = {heavy!r}
+print(json.dumps({{"seconds": seconds, "loaded": [m for m in heavy if m in sys.modules]}}))
+"""
+
+def startup_profile(module):
+    """(import seconds, heavy libraries loaded) for `module` in a fresh interpreter."""
+    out = subprocess.run([sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    return result["seconds"], result["loaded"]
+
+def benchmark(runs=3):
+    print("Startup benchmark: import time of each entry point in a fresh interpreter")
+    print(f"{'Entry point':<24} | {'Best (s)':>8} | Heavy libraries loaded")
+    failures = []
+    for module, allowed in ENTRY_POINTS.items():
+        results = [startup_profile(module) for _ in range(runs)]
+        seconds, loaded = min(r[0] for r in results), results[0][1]
+        print(f"{module:<24} | {seconds:>8.2f} | {', '.join(loaded) or '-'}")
+        extra = sorted(set(loaded) - set(allowed))
+        if extra:
+            failures.append(f"{module} loads {', '.join(extra)}")
+    for failure in failures:
+        print(f"❌ {failure}")
+    return not failures
+
+if __name__ == "__main__":
+    sys.exit(0 if benchmark() else 1)
@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+from src import model_cache
+from src.batch_training import pool_shape, run_batch, load_results
+from src.model import train_model, predict_future, stack_features, train_pooled_model, latest_pooled_rows
+from tests.test_model_cache import make_history
+
+class TestBatchTraining(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        patcher = patch.object(model_cache, 'CACHE_DIR', os.path.join(self.tmp, 'CACHE_DIR'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.results = os.path.join(self.tmp, "forecast_results.csv")
+        self.frames = {"A.NS": make_history(200, seed=1), "B.NS": make_history(200, seed=2)}
+
+    def test_pool_never_oversubscribes(self):
+        self.assertEqual(pool_shape(cores=8), (8, 1))
+        self.assertEqual(pool_shape(4, cores=8), (4, 2))
+        self.assertEqual(pool_shape(3, cores=8), (3, 2))
+        self.assertEqual(pool_shape(16, cores=4), (4, 1))
+
+    def test_results_table(self):
+        table = run_batch(frames=self.frames, models=["Random Forest"], days=5, max_workers=2, results_path=self.results)
+        self.assertEqual(list(table["Ticker"]), ["A.NS", "B.NS"])
+        self.assertEqual([c for c in table.columns if c.startswith("Day ")], [f"Day {i}" for i in range(1, 6)])
+
+        # Same forecast as training the ticker by hand
+        model, _, _ = train_model(self.frames["A.NS"], ticker="A.NS")
+        expected = predict_future(model, self.frames["A.NS"], days=5)
+        saved = load_results(self.results, ticker="A.NS")
+        np.testing.assert_allclose(saved[[f"Day {i}" for i in range(1, 6)]].iloc[0], np.round(expected, 2))
+
+        # A later run for one ticker keeps the other's rows
+        run_batch(frames={"B.NS": self.frames["B.NS"]}, models=["Random Forest"], days=5, max_workers=1,
+                  results_path=self.results)
+        self.assertEqual(sorted(load_results(self.results)["Ticker"]), ["A.NS", "B.NS"])
+
+    def test_failures_are_reported_per_row(self):
+        table = run_batch(frames={"C.NS": make_history(20)}, models=["Random Forest"], max_workers=1,
+                          results_path=self.results)
+        self.assertIn("Not enough data", table.loc[0, "Error"])
+
+class TestPooledModel(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        cls.patchers = [patch.object(model_cache, 'CACHE_DIR', os.path.join(cls.tmp, 'cache'))]
+        for patcher in cls.patchers:
+            patcher.start()
+        cls.frames = {t: make_history(200, seed=i) for i, t in enumerate(["A.NS", "B.NS", "C.NS"])}
+
+    @classmethod
+    def tearDownClass(cls):
+        for patcher in cls.patchers:
+            patcher.stop()
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def test_latest_rows_match_the_stacked_frame(self):
+        data, feature_cols = stack_features(self.frames)
+        latest = latest_pooled_rows(self.frames, {"A.NS": 0, "B.NS": 1, "C.NS": 2}, sentiment_score=0)
+        stacked = data.groupby('Ticker').tail(1).set_index('Ticker').loc[latest.index]
+        np.testing.assert_allclose(latest[feature_cols].to_numpy(float), stacked[feature_cols].to_numpy(float), rtol=1e-9)
+
+    def test_one_fit_serves_every_ticker(self):
+        data, _ = stack_features(self.frames)
+        self.assertEqual(sorted(data['Ticker_ID'].unique()), [0, 1, 2])
+        model, metrics, _ = train_pooled_model(data, horizon=3, use_cache=False)
+        self.assertEqual(sorted(metrics["MAPE by Ticker"]), ["A.NS", "B.NS", "C.NS"])
+
+        results = os.path.join(self.tmp, "results.csv")
+        table = run_batch(frames=self.frames, models=["Random Forest"], days=3, results_path=results, pooled=True)
+        self.assertEqual(set(table["Model"]), {"Pooled Random Forest"})
+        self.assertEqual(len(table), 3)
+        self.assertTrue(table[["Day 1", "Day 2", "Day 3"]].notna().all().all())
+
+if __name__ == '__main__':
+    unittest.main()
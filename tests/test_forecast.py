@@ -0,0 +1,146 @@
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from src import model_cache
+from src.analysis import calculate_technical_indicators
+from src.model import (train_model, train_xgboost_model, train_direct_model, train_moving_average_model,
+                       train_arima_model, train_holtwinters_model, train_all_models, predict_future,
+                       recursive_forecast, holdout_forecast, direct_targets, _init_worker)
+from tests.test_model_cache import make_history
+
+def reference_forecast(model, df, days, sentiment_score=0):
+    """The original loop: append each predicted bar and re-run calculate_technical_indicators."""
+    current = df.copy()
+    names = list(model.feature_names_in_)
+    out = []
+    for _ in range(days):
+        next_date = current.index[-1] + pd.Timedelta(days=1)
+        closes = current['Close']
+        x = {col: current[col].iloc[-1] for col in names if col in current.columns}
+        x.update({'Close_Lag_1': closes.iloc[-1], 'Close_Lag_2': closes.iloc[-2], 'Close_Lag_3': closes.iloc[-3],
+                  'Rolling_Mean_5': closes.tail(5).mean(), 'Rolling_Std_5': closes.tail(5).std(),
+                  'Sentiment': sentiment_score, 'DayOfWeek': next_date.dayofweek, 'Month': next_date.month})
+        price = closes.iloc[-1] * (1 + model.predict(pd.DataFrame([x])[names])[0])
+        out.append(price)
+        new_row = current.iloc[-1:].copy()
+        new_row.index = [next_date]
+        new_row[['Open', 'High', 'Low', 'Close']] = price
+        current = calculate_technical_indicators(pd.concat([current, new_row]))
+    return np.array(out)
+
+class ForecastCase(unittest.TestCase):
+    """Shared history; trained models go to a temporary model cache."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df = make_history(260, seed=3)
+        cls.cache_dir = tempfile.mkdtemp()
+        cls.patcher = patch.object(model_cache, 'CACHE_DIR', cls.cache_dir)
+        cls.patcher.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.patcher.stop()
+        shutil.rmtree(cls.cache_dir, ignore_errors=True)
+
+class TestRecursiveForecast(ForecastCase):
+
+    def test_matches_full_recompute(self):
+        for train, model_type in [(train_model, "Random Forest"), (train_xgboost_model, "XGBoost")]:
+            model, _, _ = train(self.df, sentiment_score=0.2, use_cache=False)
+            fast = predict_future(model, self.df, days=25, sentiment_score=0.2, model_type=model_type)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                slow = reference_forecast(model, self.df, 25, sentiment_score=0.2)
+            np.testing.assert_allclose(fast, slow, rtol=1e-6)
+
+    def test_long_horizon_stays_finite(self):
+        model, _, _ = train_model(self.df, use_cache=False)
+        preds = predict_future(model, self.df, days=60)
+        self.assertEqual(len(preds), 60)
+        self.assertTrue(np.isfinite(preds).all())
+
+class TestDirectForecast(ForecastCase):
+
+    def test_targets_are_cumulative_returns(self):
+        data = pd.DataFrame({"Close": [100.0, 110.0, 99.0, 121.0]})
+        targets = direct_targets(data, 2)
+        np.testing.assert_allclose(targets[0], [0.1, -0.01])
+        np.testing.assert_allclose(targets[2], [121 / 99 - 1, np.nan])
+        self.assertTrue(np.isnan(targets[3]).all())
+
+    def test_one_call_predicts_every_horizon(self):
+        model, metrics, (actual, predicted) = train_direct_model(self.df, horizon=10, use_cache=False)
+        self.assertEqual(len(metrics["MAPE by Horizon"]), 10)
+        self.assertEqual(len(actual), metrics["Test Size"])
+
+        preds = predict_future(model, self.df, days=10, mode="direct")
+        self.assertEqual(len(preds), 10)
+        self.assertEqual(predict_future(model, self.df, days=4, mode="direct"), preds[:4])
+        with self.assertRaises(ValueError):
+            predict_future(model, self.df, days=11, mode="direct")
+
+    def test_latest_row_is_used(self):
+        # Changing only the last bar must change the forecast (the newest row has no target)
+        model, _, _ = train_direct_model(self.df, horizon=5, use_cache=False)
+        bumped = self.df.copy()
+        bumped.iloc[-1, bumped.columns.get_loc('Close')] *= 1.05
+        base = predict_future(model, self.df, days=5, mode="direct")
+        moved = predict_future(model, bumped, days=5, mode="direct")
+        self.assertNotEqual(base[0], moved[0])
+
+class TestTrainAll(ForecastCase):
+
+    def test_leaderboard_ranks_on_the_same_holdout(self):
+        models = ["Moving Average", "Random Forest", "Holt-Winters"]
+        leaderboard, results = train_all_models(self.df, model_types=models, max_workers=2)
+        self.assertEqual(sorted(leaderboard.index), ["Holt-Winters", "Moving Average", "Random Forest"])
+        self.assertTrue(leaderboard["MAPE %"].is_monotonic_increasing)
+        self.assertEqual(leaderboard.loc["Random Forest", "Test Scoring"], "one-step")
+        self.assertEqual(leaderboard.loc["Holt-Winters", "Test Scoring"], "whole test span")
+
+        # Ranked on the last 10 days forecast from the day before them; the own test score is kept
+        model, metrics, _ = results["Random Forest"]
+        preds = recursive_forecast(model, self.df.iloc[:-10], days=10)
+        actual = self.df['Close'].to_numpy()[-10:]
+        self.assertAlmostEqual(leaderboard.loc["Random Forest", "MAPE %"],
+                               round(np.mean(np.abs(preds - actual) / actual) * 100, 2))
+        _, serial, _ = train_moving_average_model(self.df, use_cache=False)
+        self.assertAlmostEqual(leaderboard.loc["Moving Average", "Test MAPE %"], round(serial["MAPE"] * 100, 2))
+        self.assertAlmostEqual(leaderboard.loc["Moving Average", "MAPE %"],
+                               round(np.mean(np.abs(self.df['Close'].iloc[-30:-10].mean() - actual) / actual) * 100, 2))
+        self.assertEqual(len(predict_future(model, self.df, days=5)), 5)
+
+    def test_holdout_forecasts_do_not_see_the_holdout(self):
+        for train, model_type in [(train_arima_model, "ARIMA"), (train_holtwinters_model, "Holt-Winters")]:
+            model, _, _ = train(self.df, use_cache=False)
+            moved = self.df.copy()
+            moved.iloc[-10:, moved.columns.get_loc('Close')] *= 2
+            base = holdout_forecast(model, model_type, self.df)
+            self.assertEqual(len(base), 10)
+            np.testing.assert_allclose(holdout_forecast(model, model_type, moved), base)
+            # ...but follow the prices up to it
+            moved.iloc[-11, moved.columns.get_loc('Close')] *= 1.1
+            self.assertFalse(np.allclose(holdout_forecast(model, model_type, moved), base))
+
+    def test_failed_model_is_ranked_last(self):
+        leaderboard, _ = train_all_models(self.df.iloc[:60], model_types=["Random Forest", "Moving Average"], max_workers=1)
+        self.assertEqual(list(leaderboard.index), ["Moving Average", "Random Forest"])
+        self.assertIn("Not enough data", leaderboard.loc["Random Forest", "Error"])
+        self.assertFalse(np.isnan(leaderboard.loc["Moving Average", "MAPE %"]))
+
+    def test_workers_cap_their_threads(self):
+        import xgboost
+        self.addCleanup(xgboost.set_config, **xgboost.get_config())
+        with patch.dict(os.environ):
+            _init_worker(self.df, 0, threads=2)
+            self.assertEqual(os.environ["OMP_NUM_THREADS"], "2")
+            self.assertEqual(xgboost.get_config()["nthread"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+from src import model_cache
+from src.forecast_eval import fold_bounds, actuals, forecast_fold, backtest
+from src.model import prepare_features, recursive_forecast
+from src.tuning import base_estimator
+from tests.test_model_cache import make_history
+
+class TestRollingOrigin(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        patcher = patch.object(model_cache, 'CACHE_DIR', os.path.join(self.tmp, 'CACHE_DIR'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        model_cache.clear()
+        self.df = make_history(300, seed=4)
+
+    def test_folds_are_anchored_on_refit_multiples(self):
+        self.assertEqual(fold_bounds(300, 20), [(240, 260), (260, 280), (280, 299)])
+        self.assertEqual(fold_bounds(303, 20)[:2], [(240, 260), (260, 280)])
+        self.assertEqual(fold_bounds(100, 50), [(60, 99)])
+        np.testing.assert_array_equal(actuals(np.arange(5.0), [2, 3], 3), [[3, 4, np.nan], [4, np.nan, np.nan]])
+
+    def test_tree_fold_fits_once_and_rolls_forward(self):
+        preds = forecast_fold("Random Forest", self.df, 240, 243, horizon=5)
+        data, cols = prepare_features(self.df)
+        train = data[data.index < self.df.index[240]]
+        model = base_estimator("Random Forest").fit(train[cols + ['Sentiment']], train['Target'])
+        np.testing.assert_allclose(preds[2], recursive_forecast(model, self.df.iloc[:243], days=5))
+
+    def test_arima_between_refits_matches_refiltering(self):
+        import warnings
+        from statsmodels.tsa.statespace.sarimax import SARIMAX
+        preds = forecast_fold("ARIMA", self.df, 240, 245, horizon=3)
+        close = self.df['Close'].to_numpy(float)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            fit = SARIMAX(close[:241], order=(1, 1, 1), seasonal_order=(0, 0, 0, 0)).fit(disp=False)
+            np.testing.assert_allclose(preds[4], fit.apply(close[:245]).forecast(3))
+
+    def test_report_by_horizon_and_cached_rerun(self):
+        models = ["XGBoost", "Holt-Winters", "Moving Average"]
+        summary, by_horizon, forecasts = backtest(self.df, model_types=models, horizon=5, ticker="A.NS", max_workers=2)
+        self.assertEqual(list(by_horizon.index), [1, 2, 3, 4, 5])
+        self.assertEqual(sorted(summary.index), sorted(models))
+        self.assertTrue((summary["Origins"] == 59).all() and (summary["Refits"] == 3).all())
+        self.assertEqual(forecasts["XGBoost"].shape, (59, 5))
+        # Errors grow with the horizon for the moving average
+        self.assertLess(by_horizon["Moving Average"].iloc[0], by_horizon["Moving Average"].iloc[-1])
+
+        # Nothing is refitted on a rerun
+        with patch('src.forecast_eval.forecast_fold', side_effect=RuntimeError("refit")):
+            again, again_by_horizon, _ = backtest(self.df, model_types=models, horizon=5, ticker="A.NS", max_workers=2)
+        self.assertEqual(list(again["Error"]), ["", "", ""])
+        self.assertTrue(again_by_horizon.equals(by_horizon))
+
+if __name__ == '__main__':
+    unittest.main()
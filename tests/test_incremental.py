@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+from src import model_cache
+from src.incremental import incremental_update, load_state
+from src.model import predict_future
+from tests.test_model_cache import make_history
+
+class TestIncrementalUpdate(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        patcher = patch.object(model_cache, 'CACHE_DIR', os.path.join(self.tmp, 'CACHE_DIR'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        model_cache.clear()
+        self.df = make_history(300, seed=3)
+
+    def test_new_days_update_instead_of_refit(self):
+        _, info = incremental_update(self.df.iloc[:-2], "A.NS", window=200)
+        self.assertEqual((info["Update"], info["Reason"]), ("full", "no saved model"))
+        _, info = incremental_update(self.df.iloc[:-2], "A.NS", window=200)
+        self.assertEqual(info["Update"], "none")
+
+        old = list(load_state("A.NS", "Random Forest")["model"].estimators_)
+        model, info = incremental_update(self.df.iloc[:-1], "A.NS", window=200, step=10)
+        self.assertEqual((info["Update"], info["Updates Since Refit"]), ("incremental", 1))
+        self.assertIsNotNone(info["Recent MAE"])
+        # The 10 oldest trees are replaced, the forest keeps its size
+        self.assertEqual(len(model.estimators_), 100)
+        self.assertEqual(model.estimators_[:90], old[10:])
+
+    def test_full_refit_trains_on_the_whole_window(self):
+        from src.model import prepare_features
+        from src.tuning import base_estimator
+        model, info = incremental_update(self.df, "A.NS", window=200)
+        data, cols = prepare_features(self.df)
+        data = data.iloc[-200:]
+        expected = base_estimator("Random Forest").fit(data[cols + ['Sentiment']], data['Target'])
+        X = data[cols + ['Sentiment']].tail(20)
+        np.testing.assert_allclose(model.predict(X), expected.predict(X))
+        # One-step price MAPE: a return error divided by 1 + the actual return
+        self.assertAlmostEqual(info["Baseline MAPE"], info["Baseline MAE"], delta=0.1 * info["Baseline MAE"])
+
+    def test_state_survives_a_restart(self):
+        incremental_update(self.df.iloc[:-1], "A.NS", model_type="XGBoost", window=200, step=5)
+        model_cache._memory.clear()
+        model, info = incremental_update(self.df, "A.NS", model_type="XGBoost", window=200, step=5)
+        self.assertEqual(info["Update"], "incremental")
+        self.assertEqual(model.get_booster().num_boosted_rounds(), 100 + 5)
+        self.assertEqual(len(predict_future(model, self.df, days=3, model_type="XGBoost")), 3)
+
+    def test_schedule_and_drift_trigger_a_full_refit(self):
+        incremental_update(self.df.iloc[:-10], "A.NS", window=200)
+        incremental_update(self.df.iloc[:-9], "A.NS", window=200, full_refit_days=1)
+        _, info = incremental_update(self.df.iloc[:-8], "A.NS", window=200, full_refit_days=1)
+        self.assertEqual((info["Update"], info["Reason"]), ("full", "schedule"))
+
+        # Next-day returns far outside anything seen before
+        shocked = self.df.copy()
+        shocked.loc[shocked.index[-8:], 'Daily_Return'] = np.tile([0.3, -0.3], 4)
+        _, info = incremental_update(shocked, "A.NS", window=200)
+        self.assertEqual((info["Update"], info["Reason"]), ("full", "drift"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import numpy as np
+import pandas as pd
+import ta
+from src.indicators import compute_indicators, ema, rsi, atr
+
+class TestIndicatorParity(unittest.TestCase):
+    """Checks the NumPy kernels against the `ta` library and the old pandas code."""
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(7)
+        n = 400
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+        cls.df = pd.DataFrame({
+            "Open": close,
+            "High": close * (1 + rng.uniform(0, 0.01, n)),
+            "Low": close * (1 - rng.uniform(0, 0.01, n)),
+            "Close": close,
+            "Volume": rng.integers(1000, 9000, n).astype(float)
+        }, index=pd.date_range(start="2024-01-01", periods=n, freq="D"))
+
+    def assertSeriesClose(self, actual, expected):
+        expected = np.asarray(expected, dtype=float)
+        np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+        np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+    def test_ta_parity(self):
+        df = self.df
+        ind = compute_indicators(df, ["rsi14", "macd", "bb20", "sma50", "ema20", "ema200", "atr14", "stoch14", "obv", "vwap14"])
+        macd = ta.trend.MACD(df['Close'])
+        bb = ta.volatility.BollingerBands(df['Close'])
+
+        self.assertSeriesClose(ind['rsi14'], ta.momentum.rsi(df['Close'], window=14))
+        self.assertSeriesClose(ind['macd'], macd.macd())
+        self.assertSeriesClose(ind['macd_signal'], macd.macd_signal())
+        self.assertSeriesClose(ind['bb20_mid'], bb.bollinger_mavg())
+        self.assertSeriesClose(ind['bb20_high'], bb.bollinger_hband())
+        self.assertSeriesClose(ind['bb20_low'], bb.bollinger_lband())
+        self.assertSeriesClose(ind['sma50'], ta.trend.sma_indicator(df['Close'], window=50))
+        self.assertSeriesClose(ind['ema20'], ta.trend.ema_indicator(df['Close'], window=20))
+        self.assertSeriesClose(ind['ema200'], ta.trend.ema_indicator(df['Close'], window=200))
+        self.assertSeriesClose(ind['atr14'], ta.volatility.average_true_range(df['High'], df['Low'], df['Close'], window=14))
+        self.assertSeriesClose(ind['stoch14_k'], ta.momentum.stoch(df['High'], df['Low'], df['Close'], window=14, smooth_window=3))
+        self.assertSeriesClose(ind['stoch14_d'], ta.momentum.stoch_signal(df['High'], df['Low'], df['Close'], window=14, smooth_window=3))
+        self.assertSeriesClose(ind['obv'], ta.volume.on_balance_volume(df['Close'], df['Volume']))
+        self.assertSeriesClose(ind['vwap14'], ta.volume.VolumeWeightedAveragePrice(
+            high=df['High'], low=df['Low'], close=df['Close'], volume=df['Volume']).volume_weighted_average_price())
+
+    def test_mtf_parity(self):
+        """The MTF scanner's rolling RSI, Wilder ADX and VPT."""
+        df = self.df
+        ind = compute_indicators(df, ["sma_rsi14", "adx14", "vpt"])
+
+        delta = df['Close'].diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+        self.assertSeriesClose(ind['sma_rsi14'], 100 - (100 / (1 + (gain / loss.replace(0, np.nan)))))
+
+        tr = pd.concat([df['High'] - df['Low'],
+                        abs(df['High'] - df['Close'].shift(1)),
+                        abs(df['Low'] - df['Close'].shift(1))], axis=1).max(axis=1)
+        smoothed_tr = tr.ewm(alpha=1/14, adjust=False).mean()
+        up_move = df['High'].diff()
+        down_move = df['Low'].shift(1) - df['Low']
+        plus_dm = pd.Series(np.where((up_move > down_move) & (up_move > 0), up_move, 0), index=df.index)
+        minus_dm = pd.Series(np.where((down_move > up_move) & (down_move > 0), down_move, 0), index=df.index)
+        plus_di = 100 * (plus_dm.ewm(alpha=1/14, adjust=False).mean() / smoothed_tr)
+        minus_di = 100 * (minus_dm.ewm(alpha=1/14, adjust=False).mean() / smoothed_tr)
+        dx = 100 * (abs(plus_di - minus_di) / (plus_di + minus_di).replace(0, np.nan))
+
+        self.assertSeriesClose(ind['adx14_atr'], smoothed_tr)
+        self.assertSeriesClose(ind['adx14'], dx.ewm(alpha=1/14, adjust=False).mean().fillna(0))
+        self.assertSeriesClose(ind['vpt'], (df['Volume'] * df['Close'].pct_change()).cumsum())
+
+    def test_ema_long_series(self):
+        """Block-wise EMA must stay stable for fast spans over long histories."""
+        values = np.linspace(1, 5000, 20000)
+        expected = pd.Series(values).ewm(span=2, adjust=False).mean()
+        self.assertSeriesClose(ema(values, 2, min_periods=0), expected)
+
+    def test_short_input(self):
+        close = self.df['Close'].iloc[:10]
+        self.assertTrue(np.isnan(rsi(close, 14)).all())
+        self.assertTrue((atr(self.df['High'].iloc[:10], self.df['Low'].iloc[:10], close, 14) == 0).all())
+
+    def test_unknown_indicator(self):
+        with self.assertRaises(ValueError):
+            compute_indicators(self.df, ["foo14"])
+
+if __name__ == '__main__':
+    unittest.main()
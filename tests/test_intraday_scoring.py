@@ -0,0 +1,45 @@
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from src.intraday_strategy import score_snapshot
+
+class TestIntradayEarlyExit(unittest.TestCase):
+
+    def setUp(self):
+        self.daily = pd.DataFrame({
+            "Open": [98.0, 100.0], "High": [101.0, 103.0], "Low": [97.0, 99.0], "Close": [100.0, 102.0]
+        })
+        self.nifty = pd.DataFrame({"Open": [100.0], "Close": [101.0]})
+
+    def snapshot(self, strong=True):
+        if strong:
+            # Every bull indicator check passes: 90 points before market/sector
+            return {"Close": 105.0, "EMA200": 100.0, "VWAP": 101.0, "RSI": 65.0, "MACD": 1.0, "MACD_Sig": 0.5,
+                    "BB_Mid": 102.0, "ATR": 1.0, "VSA_Bull": True, "VSA_Bear": False}
+        # Mixed picture: 30 bull / 25 bear points
+        return {"Close": 100.0, "EMA200": 99.0, "VWAP": 99.5, "RSI": 50.0, "MACD": -1.0, "MACD_Sig": 0.5,
+                "BB_Mid": 100.5, "ATR": 1.0, "VSA_Bull": False, "VSA_Bear": False}
+
+    @patch('src.sector_analysis.get_sector_status', return_value=("NIFTY BANK", 0.5, "BULLISH"))
+    @patch('src.intraday_strategy.yf')
+    def test_weak_candidate_skips_lookups(self, mock_yf, mock_sector):
+        score, details = score_snapshot("TEST.NS", self.snapshot(strong=False), self.daily, min_score=90)[:2]
+        mock_yf.download.assert_not_called()
+        mock_sector.assert_not_called()
+        self.assertLess(score, 90)
+        self.assertIn("Early Exit: cannot reach 90", details)
+
+    @patch('src.sector_analysis.get_sector_status', return_value=("NIFTY BANK", 0.5, "BULLISH"))
+    @patch('src.intraday_strategy.yf')
+    def test_strong_candidate_matches_full_scoring(self, mock_yf, mock_sector):
+        mock_yf.download.return_value = self.nifty
+        bounded = score_snapshot("TEST.NS", self.snapshot(), self.daily, min_score=90)
+        full = score_snapshot("TEST.NS", self.snapshot(), self.daily)
+        self.assertEqual(bounded, full)
+        self.assertEqual(bounded[0], 120)
+        self.assertEqual(bounded[10], "BUY")
+        # One sector lookup per scoring call serves both the BUY and SELL checks
+        self.assertEqual(mock_sector.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import sys
+import unittest
+from unittest.mock import patch
+from src import lazy_imports
+from src.lazy_imports import lazy, load, import_report
+from tests.benchmark_startup import ENTRY_POINTS, startup_profile
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_module_is_imported_on_first_attribute(self):
+        sys.modules.pop("colorsys", None)
+        lazy_imports.IMPORT_TIMES.pop("colorsys", None)
+        colorsys = lazy("colorsys")
+        self.assertNotIn("colorsys", sys.modules)
+        self.assertEqual(colorsys.rgb_to_hsv(1.0, 0.0, 0.0), (0.0, 1.0, 1.0))
+        self.assertIn("colorsys", sys.modules)
+        self.assertIn("colorsys", dict(import_report()))
+        self.assertIs(load("colorsys"), sys.modules["colorsys"])
+
+    def test_patching_through_the_stand_in(self):
+        import src.tracker
+        with patch('src.tracker.yf.download', return_value="mocked"):
+            self.assertEqual(src.tracker.yf.download("X"), "mocked")
+        self.assertNotEqual(src.tracker.yf.download, "mocked")
+
+    def test_entry_points_skip_unused_heavy_libraries(self):
+        for module in ["auto_run_intraday", "src.model", "src.sentiment"]:
+            _, loaded = startup_profile(module)
+            self.assertEqual(sorted(set(loaded) - set(ENTRY_POINTS[module])), [], module)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from src import model_cache
+from src.analysis import calculate_technical_indicators
+from src.model import prepare_features, train_model, train_moving_average_model
+
+def churn(cache_dir, worker, rounds=40):
+    """Saves, loads and evicts the same few keys; returns the loaded values that were not intact."""
+    model_cache._memory.clear()
+    broken = []
+    for i in range(rounds):
+        model_cache.save(f"k{(worker + i) % 4}", np.full(20000, float(i)), cache_dir=cache_dir, max_mb=0.3)
+        model_cache._memory.clear()
+        value = model_cache.load(f"k{i % 4}", cache_dir=cache_dir)
+        if value is not None and not (len(value) == 20000 and (value == value[0]).all()):
+            broken.append(i)
+    return broken
+
+def make_history(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2023-01-02", periods=n, name="Date")
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.015, n)))
+    df = pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.003, n)),
+        "High": close * (1 + rng.uniform(0, 0.01, n)),
+        "Low": close * (1 - rng.uniform(0, 0.01, n)),
+        "Close": close,
+        "Volume": rng.integers(100000, 1000000, n).astype(float)
+    }, index=dates)
+    return calculate_technical_indicators(df)
+
+class TestModelCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        patcher = patch.object(model_cache, 'CACHE_DIR', self.cache_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        model_cache.clear()
+        self.df = make_history()
+
+    def test_second_call_is_served_from_cache(self):
+        model, metrics, _ = train_model(self.df, ticker="A.NS")
+        self.assertNotIn("Cached", metrics)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        # Fresh process: only the on-disk copy is left
+        model_cache._memory.clear()
+        with patch('sklearn.ensemble.RandomForestRegressor') as mock_rf:
+            cached_model, cached_metrics, _ = train_model(self.df.copy(), ticker="A.NS")
+            mock_rf.assert_not_called()
+        self.assertTrue(cached_metrics["Cached"])
+        self.assertEqual(cached_metrics["MAPE"], metrics["MAPE"])
+        X = prepare_features(self.df)[0][list(model.feature_names_in_)].tail(5)
+        np.testing.assert_allclose(cached_model.predict(X), model.predict(X))
+
+    def test_key_covers_data_and_hyperparameters(self):
+        train_moving_average_model(self.df, ticker="A.NS")
+        _, metrics, _ = train_moving_average_model(self.df, window=50, ticker="A.NS")
+        self.assertNotIn("Cached", metrics)
+        changed = self.df.copy()
+        changed.iloc[-1, changed.columns.get_loc('Close')] *= 1.01
+        _, metrics, _ = train_moving_average_model(changed, ticker="A.NS")
+        self.assertNotIn("Cached", metrics)
+        _, metrics, _ = train_moving_average_model(self.df, ticker="A.NS")
+        self.assertTrue(metrics["Cached"])
+        _, metrics, _ = train_moving_average_model(self.df, ticker="A.NS", use_cache=False)
+        self.assertNotIn("Cached", metrics)
+
+    def test_eviction_keeps_recent_entries(self):
+        for i in range(5):
+            model_cache.save(f"k{i}", np.zeros(50000), cache_dir=self.cache_dir, max_mb=100)
+            os.utime(os.path.join(self.cache_dir, f"k{i}.pkl"), (i, i))
+        removed = model_cache.evict(self.cache_dir, max_mb=0.5)
+        self.assertEqual(removed, 4)
+        self.assertEqual(os.listdir(self.cache_dir), ["k4.pkl"])
+        self.assertNotIn("k0", model_cache._memory)
+
+    def test_concurrent_processes_never_see_partial_entries(self):
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(churn, [self.cache_dir] * 4, range(4)))
+        self.assertEqual(results, [[], [], [], []])
+        self.assertEqual([name for name in os.listdir(self.cache_dir) if not name.endswith(".pkl")], [])
+
+    def test_entries_removed_by_another_process(self):
+        model_cache.save("k0", np.zeros(10), cache_dir=self.cache_dir)
+        model_cache._memory.clear()
+        # Evicted between the read and the recency update: the value read is still served
+        with patch('os.utime', side_effect=FileNotFoundError):
+            self.assertEqual(len(model_cache.load("k0", cache_dir=self.cache_dir)), 10)
+        # A stale directory listing during eviction
+        listing = os.listdir(self.cache_dir) + ["gone.pkl"]
+        with patch('os.listdir', return_value=listing):
+            self.assertEqual(model_cache.evict(self.cache_dir, max_mb=0), 1)
+        self.assertIsNone(model_cache.load("k0", cache_dir=self.cache_dir))
+
+    def test_failed_write_leaves_no_partial_file(self):
+        with patch('pandas.to_pickle', side_effect=OSError("disk full")):
+            model_cache.save("k0", np.zeros(10), cache_dir=self.cache_dir)
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import unittest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+from src import orb_strategy
+from src.orb_strategy import backtest_orb, orb_report, opening_ranges, stack_sessions, get_opening_range, ORBState
+
+def make_session(day, closes, highs=None, lows=None, volumes=None):
+    """5m bars from 09:15 IST; High/Low default to Close +/- 0.1."""
+    closes = np.asarray(closes, dtype=float)
+    index = pd.date_range(f"{day} 09:15", periods=len(closes), freq="5min", tz="Asia/Kolkata")
+    return pd.DataFrame({
+        "Open": closes,
+        "High": closes + 0.1 if highs is None else highs,
+        "Low": closes - 0.1 if lows is None else lows,
+        "Close": closes,
+        "Volume": np.full(len(closes), 1000.0) if volumes is None else volumes
+    }, index=index)
+
+class TestORBBacktest(unittest.TestCase):
+
+    def test_sessions_resolve_independently(self):
+        # Day 1: range 99.9-101.1, breakout up on bar 7, target (101.15 + 1.2 = 102.35) hit later
+        day1 = make_session("2024-01-01", [100, 101, 100, 101, 100, 101, 100.5, 101.5, 102, 102.5, 101])
+        # Day 2: breakdown below the range, then SL (range high) hit
+        day2 = make_session("2024-01-02", [100, 101, 100, 101, 100, 101, 99.5, 101.2, 100])
+        # Day 3: never leaves the range
+        day3 = make_session("2024-01-03", [100, 101, 100, 101, 100, 101, 100.5, 100.2])
+        frames = {"A.NS": pd.concat([day1, day2, day3])}
+
+        trades = backtest_orb(frames)
+        self.assertEqual(len(trades), 2)
+        buy, sell = trades.iloc[0], trades.iloc[1]
+
+        self.assertEqual(buy['Side'], "BUY")
+        self.assertAlmostEqual(buy['Entry'], 101.15)
+        self.assertAlmostEqual(buy['SL'], 99.9)
+        self.assertEqual(buy['Status'], "TARGET_HIT")
+
+        self.assertEqual(sell['Side'], "SELL")
+        self.assertEqual(sell['Status'], "STOP_LOSS_HIT")
+        self.assertLess(sell['PnL %'], 0)
+
+    def test_window_is_found_by_timestamp(self):
+        # Session starts late (first bar 09:25): only bars before 09:45 form the range
+        day = make_session("2024-01-01", [100, 101, 100, 101, 103, 104])
+        day.index = day.index + pd.Timedelta(minutes=10)
+        trades = backtest_orb({"A.NS": day})
+        self.assertEqual(len(trades), 1)
+        self.assertAlmostEqual(trades.iloc[0]['ORB_High'], 101.1)
+        self.assertEqual(str(trades.iloc[0]['Breakout Time'].time()), "09:45:00")
+
+    def test_report_groups(self):
+        days = [make_session(f"2024-01-0{d}", [100, 101, 100, 101, 100, 101, 101.5, 103]) for d in range(1, 6)]
+        trades = backtest_orb({"A.NS": pd.concat(days), "B.NS": pd.concat(days)})
+        report = orb_report(trades)
+        self.assertEqual(report["Overall"]["Trades"], 10)
+        self.assertEqual(list(report["By Ticker"]["Trades"]), [5, 5])
+        self.assertEqual(report["By Range Width"]["Trades"].sum(), 10)
+
+class TestOpeningRange(unittest.TestCase):
+
+    def setUp(self):
+        orb_strategy._RANGE_CACHE.clear()
+
+    def test_all_windows_in_one_pass(self):
+        highs = np.array([101, 102, 103, 104, 105, 106, 107, 108, 109, 110, 111, 112, 113], dtype=float)
+        day = make_session("2024-01-01", highs - 1, highs=highs, lows=highs - 2)
+        ranges = opening_ranges(stack_sessions({"A.NS": day})).iloc[0]
+        self.assertEqual((ranges['High_15'], ranges['Low_15']), (103, 99))
+        self.assertEqual((ranges['High_30'], ranges['Low_30']), (106, 99))
+        self.assertEqual((ranges['High_60'], ranges['Low_60']), (112, 99))
+        self.assertTrue(ranges['Complete_15'] and ranges['Complete_30'] and ranges['Complete_60'])
+
+        # 09:15-09:45 only: the 60 minute window is still forming
+        partial = opening_ranges(stack_sessions({"A.NS": day.iloc[:7]})).iloc[0]
+        self.assertTrue(partial['Complete_30'])
+        self.assertFalse(partial['Complete_60'])
+
+    def test_range_is_cached_per_session(self):
+        day = make_session("2024-01-01", [100, 101, 100, 101, 100, 101, 100.5])
+        self.assertIsNone(get_opening_range("A.NS", day.iloc[:5], 30))
+        self.assertEqual(get_opening_range("A.NS", day, 30), (101.1, 99.9))
+
+        # Later calls in the same session reuse the range without recomputing it
+        with patch.object(orb_strategy, 'opening_ranges') as mock_ranges:
+            self.assertEqual(get_opening_range("A.NS", day, 30), (101.1, 99.9))
+            self.assertEqual(get_opening_range("A.NS", day, 15), (101.1, 99.9))
+            mock_ranges.assert_not_called()
+
+        # A new session replaces the old entry
+        next_day = make_session("2024-01-02", [200, 201, 200, 201, 200, 201, 200.5])
+        self.assertEqual(get_opening_range("A.NS", next_day, 30), (201.1, 199.9))
+        self.assertEqual([k[0] for k in orb_strategy._RANGE_CACHE], ["A.NS"])
+
+    @patch('src.sector_analysis.check_alignment', return_value=(0, "", 0))
+    def test_signal_uses_latest_session_of_passed_frame(self, mock_align):
+        day1 = make_session("2024-01-01", [50] * 12)
+        day2 = make_session("2024-01-02", [100, 101, 100, 101, 100, 101, 102])
+        score, details, orb_h, orb_l, entry, sl, target, side = orb_strategy.calculate_orb_signal(
+            "A.NS", window_minutes=30, df=pd.concat([day1, day2]))
+        self.assertEqual(side, "BUY")
+        self.assertAlmostEqual(orb_h, 101.1)
+        self.assertAlmostEqual(orb_l, 99.9)
+        self.assertGreaterEqual(score, 60)
+
+    @patch('src.sector_analysis.check_alignment', return_value=(0, "", 0))
+    def test_volume_spike_is_judged_on_earlier_bars(self, mock_align):
+        # 1600 is a spike against the 1000 before it, not against the mean including itself (~1086)
+        day = make_session("2024-01-03", [100, 101, 100, 101, 100, 101, 102], volumes=[1000.0] * 6 + [1600.0])
+        score, details, *_ = orb_strategy.calculate_orb_signal("B.NS", window_minutes=30, df=day)
+        self.assertIn("High Volume Breakout", details)
+
+        trade = backtest_orb({"B.NS": day}).iloc[0]
+        event = ORBState("B.NS").update_frame(day)[0]
+        self.assertEqual(trade['Score'], 90)
+        self.assertEqual(event['Score'], 90)
+
+class TestORBWatcher(unittest.TestCase):
+
+    def test_events_match_backtest(self):
+        rng = np.random.default_rng(7)
+        days = []
+        for d in range(1, 9):
+            closes = 100 + np.cumsum(rng.normal(0, 0.4, 75))
+            volumes = rng.integers(500, 3000, 75).astype(float)
+            days.append(make_session(f"2024-01-{d:02d}", closes, volumes=volumes))
+        frame = pd.concat(days)
+        trades = backtest_orb({"A.NS": frame})
+
+        state = ORBState("A.NS")
+        # Overlapping polls, as the watcher re-downloads the session each bar
+        events = []
+        for end in range(0, len(frame), 10):
+            events += state.update_frame(frame.iloc[max(0, end - 25):end + 10])
+
+        self.assertGreater(len(trades), 3)
+        self.assertEqual(len(events), len(trades))
+        for event, (_, trade) in zip(events, trades.iterrows()):
+            self.assertEqual(event['Time'], trade['Breakout Time'])
+            self.assertEqual(event['Side'], trade['Side'])
+            self.assertEqual(event['Score'], trade['Score'])
+            self.assertAlmostEqual(event['Entry Price'], trade['Entry'])
+            self.assertAlmostEqual(event['Stop Loss'], trade['SL'])
+            self.assertAlmostEqual(event['Target Price'], trade['Target'])
+
+    def test_range_held_after_window(self):
+        state = ORBState("A.NS", window_minutes=15)
+        day = make_session("2024-01-01", [100, 101, 100, 100.5, 102, 103])
+        self.assertEqual(state.update_frame(day.iloc[:3]), [])
+        self.assertIsNone(state.range)
+
+        events = state.update_frame(day)
+        self.assertEqual(state.range, (101.1, 99.9))
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['Time'], day.index[4])
+        # Only the first breakout of the session is reported
+        self.assertEqual(state.update_frame(make_session("2024-01-01", [100] * 6 + [104, 97])), [])
+
+if __name__ == '__main__':
+    unittest.main()
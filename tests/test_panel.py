@@ -0,0 +1,99 @@
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from src.indicators import compute_indicators, ema, rsi, adx, vpt
+from src import mtf_strategy
+from src.panel import build_panel, as_matrix
+
+NO_FUNDAMENTALS = {"Industry": "N/A", "Market Cap": None, "P/E Ratio": None, "P/B Ratio": None,
+                   "ROE": None, "Dividend Yield": None, "Operating Margin": None}
+
+def make_frame(dates, seed):
+    rng = np.random.default_rng(seed)
+    n = len(dates)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.001, 0.02, n)))
+    return pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.005, n)),
+        "High": close * (1 + rng.uniform(0, 0.02, n)),
+        "Low": close * (1 - rng.uniform(0, 0.02, n)),
+        "Close": close,
+        "Volume": rng.integers(100000, 1000000, n).astype(float)
+    }, index=dates)
+
+class TestPanel(unittest.TestCase):
+
+    def setUp(self):
+        dates = pd.bdate_range("2023-01-02", periods=260)
+        # Staggered listings so some columns start with NaN rows
+        self.frames = {f"T{i}.NS": make_frame(dates[(i % 4) * 50:], i) for i in range(12)}
+        self.nifty = make_frame(dates[2:], 99)
+        self.panel = build_panel(self.frames)
+
+    def test_kernels_match_per_ticker(self):
+        p = self.panel
+        close, high, low, volume = (as_matrix(p[f]) for f in ["Close", "High", "Low", "Volume"])
+        e20, rsi14 = ema(close, 20), rsi(close, 14, smoothing="sma")
+        adx_line, _, _, atr = adx(high, low, close, 14)
+        v = vpt(close, volume)
+
+        for col, (ticker, df) in enumerate(self.frames.items()):
+            rows = p['Close'].index.get_indexer(df.index)
+            ind = compute_indicators(df, ["ema20", "sma_rsi14", "adx14", "vpt"])
+            np.testing.assert_allclose(e20[rows, col], ind['ema20'], rtol=1e-9)
+            np.testing.assert_allclose(rsi14[rows, col], ind['sma_rsi14'], rtol=1e-9)
+            np.testing.assert_allclose(adx_line[rows, col], ind['adx14'], rtol=1e-9, atol=1e-9)
+            np.testing.assert_allclose(atr[rows, col], ind['adx14_atr'], rtol=1e-9)
+            np.testing.assert_allclose(v[rows, col], ind['vpt'], rtol=1e-9)
+
+    def test_series_is_the_single_column_case(self):
+        close = as_matrix(self.panel['Close'])[:, 5]
+        np.testing.assert_array_equal(ema(close, 20), ema(close[:, None], 20)[:, 0])
+        np.testing.assert_array_equal(rsi(close, 14), rsi(close[:, None], 14)[:, 0])
+
+    @patch.object(mtf_strategy, 'get_fundamentals', return_value=NO_FUNDAMENTALS)
+    @patch('src.utils.fetch_data_robust')
+    def test_scan_matches_single_ticker_signal(self, mock_fetch, mock_fund):
+        panel_results = mtf_strategy.run_panel_scan(list(self.frames), nifty_df=self.nifty,
+                                                    panel=self.panel, fundamentals=False)
+        self.assertEqual(len(panel_results), len(self.frames))
+        by_ticker = {r['Ticker']: r for r in panel_results}
+
+        for ticker, df in self.frames.items():
+            mock_fetch.return_value = df.copy()
+            expected = mtf_strategy.get_ultra_precision_signal(ticker, nifty_df=self.nifty)
+            self.assertEqual(by_ticker[ticker], expected)
+
+    def test_short_history_is_skipped(self):
+        dates = pd.bdate_range("2024-01-01", periods=30)
+        panel = build_panel({"NEW.NS": make_frame(dates, 1)})
+        self.assertEqual(mtf_strategy.run_panel_scan(["NEW.NS"], panel=panel, fundamentals=False), [])
+
+class TestPortfolioBacktest(unittest.TestCase):
+
+    def setUp(self):
+        dates = pd.bdate_range("2022-01-03", periods=300)
+        self.stocks = {f"S{i}.NS": make_frame(dates[i * 20:], i) for i in range(4)}
+        # Sector index with a few missing sessions, so alignment matters
+        self.sectors = {"^NSEBANK": make_frame(dates.delete([50, 120, 121]), 50), "^NSEI": make_frame(dates, 51)}
+        self.sector_map = {"S0.NS": "^NSEBANK", "S1.NS": "^NSEBANK", "S2.NS": "^NSEI"}  # S3 falls back to MARKET_INDEX
+
+    def test_portfolio_matches_single_ticker_backtests(self):
+        with patch('src.panel.load_panel', return_value=build_panel({**self.stocks, **self.sectors})):
+            report = mtf_strategy.run_portfolio_backtest(list(self.stocks), self.sector_map, start="2022-01-01")
+
+        stats = report["Tickers"]
+        self.assertEqual(list(stats.index), list(self.stocks))
+        self.assertEqual(stats.loc["S3.NS", "Sector"], "^NSEI")
+        self.assertEqual(len(report["Equity"]), 300)
+
+        for ticker, df in self.stocks.items():
+            sector = stats.loc[ticker, "Sector"]
+            with patch.object(mtf_strategy.yf, 'download', side_effect=[df.copy(), self.sectors[sector].copy()]):
+                single = mtf_strategy.run_strategy_backtest(ticker, sector_index=sector)
+            self.assertEqual(single["Total Return (MTF)"], f"{stats.loc[ticker, 'Total Return (MTF)']}%")
+            self.assertEqual(single["Max Drawdown"], f"{stats.loc[ticker, 'Max Drawdown']}%")
+            self.assertEqual(single["Trade Opportunity Days"], stats.loc[ticker, "Trade Opportunity Days"])
+
+if __name__ == '__main__':
+    unittest.main()
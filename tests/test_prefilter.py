@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+import pytz
+from src import prefilter
+from src.prefilter import IST, _is_fresh, screen_daily_bars, prefilter_universe
+
+def make_daily(days=20, close=100.0, spread=2.0, volume=1e6, gap_pct=0.0):
+    """Flat daily bars (High/Low = Close +/- spread) whose last open gaps `gap_pct` % from the prior close."""
+    index = pd.date_range("2024-01-01", periods=days, freq="B")
+    df = pd.DataFrame({
+        "Open": np.full(days, close),
+        "High": np.full(days, close + spread),
+        "Low": np.full(days, close - spread),
+        "Close": np.full(days, close),
+        "Volume": np.full(days, volume)
+    }, index=index)
+    df.iloc[-1, df.columns.get_loc("Open")] = close * (1 + gap_pct / 100)
+    return df
+
+class TestCacheFreshness(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.path = os.path.join(self.tmp, "A.NS.csv")
+        open(self.path, "w").close()
+
+    def written_at(self, hour, minute=0, day=2):
+        stamp = IST.localize(datetime(2024, 1, day, hour, minute)).timestamp()
+        os.utime(self.path, (stamp, stamp))
+
+    def check_clocks(self):
+        now = IST.localize(datetime(2024, 1, 2, 10, 0))
+        self.written_at(9, 30)
+        self.assertTrue(_is_fresh(self.path, now))
+        # Written before the open: today's gap is not in it yet
+        self.written_at(9, 0)
+        self.assertFalse(_is_fresh(self.path, now))
+
+        before_open = IST.localize(datetime(2024, 1, 2, 8, 0))
+        self.written_at(7, 0)
+        self.assertTrue(_is_fresh(self.path, before_open))
+        self.written_at(20, 0, day=1)
+        self.assertFalse(_is_fresh(self.path, before_open))
+
+    def test_judged_on_the_ist_clock(self):
+        self.check_clocks()
+        # 04:00 UTC is 09:30 IST; a naive clock is read as IST
+        self.written_at(9, 20)
+        self.assertTrue(_is_fresh(self.path, pytz.utc.localize(datetime(2024, 1, 2, 4, 0))))
+        self.assertFalse(_is_fresh(self.path, datetime(2024, 1, 3, 8, 0)))
+
+    def test_host_timezone_does_not_matter(self):
+        old = os.environ.get("TZ")
+        def restore():
+            if old is None:
+                os.environ.pop("TZ", None)
+            else:
+                os.environ["TZ"] = old
+            time.tzset()
+        self.addCleanup(restore)
+        os.environ["TZ"] = "America/New_York"
+        time.tzset()
+        self.check_clocks()
+
+    def test_missing_file_is_stale(self):
+        self.assertFalse(_is_fresh(os.path.join(self.tmp, "B.NS.csv"), datetime.now(IST)))
+
+class TestScreen(unittest.TestCase):
+
+    def test_thresholds(self):
+        frames = {
+            "OK.NS": make_daily(gap_pct=1.0),
+            "QUIET.NS": make_daily(spread=0.2),         # ATR 0.4%
+            "THIN.NS": make_daily(volume=1e4),          # Turnover ₹0.1 Cr
+            "GAPPY.NS": make_daily(gap_pct=-8.0),
+            "NEW.NS": make_daily(days=10),
+            "NONE.NS": None
+        }
+        passed, rejected = screen_daily_bars(frames, min_atr_pct=1.0, min_turnover=1e7, max_gap_pct=5.0)
+        self.assertEqual(passed, ["OK.NS"])
+        self.assertTrue(rejected["QUIET.NS"].startswith("ATR 0.40%"))
+        self.assertTrue(rejected["THIN.NS"].startswith("Turnover ₹0.1 Cr"))
+        self.assertEqual(rejected["GAPPY.NS"], "Gap 8.00% > 5.0%")
+        self.assertEqual(rejected["NEW.NS"], rejected["NONE.NS"])
+        self.assertEqual(rejected["NEW.NS"], "Insufficient daily history")
+
+        passed, rejected = screen_daily_bars(frames, min_atr_pct=1.0, min_turnover=1e7, min_gap_pct=2.0,
+                                             max_gap_pct=10.0)
+        self.assertEqual(passed, ["GAPPY.NS"])
+        self.assertEqual(rejected["OK.NS"], "Gap 1.00% < 2.0%")
+
+    def test_tickers_without_data_are_kept(self):
+        frames = {"OK.NS": make_daily(), "QUIET.NS": make_daily(spread=0.2)}
+        with patch.object(prefilter, "load_daily_bars", return_value=frames):
+            kept, rejected = prefilter_universe(["QUIET.NS", "OK.NS", "GONE.NS"], min_atr_pct=1.0, min_turnover=1e7)
+        self.assertEqual(kept, ["OK.NS", "GONE.NS"])
+        self.assertEqual(list(rejected), ["QUIET.NS"])
+
+if __name__ == '__main__':
+    unittest.main()
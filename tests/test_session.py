@@ -0,0 +1,138 @@
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+import numpy as np
+import pandas as pd
+import auto_run_intraday as session
+from auto_run_intraday import IST, closed_bars, roll_daily, next_bar_time, run_session
+from src.streaming import IntradayIndicatorState
+
+def ist(day, hour, minute, second=0):
+    return IST.localize(datetime(2024, 1, day, hour, minute, second))
+
+def make_bars(day, periods=75, start=100.0):
+    """5m bars from 09:15 IST (75 bars end with the 15:25 bar)."""
+    index = pd.date_range(f"2024-01-{day:02d} 09:15", periods=periods, freq="5min", tz="Asia/Kolkata")
+    close = start + np.arange(periods) * 0.1
+    return pd.DataFrame({"Open": close, "High": close + 0.5, "Low": close - 0.5, "Close": close,
+                         "Volume": np.full(periods, 1000.0)}, index=index)
+
+def make_daily(last_day, days=3):
+    index = pd.date_range(end=f"2024-01-{last_day:02d}", periods=days, freq="D", tz="Asia/Kolkata")
+    return pd.DataFrame({"Open": 100.0, "High": 101.0, "Low": 99.0, "Close": 100.0, "Volume": 5e4}, index=index)
+
+class TestClosedBars(unittest.TestCase):
+
+    def test_forming_bar_is_dropped(self):
+        bars = make_bars(2, periods=4)  # 09:15 .. 09:30
+        self.assertEqual(len(closed_bars(bars, ist(2, 9, 34, 59))), 3)
+        self.assertEqual(len(closed_bars(bars, ist(2, 9, 35))), 4)
+        self.assertTrue(closed_bars(bars, ist(2, 9, 19)).empty)
+
+    def test_last_bar_of_the_session(self):
+        bars = make_bars(2)
+        self.assertEqual(closed_bars(bars, ist(2, 15, 29, 59)).index[-1], bars.index[-2])
+        self.assertEqual(closed_bars(bars, ist(2, 15, 30)).index[-1], bars.index[-1])
+        self.assertEqual(next_bar_time(ist(2, 15, 27, 30)), ist(2, 15, 30, 20))
+        self.assertEqual(next_bar_time(ist(2, 15, 25)), ist(2, 15, 30, 20))
+        self.assertEqual(next_bar_time(ist(2, 9, 59, 59)), ist(2, 10, 0, 20))
+
+    def test_naive_index_is_utc(self):
+        bars = make_bars(2, periods=3)
+        naive = bars.copy()
+        naive.index = bars.index.tz_convert('UTC').tz_localize(None)  # 03:45, 03:50, 03:55
+        now = ist(2, 9, 25)
+        self.assertTrue(closed_bars(naive, now).index.equals(naive.index[:2]))
+        self.assertTrue(closed_bars(bars, now).index.equals(bars.index[:2]))
+
+class TestRollDaily(unittest.TestCase):
+
+    def test_rollover_appends_todays_candle(self):
+        bars = pd.concat([make_bars(1, start=50.0), make_bars(2, periods=6)])
+        rolled = roll_daily(make_daily(1), bars, ist(2, 9, 45))
+        self.assertEqual(len(rolled), 4)
+        self.assertEqual(rolled.index[-1], pd.Timestamp("2024-01-02", tz="Asia/Kolkata"))
+        today = rolled.iloc[-1]
+        # Built from today's bars only
+        self.assertEqual((today['Open'], today['Close']), (100.0, 100.5))
+        self.assertAlmostEqual(today['High'], 101.0)
+        self.assertEqual((today['Low'], today['Volume']), (99.5, 6000.0))
+
+    def test_same_day_updates_the_last_candle(self):
+        daily = make_daily(2)
+        bars = make_bars(2, periods=30)  # Highs up to 103.4
+        rolled = roll_daily(daily, bars, ist(2, 11, 45))
+        self.assertEqual(len(rolled), len(daily))
+        self.assertAlmostEqual(rolled['High'].iloc[-1], 103.4)
+        self.assertEqual((rolled['Low'].iloc[-1], rolled['Open'].iloc[-1]), (99.0, 100.0))
+        self.assertAlmostEqual(rolled['Close'].iloc[-1], 102.9)
+        self.assertEqual(daily['High'].iloc[-1], 101.0)
+
+    def test_naive_bars_and_daily_index(self):
+        bars = make_bars(2, periods=6)
+        bars.index = bars.index.tz_convert('UTC').tz_localize(None)
+        daily = make_daily(1)
+        daily.index = daily.index.tz_localize(None)
+        rolled = roll_daily(daily, bars, ist(2, 9, 45))
+        self.assertEqual(rolled.index[-1], pd.Timestamp("2024-01-02"))
+        self.assertEqual(rolled['Volume'].iloc[-1], 6000.0)
+        # No bars today (pre-open): nothing to roll
+        self.assertIs(roll_daily(daily, bars, ist(3, 9, 0)), daily)
+
+class FakeClock:
+    """Stands in for datetime.now and time.sleep inside run_session."""
+
+    def __init__(self, start):
+        self.now = start
+
+    def sleep(self, seconds):
+        self.now = self.now + pd.Timedelta(seconds=seconds)
+
+class TestRunSession(unittest.TestCase):
+
+    def test_session_scores_each_closed_bar_until_the_close(self):
+        clock = FakeClock(ist(2, 15, 0, 20))
+
+        class Clock(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return clock.now
+
+        bars = pd.concat([make_bars(1, start=90.0), make_bars(2)])
+        def fetch_batch(tickers, period, interval):
+            if interval == "1d":
+                return {"A.NS": make_daily(1)}
+            started = bars[bars.index <= clock.now]  # Includes the forming bar
+            return {"A.NS": started if period == "5d" else started[started.index.date == clock.now.date()]}
+
+        state = IntradayIndicatorState("A.NS")
+        fed = []
+        def score(ticker, state, daily, min_score):
+            fed.append((state.last_ts, daily.index[-1], daily['Close'].iloc[-1]))
+            return (95, ["test"], 1, 2, 3, 4, 5, 6, 7, 8, "BUY")
+
+        tracker = MagicMock()
+        tracker.load_trades.return_value = pd.DataFrame()
+        with patch.object(session, 'datetime', Clock), \
+             patch.object(session, 'time', MagicMock(sleep=clock.sleep)), \
+             patch.object(session, 'TradeTracker', return_value=tracker), \
+             patch.object(session, 'calculate_confidence_from_state', side_effect=score), \
+             patch.object(session, 'add_results_to_tracker') as add, \
+             patch('src.utils.fetch_batch', side_effect=fetch_batch), \
+             patch('src.streaming.load_state', return_value=state), \
+             patch('src.streaming.save_state'):
+            run_session(["A.NS"], prefilter=False)
+
+        # Warm-up fed every bar closed by 15:00:20, the 15:00 bar first scored at 15:05:20
+        self.assertEqual(fed[0][0], bars.index[-6].isoformat())
+        self.assertEqual(fed[0][1], pd.Timestamp("2024-01-02", tz="Asia/Kolkata"))
+        self.assertAlmostEqual(fed[0][2], bars['Close'].iloc[-6])
+        # Added once, then skipped as already tracked; the session ends after the 15:25 bar
+        add.assert_called_once()
+        self.assertEqual(len(fed), 1)
+        self.assertEqual(state.last_ts, bars.index[-1].isoformat())
+        self.assertEqual(state.bars, len(bars))
+        self.assertEqual(clock.now, ist(2, 15, 30, 20))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from src.indicators import compute_indicators
+from src.intraday_strategy import get_vsa_signal, get_vsa_bear_signal
+from src.streaming import IntradayIndicatorState, save_state, load_state
+
+class TestStreamingIndicators(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        n = 320
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+        self.df = pd.DataFrame({
+            "Open": close,
+            "High": close * (1 + rng.uniform(0, 0.003, n)),
+            "Low": close * (1 - rng.uniform(0, 0.003, n)),
+            "Close": close,
+            "Volume": rng.integers(1000, 9000, n).astype(float)
+        }, index=pd.date_range(start="2024-01-01 09:15", periods=n, freq="5min", tz="Asia/Kolkata"))
+        self.test_dir = "tests/temp_state"
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_matches_batch_every_bar(self):
+        self.assert_matches_batch(self.df)
+
+    def test_nan_bar_matches_batch(self):
+        # yfinance emits empty 5m rows; they must not poison the running state
+        df = self.df.copy()
+        df.iloc[250] = np.nan
+        state = self.assert_matches_batch(df)
+        snap = state.snapshot()
+        for key in ["EMA200", "RSI", "MACD", "MACD_Sig", "ATR", "BB_Mid", "VWAP"]:
+            self.assertFalse(np.isnan(snap[key]), key)
+
+    def assert_matches_batch(self, df):
+        ind = compute_indicators(df, ["ema200", "vwap14", "rsi14", "macd", "bb20", "atr14"])
+        vsa_bull = get_vsa_signal(df)
+        vsa_bear = get_vsa_bear_signal(df)
+        columns = {"EMA200": "ema200", "VWAP": "vwap14", "RSI": "rsi14", "MACD": "macd",
+                   "MACD_Sig": "macd_signal", "BB_Mid": "bb20_mid", "ATR": "atr14"}
+
+        state = IntradayIndicatorState("TEST.NS")
+        for i in range(len(df)):
+            state.update_frame(df.iloc[i:i + 1])
+            snap = state.snapshot()
+            for key, col in columns.items():
+                expected = ind[col][i]
+                if np.isnan(expected):
+                    self.assertTrue(np.isnan(snap[key]), f"{key} bar {i}")
+                else:
+                    self.assertAlmostEqual(snap[key], expected, places=8, msg=f"{key} bar {i}")
+            self.assertEqual(snap['VSA_Bull'], bool(vsa_bull.iloc[i]))
+            self.assertEqual(snap['VSA_Bear'], bool(vsa_bear.iloc[i]))
+        return state
+
+    def test_replayed_bars_are_ignored(self):
+        state = IntradayIndicatorState("TEST.NS")
+        self.assertEqual(state.update_frame(self.df.iloc[:100]), 100)
+        # Overlapping incremental fetch: only the 20 unseen bars are applied
+        self.assertEqual(state.update_frame(self.df.iloc[80:120]), 20)
+        self.assertEqual(state.bars, 120)
+
+    def test_checkpoint_round_trip(self):
+        state = IntradayIndicatorState("TEST.NS")
+        state.update_frame(self.df.iloc[:250])
+        save_state(state, self.test_dir)
+
+        restored = load_state("TEST.NS", self.test_dir)
+        state.update_frame(self.df.iloc[250:])
+        restored.update_frame(self.df.iloc[250:])
+        for key, value in state.snapshot().items():
+            self.assertAlmostEqual(restored.snapshot()[key], value, places=10)
+
+        fresh = load_state("MISSING.NS", self.test_dir)
+        self.assertEqual(fresh.bars, 0)
+
+if __name__ == '__main__':
+    unittest.main()
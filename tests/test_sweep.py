@@ -0,0 +1,62 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.panel import build_panel
+from src.mtf_strategy import score_panel
+from src.walk_forward import market_regime, replay_signals, simulate_outcomes
+from src.sweep import sweep_mtf, encode_patterns, pattern_selection, DEFAULT_GRID, WEIGHT_KEYS
+
+def make_frame(dates, seed):
+    rng = np.random.default_rng(seed)
+    n = len(dates)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0008, 0.02, n)))
+    return pd.DataFrame({
+        "Open": close,
+        "High": close * (1 + rng.uniform(0, 0.02, n)),
+        "Low": close * (1 - rng.uniform(0, 0.02, n)),
+        "Close": close,
+        "Volume": rng.integers(100000, 1000000, n).astype(float)
+    }, index=dates)
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        dates = pd.bdate_range("2021-01-04", periods=500)
+        self.panel = build_panel({f"T{i}.NS": make_frame(dates[(i % 3) * 40:], i) for i in range(12)})
+        self.nifty = make_frame(dates, 99)
+        self.start = dates[250]
+
+    def test_production_weights_reproduce_scanner_selection(self):
+        scores = score_panel(self.panel, self.nifty)
+        bullish = market_regime(scores['index'], self.nifty)
+        production = {k: DEFAULT_GRID[k][0] for k in WEIGHT_KEYS}
+        selected = pattern_selection([production])[:, 0]
+        patterns = encode_patterns(scores, DEFAULT_GRID['rsi_band'][0], DEFAULT_GRID['adx_cutoff'][0], bullish)
+
+        history = replay_signals(self.panel, self.nifty, min_score=60)
+        expected = np.zeros(scores['Score'].shape, dtype=bool)
+        rows = scores['index'].get_indexer(history['Date'])
+        cols = [scores['tickers'].index(t) for t in history['Ticker']]
+        expected[rows, cols] = True
+        np.testing.assert_array_equal((selected[patterns] == 1) & scores['Eligible'], expected)
+
+    def test_single_combination_matches_walk_forward(self):
+        table = sweep_mtf(self.panel, self.nifty, grid={}, start=self.start, min_trades=0)
+        self.assertEqual(len(table), 1)
+
+        history = simulate_outcomes(replay_signals(self.panel, self.nifty, min_score=60, start=self.start), self.panel)
+        closed = history[history['Status'].isin(["TARGET_HIT", "STOP_LOSS_HIT", "EXPIRED"])]
+        row = table.iloc[0]
+        self.assertEqual(row['Trades'], len(closed))
+        self.assertAlmostEqual(row['Expectancy %'], round(closed['PnL'].mean(), 2))
+        self.assertAlmostEqual(row['Total PnL %'], round(closed['PnL'].sum(), 2))
+
+    def test_grid_is_ranked(self):
+        grid = {"sl_mult": [1.0, 1.5], "target_mult": [2.0, 3.0], "min_score": [60, 80], "adx_cutoff": [20, 25]}
+        table = sweep_mtf(self.panel, self.nifty, grid=grid, start=self.start, min_trades=0)
+        self.assertLessEqual(len(table), 16)
+        self.assertTrue(table['Expectancy %'].is_monotonic_decreasing)
+        self.assertTrue((table['Max Drawdown %'] <= 0).all())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import Ridge
+from src import model_cache
+from src.tuning import (halving_windows, successive_halving, cv_error, prophet_folds, prophet_grid_search,
+                          arima_d, arima_fit, arima_stepwise, ARIMA_MAX_P, ARIMA_MAX_Q)
+from tests.test_model_cache import make_history
+
+def make_xy(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n, 4)), columns=list("abcd"))
+    y = pd.Series(X['a'] * 0.5 - X['b'] * 0.2 + rng.normal(0, 0.1, n))
+    return X, y
+
+class TestSuccessiveHalving(unittest.TestCase):
+
+    def test_windows_grow_to_full_history(self):
+        self.assertEqual(halving_windows(900, 27), [100, 300, 900])
+        self.assertEqual(halving_windows(200, 27), [60, 66, 200])
+        self.assertEqual(halving_windows(100, 27), [60, 100])
+        self.assertEqual(halving_windows(200, 1), [200])
+
+    def test_finds_the_better_candidate(self):
+        X, y = make_xy()
+        space = {'alpha': [1e-3, 1e4, 1e5]}
+        model, best_params, log = successive_halving(Ridge(alpha=1e5), space, X, y, n_candidates=4, eta=2)
+        self.assertEqual(best_params['alpha'], 1e-3)
+        self.assertEqual(log[-1]['Window'], len(X))
+        self.assertLessEqual(log[-1]['Best Error'], cv_error(Ridge(alpha=1e5), {}, X, y))
+        self.assertTrue(hasattr(model, 'coef_'))
+
+    def test_budget_stops_the_search(self):
+        X, y = make_xy(2000)
+        start = time.time()
+        _, _, log = successive_halving(Ridge(), {'alpha': list(np.logspace(-3, 3, 50))}, X, y,
+                                       budget_seconds=0, n_candidates=50)
+        self.assertEqual(len(log), 1)
+        self.assertEqual(log[0]['Evaluated'], 1)
+        self.assertLess(time.time() - start, 5)
+
+    def test_missing_estimator_is_a_training_error(self):
+        from src.model import train_model, train_xgboost_model
+        df = make_history(120, seed=1)
+        with patch('src.tuning.base_estimator', return_value=None):
+            for train in (train_model, train_xgboost_model):
+                model, metrics, test_results = train(df, tune=True, use_cache=False)
+                self.assertIsNone(model)
+                self.assertIsNone(test_results)
+                self.assertIn("No tuning available", metrics["error"])
+
+class TestProphetGrid(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        patcher = patch.object(model_cache, 'CACHE_DIR', self.cache_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        model_cache.clear()
+        history = make_history(200, seed=5)
+        self.data = pd.DataFrame({'ds': history.index, 'y': history['Close'].to_numpy()})
+
+    def test_folds_end_with_the_usual_split(self):
+        self.assertEqual(prophet_folds(100), [(60, 80), (80, 100)])
+        self.assertEqual(prophet_folds(40), [(32, 40)])
+
+    def test_pruned_candidates_skip_later_folds(self):
+        grid = {'changepoint_prior_scale': [0.01, 0.5], 'seasonality_prior_scale': [1.0, 10.0]}
+        best, log = prophet_grid_search(self.data, grid=grid, prune_ratio=1.0, max_workers=2)
+        self.assertEqual([row["Evaluated"] for row in log], [4, 1])
+        self.assertIn(best['changepoint_prior_scale'], grid['changepoint_prior_scale'])
+
+    def test_repeat_search_is_served_from_cache(self):
+        grid = {'changepoint_prior_scale': [0.05, 0.5]}
+        best, log = prophet_grid_search(self.data, grid=grid, max_workers=2)
+        self.assertEqual(len(os.listdir(self.cache_dir)), sum(row["Evaluated"] for row in log))
+        # Any fit would now fail (error = inf), so an identical log means nothing was refitted
+        with patch('prophet.Prophet', side_effect=RuntimeError("refit")):
+            again, again_log = prophet_grid_search(self.data, grid=grid, max_workers=2)
+        self.assertEqual(again, best)
+        self.assertEqual(again_log, log)
+
+class TestArimaStepwise(unittest.TestCase):
+
+    def setUp(self):
+        self.prices = make_history(400, seed=2)['Close'].asfreq('B').ffill()
+
+    def test_adf_picks_d(self):
+        self.assertEqual(arima_d(self.prices), 1)
+        self.assertEqual(arima_d(self.prices.pct_change().dropna()), 0)
+
+    def test_steps_with_fewer_fits_than_the_grid(self):
+        order, aic, log = arima_stepwise(self.prices, max_workers=1)
+        self.assertLess(sum(row["Evaluated"] for row in log), (ARIMA_MAX_P + 1) * (ARIMA_MAX_Q + 1))
+        self.assertGreater(sum(row["Warm"] for row in log), 0)
+        self.assertGreater(len(log), 2)  # Moved at least once before stopping
+        # The first round covers the old (p, q) <= 1 grid, so the result is at least as good
+        small = [arima_fit(self.prices, (p, 1, q))[0] for p in range(2) for q in range(2)]
+        self.assertLessEqual(aic, min(small) + 1e-6)
+
+    def test_small_rounds_run_inline(self):
+        with patch('concurrent.futures.ProcessPoolExecutor', side_effect=AssertionError("pool")):
+            order, _, _ = arima_stepwise(self.prices, max_p=1, max_q=1, max_workers=4)
+        self.assertEqual(order[1], 1)
+
+    def test_warm_start_begins_at_the_parent_fit(self):
+        parent_aic, parent = arima_fit(self.prices, (0, 1, 1))
+        child_aic, _ = arima_fit(self.prices, (1, 1, 1), parent)
+        self.assertLessEqual(child_aic, parent_aic + 2 + 1e-6)  # One extra parameter
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src import mtf_strategy
+from src.panel import build_panel
+from src.walk_forward import replay_signals, simulate_outcomes
+
+def make_frame(dates, seed):
+    rng = np.random.default_rng(seed)
+    n = len(dates)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.001, 0.02, n)))
+    return pd.DataFrame({
+        "Open": close,
+        "High": close * (1 + rng.uniform(0, 0.02, n)),
+        "Low": close * (1 - rng.uniform(0, 0.02, n)),
+        "Close": close,
+        "Volume": rng.integers(100000, 1000000, n).astype(float)
+    }, index=dates)
+
+class TestWalkForward(unittest.TestCase):
+
+    def setUp(self):
+        self.dates = pd.bdate_range("2022-01-03", periods=400)
+        self.frames = {f"T{i}.NS": make_frame(self.dates[(i % 3) * 60:], i) for i in range(10)}
+        self.nifty = make_frame(self.dates, 99)
+        self.panel = build_panel(self.frames)
+
+    def test_no_look_ahead(self):
+        full = replay_signals(self.panel, self.nifty, min_score=0)
+        cut = self.dates[300]
+        truncated = replay_signals({f: df.loc[:cut] for f, df in self.panel.items()}, self.nifty.loc[:cut], min_score=0)
+        pd.testing.assert_frame_equal(full[full['Date'] <= cut].reset_index(drop=True), truncated)
+
+    def test_last_date_matches_live_scan(self):
+        history = replay_signals(self.panel, self.nifty, min_score=0)
+        latest = history[history['Date'] == self.dates[-1]].set_index('Ticker')
+        live = mtf_strategy.run_panel_scan(list(self.frames), nifty_df=self.nifty, panel=self.panel, fundamentals=False)
+        for result in live:
+            row = latest.loc[result['Ticker']]
+            self.assertEqual(row['Entry Price'], result['Entry Price'])
+            self.assertEqual(row['Stop Loss'], result['Stop Loss'])
+            self.assertEqual(row['Target Price'], result['Target Price'])
+            self.assertEqual(row['Est. Days'], result['Est. Days'])
+
+    def test_outcomes_follow_tracker_rules(self):
+        dates = pd.bdate_range("2024-01-01", periods=6)
+        df = pd.DataFrame({
+            "Open": [100, 100, 100, 100, 100, 100],
+            "High": [101, 101, 101, 111, 101, 101],
+            "Low": [99, 99, 99, 99, 99, 99],
+            "Close": [100, 100, 100, 100, 100, 100],
+            "Volume": [1000] * 6
+        }, index=dates, dtype=float)
+        panel = build_panel({"A.NS": df})
+        history = pd.DataFrame({
+            "Date": [dates[0], dates[0], dates[0]],
+            "Ticker": ["A.NS"] * 3,
+            "Signal": ["BUY"] * 3,
+            "Entry Price": [100.0, 100.0, 50.0],
+            "Stop Loss": [95.0, 99.5, 45.0],
+            "Target Price": [110.0, 110.0, 60.0]
+        })
+        out = simulate_outcomes(history, panel, max_days=4)
+        self.assertEqual(list(out['Status']), ["TARGET_HIT", "STOP_LOSS_HIT", "NOT_TRIGGERED"])
+        self.assertEqual(out['ExitDate'].iloc[0], dates[3])
+        self.assertAlmostEqual(out['PnL'].iloc[0], 10.0)
+        self.assertEqual(out['Days Held'].iloc[1], 0)
+
+if __name__ == '__main__':
+    unittest.main()